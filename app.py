@@ -5,23 +5,31 @@ import streamlit as st
 from datetime import datetime, timedelta, timezone
 from src.services.user_service import UserService
 from src.services.auction_service import AuctionService
-from src.services.bid_service import BidService
+from src.services.bid_service import BidService, get_journal
 from src.services.payment_service import PaymentService
 from src.services.reporting_service import ReportingService
+from src.services.commitment import make_commitment
+from src.services.clearing import AUCTION_TYPES, MULTI_UNIT_TYPES
 
-# Initialize all backend services
-us = UserService()
-asvc = AuctionService()
-bsvc = BidService()
-psvc = PaymentService()
-rsvc = ReportingService()
+from src.services.leaderboard import leaderboards
+from src.services.views import views
+from src.services.aliases import get_registry, resolve_id
+from src.services.search import get_index
+from src.dao.singleflight import reads
+from src.dao.supabase_client import resilience_stats
 
-# --- Alias mapping dictionary ---
-id_map = {}
 
-def resolve_id(value: str) -> str:
-    """Converts alias like U1 or A1 to actual UUID"""
-    return id_map.get(value, value)
+# Services (and the backend client behind them) are built once per process and
+# shared by every session and rerun instead of on each script run
+@st.cache_resource
+def get_services():
+    return UserService(), AuctionService(), BidService(), PaymentService(), ReportingService()
+
+
+us, asvc, bsvc, psvc, rsvc = get_services()
+
+# --- Aliases (U1, A1, B1): durable and shared by every session ---
+aliases = get_registry()
 
 
 # --- Streamlit Page Config ---
@@ -51,6 +59,26 @@ menu = st.sidebar.radio(
     ]
 )
 
+# --- Debug: shared cache statistics ---
+if st.sidebar.checkbox("🛠 Show cache stats"):
+    st.sidebar.caption("View cache (open auctions, reports)")
+    st.sidebar.json(views.stats())
+    st.sidebar.caption("Auction record cache")
+    st.sidebar.json(asvc.cache_stats())
+    st.sidebar.caption("Leaderboards")
+    st.sidebar.json(leaderboards.stats())
+    st.sidebar.caption("Search index")
+    st.sidebar.json(get_index().stats())
+    st.sidebar.caption("Alias lookups")
+    st.sidebar.json(aliases.stats())
+    st.sidebar.caption("Coalesced reads (hottest keys)")
+    st.sidebar.json(reads.stats())
+    st.sidebar.caption("Backend retries and circuit breaker")
+    st.sidebar.json(resilience_stats())
+    if bsvc.accept_mode == "journal":
+        st.sidebar.caption("Bid journal (awaiting replication)")
+        st.sidebar.json(get_journal().stats())
+
 # --- Home Page ---
 if menu == "🏠 Home":
     st.markdown("""
@@ -77,8 +105,7 @@ elif menu == "👤 Register User":
     if st.button("✅ Register User"):
         try:
             user = us.register(name, email)
-            alias = f"U{len([k for k in id_map if k.startswith('U')]) + 1}"
-            id_map[alias] = user["id"]
+            alias = aliases.assign("U", user["id"])
             st.success(f"User Registered Successfully!\n\n**Alias:** {alias}\n**UUID:** {user['id']}")
         except Exception as e:
             st.error(f"Registration Failed: {e}")
@@ -91,6 +118,8 @@ elif menu == "🛒 Create Auction":
     reserve = st.number_input("Reserve Price (₹)", min_value=1.0)
     start_in = st.number_input("Start In (Minutes from now)", min_value=0)
     duration = st.number_input("Duration (Minutes)", min_value=1)
+    auction_type = st.selectbox("Auction Type", AUCTION_TYPES)
+    units = st.number_input("Units", min_value=1, value=1, disabled=auction_type not in MULTI_UNIT_TYPES)
     creator = st.text_input("Creator (UUID or Alias)")
 
     if st.button("🚀 Launch Auction"):
@@ -98,10 +127,10 @@ elif menu == "🛒 Create Auction":
             creator_id = resolve_id(creator)
             start = datetime.now(timezone.utc) + timedelta(minutes=start_in)
             end = start + timedelta(minutes=duration)
-            auction = asvc.create(title, desc, reserve, start, end, creator_id)
+            auction = asvc.create(title, desc, reserve, start, end, creator_id, auction_type,
+                                  int(units) if auction_type in MULTI_UNIT_TYPES else 1)
 
-            alias = f"A{len([k for k in id_map if k.startswith('A')]) + 1}"
-            id_map[alias] = auction["id"]
+            alias = aliases.assign("A", auction["id"])
 
             st.success(f"Auction Created Successfully!\n\n**Alias:** {alias}\n**UUID:** {auction['id']}")
         except Exception as e:
@@ -110,17 +139,37 @@ elif menu == "🛒 Create Auction":
 # --- List Open Auctions ---
 elif menu == "📜 List Open Auctions":
     st.header("📜 Active Auctions")
+    query = st.text_input("🔎 Search title or description")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        min_reserve = st.number_input("Min Reserve (₹)", min_value=0.0, value=0.0)
+    with col2:
+        max_reserve = st.number_input("Max Reserve (₹, 0 = any)", min_value=0.0, value=0.0)
+    with col3:
+        ends_within = st.number_input("Ends Within (hours, 0 = any)", min_value=0, value=0)
+    with col4:
+        sort_labels = {"Ending soonest": "end_time", "Ending latest": "-end_time",
+                       "Reserve: low to high": "reserve_price", "Reserve: high to low": "-reserve_price",
+                       "Newest": "-created_at", "Title": "title"}
+        sort = sort_labels[st.selectbox("Sort By", list(sort_labels))]
+    page_size = 25
+    page = st.number_input("Page", min_value=1, value=1)
     try:
-        auctions = asvc.list_open()
-        if not auctions:
-            st.info("No auctions are open currently.")
+        result = asvc.search(
+            query,
+            min_reserve=min_reserve or None,
+            max_reserve=max_reserve or None,
+            ends_before=datetime.now(timezone.utc) + timedelta(hours=ends_within) if ends_within else None,
+            sort=sort, page=int(page), page_size=page_size)
+        if result["items"]:
+            page_aliases = aliases.aliases_for(a["id"] for a in result["items"])
+            st.dataframe(
+                [{"Alias": page_aliases.get(a["id"], ""), "Title": a["title"], "Reserve (₹)": a["reserve_price"],
+                  "Ends At": a["end_time"], "Auction ID": a["id"]} for a in result["items"]],
+                use_container_width=True, hide_index=True)
+            st.caption(f"Page {result['page']} of {result['pages']} · {result['total']} matching auctions")
         else:
-            for a in auctions:
-                with st.expander(f"🔹 {a['title']}"):
-                    st.write(f"🆔 **Auction ID:** {a['id']}")
-                    st.write(f"📄 **Description:** {a['description']}")
-                    st.write(f"💰 **Reserve Price:** ₹{a['reserve_price']}")
-                    st.write(f"⏰ **Ends At:** {a['end_time']}")
+            st.info("No open auctions match." if result["total"] == 0 else "No auctions on this page.")
     except Exception as e:
         st.error(f"Error Fetching Auctions: {e}")
 
@@ -133,15 +182,16 @@ elif menu == "💰 Place Sealed Bid":
     with col2:
         bidder_id = st.text_input("Bidder ID or Alias")
 
-    commitment = st.text_input("Commitment String (any text)")
+    amount = st.number_input("Bid Amount (₹, kept sealed until reveal)", min_value=1.0)
     if st.button("📨 Submit Bid"):
         try:
             auction_id = resolve_id(auction_id)
             bidder_id = resolve_id(bidder_id)
+            commitment, nonce = make_commitment(amount, bidder_id, auction_id)
             bid = bsvc.place_sealed(auction_id, bidder_id, commitment)
-            alias = f"B{len([k for k in id_map if k.startswith('B')]) + 1}"
-            id_map[alias] = bid["id"]
+            alias = aliases.assign("B", bid["id"])
             st.success(f"Bid Submitted!\n\n**Alias:** {alias}\n**Bid UUID:** {bid['id']}")
+            st.warning(f"Save your nonce, you need it with the amount to reveal:\n\n`{nonce}`")
         except Exception as e:
             st.error(f"Error Placing Bid: {e}")
 
@@ -150,10 +200,11 @@ elif menu == "🔓 Reveal Bid":
     st.header("🔓 Reveal Your Bid Amount")
     bid_id = st.text_input("Bid ID or Alias")
     amount = st.number_input("Enter Bid Amount (₹)", min_value=1.0)
+    nonce = st.text_input("Nonce (shown when you placed the bid)")
     if st.button("🔍 Reveal"):
         try:
             bid_id = resolve_id(bid_id)
-            result = bsvc.reveal(bid_id, amount)
+            result = bsvc.reveal(bid_id, amount, nonce.strip())
             st.success(f"Bid Revealed Successfully!\n\n{result}")
         except Exception as e:
             st.error(f"Error Revealing Bid: {e}")
@@ -198,7 +249,7 @@ elif menu == "📈 Auction Report":
     if st.button("📄 Generate Report"):
         try:
             auction_id = resolve_id(auction_id)
-            report = rsvc.summary(auction_id)
+            report = rsvc.cached_summary(auction_id)
             st.json(report)
         except Exception as e:
             st.error(f"Error Generating Report: {e}")
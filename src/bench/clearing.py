@@ -0,0 +1,54 @@
+# src/bench/clearing.py
+"""Clearing engine benchmark.
+
+    python -m src.bench.clearing [--bids 1000000] [--budget-ms 1000]
+
+Times every auction type on one large auction against a full sort. Exits
+non-zero when a clear is over budget. Correctness against a reference
+implementation is checked in tests/test_clearing.py."""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from src.services.clearing import AUCTION_TYPES, MULTI_UNIT_TYPES, clear
+
+
+def bench(n: int, units: int, seed: int) -> dict:
+    rng = np.random.default_rng(seed)
+    # cents, so many equal amounts compete on created_at
+    amounts = np.round(rng.uniform(1, 10_000, n), 2)
+    amounts[rng.random(n) < 0.05] = np.nan
+    created = rng.integers(0, 3_600_000_000, n)  # microseconds within an hour
+    timings = {}
+    for auction_type in AUCTION_TYPES:
+        k = units if auction_type in MULTI_UNIT_TYPES else 1
+        start = time.perf_counter()
+        clear(auction_type, amounts, created, 100.0, k)
+        timings[auction_type] = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    np.lexsort((created, -amounts))
+    timings["full sort (reference)"] = (time.perf_counter() - start) * 1000
+    return timings
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Time the clearing engine.")
+    parser.add_argument("--bids", type=int, default=1_000_000)
+    parser.add_argument("--units", type=int, default=1000, help="units for the multi-unit types")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--budget-ms", type=float, default=1000)
+    args = parser.parse_args(argv)
+
+    timings = bench(args.bids, args.units, args.seed)
+    for name, ms in timings.items():
+        print(f"{name:<24} {args.bids} bids  {ms:9.1f} ms")
+    over = [t for t in AUCTION_TYPES if timings[t] > args.budget_ms]
+    if over:
+        print(f"over the {args.budget_ms:.0f} ms budget: {', '.join(over)}")
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+# src/bench/imports.py
+"""Import-time benchmark with a regression budget.
+
+    python -m src.bench.imports [--runs 5] [--budget-ms 150]
+
+Imports the CLI, service and DAO modules in fresh interpreters, reports the
+median wall time and exits non-zero when it is over budget or when one of the
+heavy modules (Streamlit, the Supabase SDK, ...) was pulled in."""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+MODULES = [
+    "src.cli",
+    "src.services.user_service",
+    "src.services.auction_service",
+    "src.services.bid_service",
+    "src.services.payment_service",
+    "src.services.reporting_service",
+    "src.dao.user_dao",
+    "src.dao.auction_dao",
+    "src.dao.bid_dao",
+    "src.dao.payment_dao",
+    "src.dao.audit_dao",
+    "src.models",
+]
+
+HEAVY = ["streamlit", "supabase", "postgrest", "httpx", "numpy", "pyarrow", "asyncio"]
+
+_PROBE = """
+import json, sys, time
+t = time.perf_counter()
+for m in {modules!r}:
+    __import__(m)
+elapsed = time.perf_counter() - t
+print(json.dumps({{"ms": elapsed * 1000, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+
+def measure(runs: int):
+    code = _PROBE.format(modules=MODULES, heavy=HEAVY)
+    samples, heavy = [], set()
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True,
+                             capture_output=True, text=True).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        samples.append(result["ms"])
+        heavy.update(result["heavy"])
+    return samples, sorted(heavy)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_BUDGET_MS") or 150))
+    args = parser.parse_args(argv)
+
+    samples, heavy = measure(args.runs)
+    median = statistics.median(samples)
+    print(f"import time: median {median:.1f} ms, min {min(samples):.1f} ms, max {max(samples):.1f} ms "
+          f"over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+    failed = False
+    if heavy:
+        print(f"FAIL: heavy modules imported: {', '.join(heavy)}")
+        failed = True
+    if median > args.budget_ms:
+        print(f"FAIL: over budget by {median - args.budget_ms:.1f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+# src/bench/records.py
+"""Row representation benchmark.
+
+    python -m src.bench.records [--rows 200000] [--uses 3]
+
+Decodes the same JSON response into backend-shaped dicts, typed Bid records
+and a BidBatch, and reports the memory each one keeps (tracemalloc) and the
+time taken. With dicts, every consumer re-parses amount and created_at;
+records pay for that once, up front, so the report also gives the number of
+passes after which records come out ahead. Exits non-zero if the records keep
+more memory than the dicts or give a different answer."""
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, List
+
+from src.models import Bid, BidBatch
+
+
+def make_rows(n: int, auctions: int, seed: int) -> List[Dict]:
+    rng = random.Random(seed)
+    auction_ids = [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(auctions)]
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    rows = []
+    for _ in range(n):
+        revealed = rng.random() < 0.8
+        rows.append({
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "auction_id": rng.choice(auction_ids),
+            "bidder_id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "commitment": "%064x" % rng.getrandbits(256),
+            "amount": f"{rng.uniform(1, 10_000):.2f}" if revealed else None,
+            "revealed": revealed,
+            "created_at": (start + timedelta(microseconds=rng.getrandbits(36))).isoformat(),
+        })
+    return rows
+
+
+def footprint(build) -> int:
+    """Bytes still allocated by build()'s result."""
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def timed(fn):
+    began = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - began
+
+
+def use_dicts(rows: List[Dict]) -> Decimal:
+    # what a service does with raw rows: parse the fields it needs every time
+    best = Decimal(0)
+    for r in rows:
+        if r["amount"] is not None and datetime.fromisoformat(r["created_at"]).year > 2000:
+            best = max(best, Decimal(r["amount"]))
+    return best
+
+
+def use_records(bids: List[Bid]) -> Decimal:
+    best = Decimal(0)
+    for b in bids:
+        if b.amount is not None and b.created_at.year > 2000:
+            best = max(best, b.amount)
+    return best
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compare dict rows, typed records and columnar batches.")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--auctions", type=int, default=1000)
+    parser.add_argument("--uses", type=int, default=3, help="passes over the bids, as separate consumers would make them")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    payload = json.dumps(make_rows(args.rows, args.auctions, args.seed))
+    dict_bytes = footprint(lambda: json.loads(payload))
+    bid_bytes = footprint(lambda: Bid.from_rows(json.loads(payload)))
+    batch_bytes = footprint(lambda: _batch(json.loads(payload)))
+
+    dicts, load_s = timed(lambda: json.loads(payload))
+    bids, decode_s = timed(lambda: Bid.from_rows(dicts))
+    _, batch_s = timed(lambda: _batch(dicts))
+    want, dict_use_s = timed(lambda: [use_dicts(dicts) for _ in range(args.uses)][-1])
+    got, record_use_s = timed(lambda: [use_records(bids) for _ in range(args.uses)][-1])
+    if got != want:
+        print(f"mismatch: records found {got}, dicts {want}")
+        return 1
+
+    n, uses = args.rows, args.uses
+    per_dict_pass, per_record_pass = dict_use_s / uses, record_use_s / uses
+    saved = per_dict_pass - per_record_pass
+    print(f"{n} bids, json.loads {load_s * 1000:.1f} ms, {uses} passes over each representation")
+    print(f"{'dicts':<8} {dict_bytes / 1e6:7.1f} MB {dict_bytes / n:5.0f} B/bid"
+          f"   decode      -    pass {per_dict_pass * 1000:7.1f} ms")
+    print(f"{'records':<8} {bid_bytes / 1e6:7.1f} MB {bid_bytes / n:5.0f} B/bid"
+          f"   decode {decode_s * 1000:7.1f} ms  pass {per_record_pass * 1000:7.1f} ms")
+    print(f"{'batch':<8} {batch_bytes / 1e6:7.1f} MB {batch_bytes / n:5.0f} B/bid"
+          f"   decode {batch_s * 1000:7.1f} ms")
+    if saved > 0:
+        print(f"records break even after {decode_s / saved:.1f} passes")
+    return 0 if bid_bytes < dict_bytes else 1
+
+
+def _batch(rows: List[Dict]) -> BidBatch:
+    batch = BidBatch()
+    batch.append_rows(rows)
+    return batch
+
+
+if __name__ == "__main__":
+    sys.exit(main())
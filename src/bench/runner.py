@@ -0,0 +1,193 @@
+# src/bench/runner.py
+"""Hot-path benchmark.
+
+    python -m src.bench [--auctions 20] [--bids-per-auction 50] [--concurrency 8]
+                        [--latency-ms 0] [--output results.json] [--compare baseline.json]
+
+Drives the real services against the local stand-in (in-memory engine with
+injected per-round-trip latency) phase by phase and reports throughput,
+p50/p95/p99 latency and backend round trips per operation. Results are saved as
+JSON; --compare fails the run when an operation regressed past --threshold."""
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Sequence
+
+from src.dao.backends.latency import LatencyBackend
+from src.dao.backends.sqlite_backend import MemoryBackend
+from src.dao.metrics import metrics
+from src.dao.supabase_client import set_client
+
+
+def percentile(sorted_values: Sequence[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(p / 100.0 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(latencies: List[float], errors: int, wall: float, round_trips: int) -> Dict:
+    lat = sorted(latencies)
+    count = len(lat) + errors
+    return {
+        "count": count,
+        "errors": errors,
+        "wall_s": round(wall, 4),
+        "throughput_per_s": round(count / wall, 2) if wall > 0 else 0.0,
+        "mean_ms": round(sum(lat) / len(lat), 3) if lat else 0.0,
+        "p50_ms": round(percentile(lat, 50), 3),
+        "p95_ms": round(percentile(lat, 95), 3),
+        "p99_ms": round(percentile(lat, 99), 3),
+        "round_trips_per_op": round(round_trips / count, 3) if count else 0.0,
+    }
+
+
+class Bench:
+    def __init__(self, backend: LatencyBackend, concurrency: int):
+        self.backend = backend
+        self.concurrency = concurrency
+        self.results: Dict[str, Dict] = {}
+
+    def phase(self, name: str, calls: List[Callable[[], object]]) -> List[object]:
+        """Run `calls` on the worker pool; record per-call latency and round trips."""
+        def timed(fn):
+            t = time.perf_counter()
+            try:
+                out = fn()
+            except Exception as e:
+                return None, None, e
+            return out, (time.perf_counter() - t) * 1000.0, None
+
+        before = self.backend.total_round_trips()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            outcomes = list(pool.map(timed, calls))
+        wall = time.perf_counter() - start
+        latencies = [ms for _, ms, err in outcomes if err is None]
+        errors = [err for _, _, err in outcomes if err is not None]
+        self.results[name] = summarize(latencies, len(errors), wall, self.backend.total_round_trips() - before)
+        if errors:
+            self.results[name]["first_error"] = repr(errors[0])
+        return [out for out, _, err in outcomes if err is None]
+
+
+def run(args) -> Dict:
+    backend = LatencyBackend(MemoryBackend(), args.latency_ms, args.jitter_ms, seed=args.seed)
+    set_client(backend)
+
+    # services are imported after the stand-in is installed so their DAOs pick it up
+    from src.services.user_service import UserService
+    from src.services.auction_service import AuctionService
+    from src.services.bid_service import BidService
+    from src.services.payment_service import PaymentService
+    from src.services.reporting_service import ReportingService
+    from src.dao.audit_dao import AuditDAO
+    from src.services.commitment import make_commitment
+    us, asvc, bsvc, psvc, rsvc = UserService(), AuctionService(), BidService(), PaymentService(), ReportingService()
+
+    bench = Bench(backend, args.concurrency)
+    n_users = max(args.users, 1)
+    users = bench.phase("user.register", [
+        (lambda i=i: us.register(f"bench user {i}", f"bench{i}@example.com")) for i in range(n_users)])
+
+    now = datetime.now(timezone.utc)
+    auctions = bench.phase("auction.create", [
+        (lambda i=i: asvc.create(f"Lot {i}", "benchmark lot", 10.0, now - timedelta(minutes=1),
+                                 now + timedelta(hours=1), users[i % len(users)]["id"]))
+        for i in range(args.auctions)])
+    bench.phase("auction.list_open", [asvc.list_open for _ in range(args.list_runs)])
+
+    # sealed bids with real commitments; amounts and nonces kept for the reveal phase
+    sealed = []
+    for a in auctions:
+        for j in range(args.bids_per_auction):
+            bidder = users[j % len(users)]["id"]
+            amount = 10 + (len(sealed) * 7919) % 1000
+            sealed.append((a["id"], bidder, amount) + make_commitment(amount, bidder, a["id"]))
+    bids = bench.phase("bid.place_sealed", [
+        (lambda s=s: bsvc.place_sealed(s[0], s[1], s[3])) for s in sealed])
+    bench.phase("bid.reveal", [
+        (lambda b=b, s=s: bsvc.reveal(b["id"], s[2], s[4])) for b, s in zip(bids, sealed)])
+    bench.phase("report.summary", [(lambda a=a: rsvc.summary(a["id"])) for a in auctions])
+    winners = bench.phase("bid.declare_winner", [(lambda a=a: (a["id"], bsvc.declare_winner(a["id"]))) for a in auctions])
+    bench.phase("payment.record", [
+        (lambda a=a, w=w: psvc.record(a, w["bid_id"], w["bidder_id"], w["price"])) for a, w in winners if w])
+    AuditDAO().flush()
+
+    return {
+        "started_at": now.isoformat(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "compare", "threshold")},
+        "operations": bench.results,
+        "round_trips": backend.snapshot(),
+        "backend_metrics": metrics.snapshot(),
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Operations whose p95 latency or round trips grew, or throughput dropped,
+    by more than `threshold` (a fraction)."""
+    regressions = []
+    for op, cur in current["operations"].items():
+        base = baseline.get("operations", {}).get(op)
+        if not base:
+            continue
+        if base["p95_ms"] > 0 and cur["p95_ms"] > base["p95_ms"] * (1 + threshold):
+            regressions.append(f"{op}: p95 {base['p95_ms']:.3f} -> {cur['p95_ms']:.3f} ms")
+        if base["throughput_per_s"] > 0 and cur["throughput_per_s"] < base["throughput_per_s"] * (1 - threshold):
+            regressions.append(f"{op}: throughput {base['throughput_per_s']:.1f} -> {cur['throughput_per_s']:.1f}/s")
+        if cur["round_trips_per_op"] > base["round_trips_per_op"] * (1 + threshold):
+            regressions.append(f"{op}: round trips/op {base['round_trips_per_op']} -> {cur['round_trips_per_op']}")
+    return regressions
+
+
+def print_table(result: Dict) -> None:
+    header = f"{'operation':<20}{'count':>8}{'err':>5}{'ops/s':>11}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'rt/op':>8}"
+    print(header)
+    print("-" * len(header))
+    for op, r in result["operations"].items():
+        print(f"{op:<20}{r['count']:>8}{r['errors']:>5}{r['throughput_per_s']:>11.1f}"
+              f"{r['p50_ms']:>10.3f}{r['p95_ms']:>10.3f}{r['p99_ms']:>10.3f}{r['round_trips_per_op']:>8.2f}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.bench", description="Benchmark the service hot paths.")
+    parser.add_argument("--auctions", type=int, default=20)
+    parser.add_argument("--bids-per-auction", type=int, default=50)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--list-runs", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="injected latency per round trip")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write JSON results here")
+    parser.add_argument("--compare", help="baseline JSON from an earlier run")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed regression as a fraction (0.2 = 20%%)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    result = run(args)
+    print_table(result)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"\nresults written to {args.output}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(result, json.load(f), args.threshold)
+        if regressions:
+            print("\nREGRESSIONS:")
+            for r in regressions:
+                print("  " + r)
+            return 1
+        print("\nno regressions against", args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,411 @@
+# src/bench/simulate.py
+"""Load simulation for capacity planning.
+
+    python -m src simulate [--users 200] [--auctions 40] [--bids-per-auction 100]
+                           [--auction-seconds 20] [--stagger-seconds 20] [--burst 0.6]
+                           [--workers 16] [--processes 1] [--backend stand-in|configured]
+                           [--latency-ms 5] [--output simulation.json]
+
+Generates a sale event and plays it through the real services in real time.
+Users register and auctions are created with staggered bidding windows. A few
+lots draw most of the bids. Bids arrive while each window is open, and
+`--burst` of them fall in the last `--burst-window` of it, the way bidding
+piles up before a close. After an auction ends, its bidders reveal over
+`--reveal-seconds` (`--no-show` of them never do). Then the winner is declared
+and pays.
+
+Operations run on a pool of `--workers` threads in each of `--processes`
+processes, with the auctions split between the processes. `--backend
+stand-in` uses the in-memory engine with `--latency-ms` per round trip and
+needs a single process. `--backend configured` uses STORAGE_BACKEND, as the
+app does.
+
+Reports per-operation throughput, latency percentiles, start lag and error
+rates. Start lag is how late operations began against the plan; a growing
+lag means the pool or the backend is saturated. Finally, every winner is
+checked against the reveals that went through and against the recorded
+payments. Exits non-zero when they disagree."""
+import argparse
+import heapq
+import itertools
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.bench.runner import percentile
+
+# bids are planned at least this far inside their window, so an on-time bid is never late
+MARGIN = 0.05
+
+
+class Player:
+    """Runs events at their planned time on a thread pool and records one
+    sample per operation: (op, due, started, ended, error class or None),
+    in seconds from `t0`.
+
+    An event can `need` an earlier event: it gets that event's result, and is
+    skipped if the result is None. It can also `wait` for earlier events. Events
+    are submitted in time order and the pool is FIFO, so an event only ever
+    waits on work that is already running or done."""
+
+    def __init__(self, workers: int, t0: float):
+        self.workers = workers
+        self.t0 = t0
+        self.samples: List[Tuple] = []
+        self.errors: Dict[Tuple[str, str], str] = {}  # (op, error class) -> first message
+        self.failed = set()
+        self.futures: Dict = {}
+        self._events: List = []
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+
+    def at(self, due: float, key, op: str, call: Callable, need=None, wait: Iterable = ()) -> None:
+        heapq.heappush(self._events, (due, next(self._order), key, op, call, need, tuple(wait)))
+
+    def result(self, key):
+        future: Optional[Future] = self.futures.get(key)
+        return future.result() if future is not None else None
+
+    def _run(self, key, op: str, due: float, call: Callable, need, wait):
+        for k in wait:
+            self.result(k)
+        args = ()
+        if need is not None:
+            needed = self.result(need)
+            if needed is None:
+                return None
+            args = (needed,)
+        started = time.time() - self.t0
+        error = None
+        try:
+            result = call(*args)
+        except Exception as e:
+            result, error = None, type(e).__name__
+            with self._lock:
+                self.failed.add(key)
+                self.errors.setdefault((op, error), str(e))
+        ended = time.time() - self.t0
+        with self._lock:
+            self.samples.append((op, due, started, ended, error))
+        return result
+
+    def run(self) -> None:
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while self._events:
+                due, _, key, op, call, need, wait = heapq.heappop(self._events)
+                delay = self.t0 + due - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+                self.futures[key] = pool.submit(self._run, key, op, due, call, need, wait)
+
+
+def plan_auctions(users: List[str], args, rng: random.Random) -> List[Dict]:
+    """Per auction: bidding window (seconds from the start of the event), reserve,
+    creator and planned bids as (offset, bidder_id, amount), in time order."""
+    # Pareto popularity, capped so one lot cannot take the whole event
+    weights = [min(rng.paretovariate(1.5), 20.0) for _ in range(args.auctions)]
+    scale = args.auctions * args.bids_per_auction / sum(weights) if weights else 0
+    plans = []
+    for w in weights:
+        start = rng.uniform(0, args.stagger_seconds)
+        end = start + args.auction_seconds
+        reserve = round(rng.uniform(50, 500), 2)
+        bids = []
+        for _ in range(int(round(w * scale))):
+            if rng.random() < args.burst:
+                at = end - rng.uniform(0, args.burst_window * args.auction_seconds)
+            else:
+                at = rng.uniform(start, end)
+            amount = round(reserve * rng.lognormvariate(0.1, 0.25), 2)
+            bids.append((min(max(at, start + MARGIN), end - MARGIN), rng.choice(users), amount))
+        bids.sort()
+        plans.append({"start": start, "end": end, "reserve": reserve, "creator": rng.choice(users), "bids": bids})
+    return plans
+
+
+def run_shard(plans: List[Dict], t0: float, args, shard: int = 0) -> Dict:
+    """Play the bidding, reveal and settlement of `plans` (auctions already
+    created). Top level so it can run in a worker process."""
+    from src.dao.audit_dao import AuditDAO
+    from src.services.bid_service import BidService
+    from src.services.commitment import make_commitment
+    from src.services.payment_service import PaymentService
+
+    bsvc, psvc = BidService(), PaymentService()
+    rng = random.Random(args.seed * 1009 + shard)
+    player = Player(args.workers, t0)
+    for p in plans:
+        aid = p["auction_id"]
+        reveals = []
+        for j, (at, bidder, amount) in enumerate(p["bids"]):
+            commitment, nonce = make_commitment(amount, bidder, aid)
+            player.at(at, (aid, "bid", j), "bid.place_sealed",
+                      lambda aid=aid, bidder=bidder, commitment=commitment: bsvc.place_sealed(aid, bidder, commitment))
+            if rng.random() < args.no_show:
+                continue
+            reveals.append((aid, "reveal", j))
+            player.at(p["end"] + MARGIN + rng.uniform(0, args.reveal_seconds), reveals[-1], "bid.reveal",
+                      lambda bid, amount=amount, nonce=nonce: bsvc.reveal(bid["id"], amount, nonce),
+                      need=(aid, "bid", j))
+        declared_at = p["end"] + args.reveal_seconds + args.settle_seconds
+        player.at(declared_at, (aid, "declare"), "bid.declare_winner",
+                  lambda aid=aid: bsvc.declare_winner(aid), wait=reveals)
+        player.at(declared_at + MARGIN, (aid, "pay"), "payment.record",
+                  lambda w, aid=aid: psvc.record(aid, w["bid_id"], w["bidder_id"], w["price"]), need=(aid, "declare"))
+        p["reveal_keys"] = reveals
+    player.run()
+    AuditDAO().flush()
+
+    settled = {}
+    for p in plans:
+        aid = p["auction_id"]
+        revealed = [r for r in (player.result(k) for k in p["reveal_keys"]) if r]
+        # what the reveals that went through should have produced (first price: highest, earliest on ties)
+        eligible = [r for r in revealed if Decimal(str(r["amount"])) >= Decimal(str(p["reserve"]))]
+        best = min(eligible, key=lambda r: (-Decimal(str(r["amount"])), r["created_at"]), default=None)
+        settled[aid] = {
+            "declared": (aid, "declare") not in player.failed,
+            "winner": player.result((aid, "declare")),
+            "expected_bid_id": best["id"] if best else None,
+        }
+    return {"samples": player.samples, "errors": [[op, cls, msg] for (op, cls), msg in player.errors.items()],
+            "auctions": settled}
+
+
+def setup(args, rng: random.Random) -> Tuple[List[Dict], float, List[Tuple], Dict]:
+    """Register users and create the auctions. Returns the auction plans (with
+    auction_id), the event start t0, setup samples and setup errors."""
+    from src.services.auction_service import AuctionService
+    from src.services.user_service import UserService
+
+    us, asvc = UserService(), AuctionService()
+    run_id = uuid.uuid4().hex[:8]
+    player = Player(args.workers, time.time())
+    for i in range(args.users):
+        player.at(0, ("user", i), "user.register",
+                  lambda i=i: us.register(f"sim user {i}", f"sim-{run_id}-{i}@example.com"))
+    player.run()
+    users = [u["id"] for u in (player.result(("user", i)) for i in range(args.users)) if u]
+    if not users:
+        raise RuntimeError(f"no users registered: {player.errors}")
+
+    plans = plan_auctions(users, args, rng)
+    player.t0 = t0 = time.time() + args.lead_seconds
+    for i, p in enumerate(plans):
+        start = datetime.fromtimestamp(t0 + p["start"], timezone.utc)
+        end = datetime.fromtimestamp(t0 + p["end"], timezone.utc)
+        player.at(-args.lead_seconds, ("auction", i), "auction.create",
+                  lambda p=p, i=i, start=start, end=end: asvc.create(f"Sim lot {run_id}-{i}", "simulated sale lot",
+                                                                     p["reserve"], start, end, p["creator"]))
+    player.run()
+    created = []
+    for i, p in enumerate(plans):
+        auction = player.result(("auction", i))
+        if auction:
+            p["auction_id"] = auction["id"]
+            created.append(p)
+    if time.time() > t0:
+        print(f"warning: setup overran --lead-seconds by {time.time() - t0:.1f}s; the first events will start late")
+    return created, t0, player.samples, player.errors
+
+
+def summarize_ops(samples: List[Tuple]) -> Dict[str, Dict]:
+    by_op: Dict[str, List[Tuple]] = {}
+    for s in samples:
+        by_op.setdefault(s[0], []).append(s)
+    out = {}
+    for op, rows in by_op.items():
+        lat = sorted((ended - started) * 1000 for _, _, started, ended, _ in rows)
+        lag = sorted(max(0.0, started - due) * 1000 for _, due, started, _, _ in rows)
+        errors = sum(1 for r in rows if r[4])
+        span = max(r[3] for r in rows) - min(r[2] for r in rows)
+        out[op] = {
+            "count": len(rows),
+            "errors": errors,
+            "error_rate": round(errors / len(rows), 4),
+            "throughput_per_s": round(len(rows) / span, 2) if span > 0 else 0.0,
+            "p50_ms": round(percentile(lat, 50), 3),
+            "p95_ms": round(percentile(lat, 95), 3),
+            "p99_ms": round(percentile(lat, 99), 3),
+            "max_ms": round(lat[-1], 3),
+            "lag_p95_ms": round(percentile(lag, 95), 3),
+        }
+    return out
+
+
+def throughput(samples: List[Tuple]) -> Dict:
+    """Completions per wall-clock second over the event: sustained (median of
+    the seconds that did any work) and peak."""
+    per_second = Counter(int(ended) for _, _, _, ended, _ in samples if ended >= 0)
+    busy = sorted(per_second.values())
+    span = max(per_second) - min(per_second) + 1 if per_second else 0
+    return {
+        "operations": len(samples),
+        "span_s": span,
+        "mean_per_s": round(len(samples) / span, 2) if span else 0.0,
+        "sustained_per_s": percentile(busy, 50),
+        "peak_per_s": busy[-1] if busy else 0,
+    }
+
+
+def check_consistency(auctions: Dict[str, Dict], payments) -> Dict:
+    """Declared winners against the reveals that went through, and against the payments recorded."""
+    by_auction: Dict[str, List] = {}
+    for pay in payments:
+        by_auction.setdefault(pay.auction_id, []).append(pay)
+    counts = Counter()
+    problems = []
+    for aid, a in auctions.items():
+        winner, paid = a["winner"], by_auction.get(aid, [])
+        if not a["declared"]:
+            counts["unsettled"] += 1
+            problems.append(f"{aid}: declare_winner failed")
+            continue
+        counts["settled"] += 1
+        if (winner["bid_id"] if winner else None) != a["expected_bid_id"]:
+            counts["winner_mismatch"] += 1
+            problems.append(f"{aid}: winner {winner and winner['bid_id']}, reveals say {a['expected_bid_id']}")
+        if not winner:
+            counts["no_winner"] += 1
+            if paid:
+                counts["unexpected_payment"] += 1
+                problems.append(f"{aid}: {len(paid)} payment(s) but no winner")
+            continue
+        counts["with_winner"] += 1
+        if not paid:
+            counts["unpaid"] += 1
+            problems.append(f"{aid}: winner {winner['bid_id']} has no payment")
+        elif len(paid) > 1:
+            counts["duplicate_payment"] += 1
+            problems.append(f"{aid}: {len(paid)} payments")
+        elif (paid[0].bid_id, paid[0].payer_id, paid[0].amount_paid) != (
+                winner["bid_id"], winner["bidder_id"], Decimal(winner["price"])):
+            counts["payment_mismatch"] += 1
+            problems.append(f"{aid}: paid {paid[0].amount_paid} by {paid[0].payer_id} for {paid[0].bid_id}, "
+                            f"winner {winner['bidder_id']} owes {winner['price']} for {winner['bid_id']}")
+        else:
+            counts["paid"] += 1
+    bad = ("unsettled", "winner_mismatch", "unexpected_payment", "unpaid", "duplicate_payment", "payment_mismatch")
+    return {"auctions": len(auctions), **{k: counts[k] for k in ("settled", "with_winner", "no_winner", "paid") + bad},
+            "consistent": not any(counts[k] for k in bad), "problems": problems[:20]}
+
+
+def run(args) -> Dict:
+    backend = None
+    if args.backend == "stand-in":
+        from src.dao.backends.latency import LatencyBackend
+        from src.dao.backends.sqlite_backend import MemoryBackend
+        from src.dao.supabase_client import set_client
+        backend = LatencyBackend(MemoryBackend(), args.latency_ms, args.jitter_ms, seed=args.seed)
+        set_client(backend)
+
+    rng = random.Random(args.seed)
+    plans, t0, setup_samples, errors = setup(args, rng)
+    shards = [plans[k::args.processes] for k in range(args.processes)]
+    if args.processes == 1:
+        results = [run_shard(plans, t0, args)]
+    else:
+        # spawn, not fork: each worker builds its own backend client
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(args.processes, mp_context=multiprocessing.get_context("spawn")) as pool:
+            results = list(pool.map(run_shard, shards, [t0] * len(shards), [args] * len(shards), range(len(shards))))
+
+    samples = [s for r in results for s in r["samples"]]
+    auctions = {aid: a for r in results for aid, a in r["auctions"].items()}
+    for r in results:
+        for op, cls, msg in r["errors"]:
+            errors.setdefault((op, cls), msg)
+
+    from src.dao.payment_dao import PaymentDAO
+    return {
+        "started_at": datetime.fromtimestamp(t0, timezone.utc).isoformat(),
+        "config": {k: v for k, v in vars(args).items() if k != "output"},
+        "setup": summarize_ops(setup_samples),
+        "operations": summarize_ops(samples),
+        "throughput": throughput(samples),
+        "errors": [{"operation": op, "error": cls, "example": msg} for (op, cls), msg in sorted(errors.items())],
+        "consistency": check_consistency(auctions, PaymentDAO().list_for_auctions(auctions)),
+        "round_trips": backend.total_round_trips() if backend else None,
+    }
+
+
+def print_report(result: Dict) -> None:
+    header = (f"{'operation':<20}{'count':>8}{'err %':>7}{'ops/s':>10}{'p50 ms':>10}{'p95 ms':>10}"
+              f"{'p99 ms':>10}{'max ms':>10}{'lag p95':>10}")
+    print(header)
+    print("-" * len(header))
+    for section in ("setup", "operations"):
+        for op, r in result[section].items():
+            print(f"{op:<20}{r['count']:>8}{r['error_rate'] * 100:>7.1f}{r['throughput_per_s']:>10.1f}"
+                  f"{r['p50_ms']:>10.3f}{r['p95_ms']:>10.3f}{r['p99_ms']:>10.3f}{r['max_ms']:>10.1f}"
+                  f"{r['lag_p95_ms']:>10.1f}")
+    t = result["throughput"]
+    print(f"\n{t['operations']} operations over {t['span_s']}s: mean {t['mean_per_s']}/s, "
+          f"sustained {t['sustained_per_s']}/s, peak {t['peak_per_s']}/s")
+    for e in result["errors"]:
+        print(f"  {e['operation']}: {e['error']}: {e['example']}")
+    c = result["consistency"]
+    print(f"\n{c['auctions']} auctions: {c['settled']} settled, {c['with_winner']} with a winner, {c['paid']} paid")
+    if c["consistent"]:
+        print("winners and payments consistent")
+    else:
+        print("INCONSISTENT: " + ", ".join(f"{k}={c[k]}" for k in (
+            "unsettled", "winner_mismatch", "unexpected_payment", "unpaid", "duplicate_payment", "payment_mismatch")
+            if c[k]))
+        for p in c["problems"]:
+            print("  " + p)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src simulate",
+                                     description="Simulate a sale event through the real services.")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--auctions", type=int, default=40)
+    parser.add_argument("--bids-per-auction", type=int, default=100, help="mean; popular lots get more")
+    parser.add_argument("--auction-seconds", type=float, default=20.0, help="length of each bidding window")
+    parser.add_argument("--stagger-seconds", type=float, default=20.0, help="spread of the window starts")
+    parser.add_argument("--burst", type=float, default=0.6, help="fraction of bids placed near the close")
+    parser.add_argument("--burst-window", type=float, default=0.2, help="the closing fraction of the window they fall in")
+    parser.add_argument("--reveal-seconds", type=float, default=5.0, help="reveal period after each close")
+    parser.add_argument("--no-show", type=float, default=0.05, help="fraction of bidders who never reveal")
+    parser.add_argument("--settle-seconds", type=float, default=0.5, help="delay from the reveal period to settlement")
+    parser.add_argument("--lead-seconds", type=float, default=3.0, help="time allowed for creating the auctions")
+    parser.add_argument("--workers", type=int, default=16, help="threads per process")
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--backend", choices=("stand-in", "configured"), default="stand-in")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="stand-in latency per round trip")
+    parser.add_argument("--jitter-ms", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write JSON results here")
+    args = parser.parse_args(argv)
+    if args.processes < 1 or args.workers < 1:
+        parser.error("--processes and --workers must be at least 1")
+    if args.processes > 1 and args.backend == "stand-in":
+        parser.error("the stand-in is process-local; use --backend configured with more than one process")
+    if args.users < 1:
+        parser.error("--users must be at least 1")
+    return args
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    result = run(args)
+    print_report(result)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"\nresults written to {args.output}")
+    return 0 if result["consistency"]["consistent"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,28 +2,18 @@
 import sys, os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from ast import alias
 from datetime import datetime, timedelta, timezone
 
-from streamlit import user
 from src.services.user_service import UserService
 from src.services.auction_service import AuctionService
 from src.services.bid_service import BidService
 from src.services.payment_service import PaymentService
 from src.services.reporting_service import ReportingService
-# --- Alias mapping dictionary ---
-id_map = {}
-def resolve_id(value: str) -> str:
-    """If user enters an alias like U1 or A1, resolve to UUID"""
-    return id_map.get(value, value)
+from src.services.commitment import make_commitment
+from src.services.clearing import AUCTION_TYPES, MULTI_UNIT_TYPES
+from src.services.aliases import get_registry, resolve_id
 
 
-us = UserService()
-asvc = AuctionService()
-bsvc = BidService()
-psvc = PaymentService()
-rsvc = ReportingService()
-
 def menu():
     print("\n--- Silent Auction Menu ---")
     print("1. Register user")
@@ -37,6 +27,12 @@ def menu():
     print("9. Exit")
 
 def run_menu():
+    # built on first use, not at import, so the backend client is only created when needed
+    us = UserService()
+    asvc = AuctionService()
+    bsvc = BidService()
+    psvc = PaymentService()
+    rsvc = ReportingService()
     while True:
         menu()
         choice = input("Enter choice: ").strip()
@@ -46,8 +42,7 @@ def run_menu():
             email = input("Enter email: ").strip()
             user = us.register(name, email)
             print("Registered:", user)
-            alias = f"U{len([k for k in id_map if k.startswith('U')]) + 1}"
-            id_map[alias] = user["id"]
+            alias = get_registry().assign("U", user["id"])
             print(f"Alias saved: {alias} -> {user['id']}")
 
 
@@ -57,38 +52,49 @@ def run_menu():
             reserve = float(input("Reserve price: "))
             start_in = int(input("Start in minutes from now: "))
             duration = int(input("Duration in minutes: "))
+            auction_type = input(f"Auction type ({', '.join(AUCTION_TYPES)}) [first_price]: ").strip() or "first_price"
+            units = int(input("Units [1]: ").strip() or 1) if auction_type in MULTI_UNIT_TYPES else 1
             creator_id = resolve_id(input("Creator user UUID: ").strip())
             start = datetime.now(timezone.utc) + timedelta(minutes=start_in)
             end = start + timedelta(minutes=duration)
-            auction = asvc.create(title, desc, reserve, start, end, creator_id)
+            auction = asvc.create(title, desc, reserve, start, end, creator_id, auction_type, units)
             print("Auction created:", auction)
-            alias = f"A{len([k for k in id_map if k.startswith('A')]) + 1}"
-            id_map[alias] = auction["id"]
+            alias = get_registry().assign("A", auction["id"])
             print(f"Alias saved: {alias} -> {auction['id']}")
 
 
         elif choice == "3":
-            auctions = asvc.list_open()
-            if not auctions:
-                print("No open auctions")
-            else:
-                for a in auctions:
+            query = input("Search title/description (blank for all): ").strip()
+            sort = input("Sort by (end_time, reserve_price, created_at, title; - for descending) [end_time]: ").strip() or "end_time"
+            page = 1
+            while True:
+                result = asvc.search(query, sort=sort, page=page, page_size=20)
+                for a in result["items"]:
                     print(f"{a['id']} | {a['title']} | Reserve={a['reserve_price']} | Ends={a['end_time']}")
+                if not result["total"]:
+                    print("No open auctions")
+                    break
+                print(f"Page {page}/{result['pages']} ({result['total']} auctions)")
+                if page >= result["pages"] or input("Enter for next page, q to stop: ").strip().lower() == "q":
+                    break
+                page += 1
 
         elif choice == "4":
             auction_id = resolve_id(input("Auction ID: ").strip())
             bidder_id = resolve_id(input("Bidder user UUID: ").strip())
-            commitment = input("Commitment (any string): ").strip()
+            amount = float(input("Bid amount (kept secret until reveal): "))
+            commitment, nonce = make_commitment(amount, bidder_id, auction_id)
             bid = bsvc.place_sealed(auction_id, bidder_id, commitment)
             print("Bid placed (sealed):", bid)
-            alias = f"B{len([k for k in id_map if k.startswith('B')]) + 1}"
-            id_map[alias] = bid["id"]
+            print(f"Keep this nonce, it is needed to reveal: {nonce}")
+            alias = get_registry().assign("B", bid["id"])
             print(f"Alias saved: {alias} -> {bid['id']}")
 
         elif choice == "5":
             bid_id = resolve_id(input("Bid ID: ").strip())
             amount = float(input("Reveal amount: "))
-            r = bsvc.reveal(bid_id, amount)
+            nonce = input("Nonce: ").strip()
+            r = bsvc.reveal(bid_id, amount, nonce)
             print("Bid revealed:", r)
 
         elif choice == "6":
@@ -119,7 +125,24 @@ def run_menu():
         else:
             print("Invalid choice, try again.")
 
-def main():
+# `python -m src <command> ...`: module whose main(argv) runs it; no command opens the menu
+COMMANDS = {
+    "scheduler": "src.services.scheduler",
+    "import-users": "src.services.user_import",
+    "export": "src.services.export",
+    "verify-audit": "src.services.audit_verify",
+    "simulate": "src.bench.simulate",
+    "reconcile": "src.services.reconcile",
+}
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in COMMANDS:
+        import importlib
+        return importlib.import_module(COMMANDS[argv[0]]).main(argv[1:])
+    if argv:
+        print(f"Unknown command {argv[0]!r}; available: {', '.join(COMMANDS)}")
+        return 2
     run_menu()
 
 if __name__ == "__main__":
@@ -1,19 +1,149 @@
 import os
+import sys
 from dotenv import load_dotenv
-from supabase import create_client, Client
-import streamlit as st
 
 # Load local .env if it exists
 load_dotenv()
 
-# Prefer Streamlit Cloud secrets if available
-SUPABASE_URL = os.getenv("SUPABASE_URL") or st.secrets.get("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY") or st.secrets.get("SUPABASE_KEY")
+# Storage backend behind the DAOs: "supabase" (default), "sqlite" or "memory"
+STORAGE_BACKEND = (os.getenv("STORAGE_BACKEND") or "supabase").lower()
+SQLITE_PATH = os.getenv("SQLITE_PATH") or "silent_bid.db"
 
-if not SUPABASE_URL or not SUPABASE_KEY:
-    raise RuntimeError(
-        "Missing Supabase credentials. Please set SUPABASE_URL and SUPABASE_KEY "
-        "in your .env file (for local) or Streamlit Cloud Secrets (for deployment)."
-    )
+# Read-through auction cache (entries, seconds); size 0 disables it
+AUCTION_CACHE_SIZE = int(os.getenv("AUCTION_CACHE_SIZE") or 10000)
+AUCTION_CACHE_TTL = float(os.getenv("AUCTION_CACHE_TTL") or 30)
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+# Shared read-view cache (auction reports) used by the Streamlit app (entries, seconds)
+VIEW_CACHE_SIZE = int(os.getenv("VIEW_CACHE_SIZE") or 1000)
+VIEW_CACHE_TTL = float(os.getenv("VIEW_CACHE_TTL") or 10)
+
+# Open-auction search index: full rebuild interval (seconds) to pick up other processes' writes
+SEARCH_REFRESH_SECONDS = float(os.getenv("SEARCH_REFRESH_SECONDS") or 300)
+
+# Short aliases (U1, A3, B12) for ids: stored in the "aliases" table of the storage backend,
+# or in a local SQLite file when ALIAS_STORE=sqlite; lookups cached up to ALIAS_CACHE_SIZE
+ALIAS_STORE = (os.getenv("ALIAS_STORE") or "backend").lower()
+ALIAS_SQLITE_PATH = os.getenv("ALIAS_SQLITE_PATH") or "silent_bid_aliases.db"
+ALIAS_CACHE_SIZE = int(os.getenv("ALIAS_CACHE_SIZE") or 10000)
+
+# Per-auction revealed-bid leaderboards kept in memory (top k, auctions, seconds)
+LEADERBOARD_K = int(os.getenv("LEADERBOARD_K") or 10)
+LEADERBOARD_SIZE = int(os.getenv("LEADERBOARD_SIZE") or 10000)
+LEADERBOARD_TTL = float(os.getenv("LEADERBOARD_TTL") or 30)
+
+# Rows per page for the streaming iter_* DAO methods, and whether to prefetch the next page
+PAGE_SIZE = int(os.getenv("PAGE_SIZE") or 500)
+PAGE_PREFETCH = (os.getenv("PAGE_PREFETCH") or "0").lower() in ("1", "true", "yes")
+
+# Worker threads used by the async DAOs on the embedded backends
+ASYNC_MAX_WORKERS = int(os.getenv("ASYNC_MAX_WORKERS") or 8)
+
+# Backend resilience: read attempts per query (1 = no retries), backoff base and cap in ms,
+# consecutive network failures that open the circuit breaker and seconds it stays open;
+# SINGLE_FLIGHT coalesces concurrent identical point reads into one backend call
+RETRY_ATTEMPTS = int(os.getenv("RETRY_ATTEMPTS") or 3)
+RETRY_BASE_MS = float(os.getenv("RETRY_BASE_MS") or 50)
+RETRY_MAX_MS = float(os.getenv("RETRY_MAX_MS") or 1000)
+BREAKER_FAILURES = int(os.getenv("BREAKER_FAILURES") or 5)
+BREAKER_RESET_SECONDS = float(os.getenv("BREAKER_RESET_SECONDS") or 10)
+SINGLE_FLIGHT = (os.getenv("SINGLE_FLIGHT") or "1").lower() not in ("0", "false", "no")
+
+# Per-query metrics around every backend round trip, and the slow-query log threshold
+METRICS_ENABLED = (os.getenv("METRICS_ENABLED") or "1").lower() not in ("0", "false", "no")
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS") or 500)
+
+# Audit logging: "sync" writes on the request path, "async" queues entries
+# for a background writer (batch size, flush seconds, queue bound, spill file),
+# "chained" appends to hash-chained local segments first and mirrors through the queue
+AUDIT_MODE = (os.getenv("AUDIT_MODE") or "sync").lower()
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE") or 200)
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL") or 1.0)
+AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE") or 10000)
+AUDIT_SPILL_PATH = os.getenv("AUDIT_SPILL_PATH") or None
+AUDIT_CHAIN_DIR = os.getenv("AUDIT_CHAIN_DIR") or "audit_chain"
+AUDIT_SEGMENT_ENTRIES = int(os.getenv("AUDIT_SEGMENT_ENTRIES") or 100000)
+AUDIT_CHAIN_FSYNC = (os.getenv("AUDIT_CHAIN_FSYNC") or "1").lower() not in ("0", "false", "no")
+# verify-audit checkpoint; never inside AUDIT_CHAIN_DIR, where whoever can edit segments could edit it too
+AUDIT_VERIFY_CHECKPOINT = os.getenv("AUDIT_VERIFY_CHECKPOINT") or "audit-verify-checkpoint.json"
+
+# Bid acceptance: "sync" inserts the bid and its audit row on the request path; "journal"
+# fsyncs it to a local write-ahead journal (one process per directory) and replicates
+# to the backend in the background (bids per batch, flush seconds, fsync on/off)
+BID_ACCEPT_MODE = (os.getenv("BID_ACCEPT_MODE") or "sync").lower()
+BID_JOURNAL_DIR = os.getenv("BID_JOURNAL_DIR") or "bid_journal"
+BID_JOURNAL_BATCH_SIZE = int(os.getenv("BID_JOURNAL_BATCH_SIZE") or 500)
+BID_JOURNAL_FLUSH_INTERVAL = float(os.getenv("BID_JOURNAL_FLUSH_INTERVAL") or 0.2)
+BID_JOURNAL_FSYNC = (os.getenv("BID_JOURNAL_FSYNC") or "1").lower() not in ("0", "false", "no")
+
+# Auto-close scheduler: seconds after end_time before winners are declared (reveal window),
+# auctions per close batch, settlement workers, idle poll seconds, leader lock file,
+# how far back (hours) a restarted scheduler looks for closed but unsettled auctions, and how far
+# (seconds) each poll for new auctions re-reads before the newest one seen, for rows committed late
+REVEAL_GRACE_SECONDS = float(os.getenv("REVEAL_GRACE_SECONDS") or 300)
+SCHEDULER_BATCH_SIZE = int(os.getenv("SCHEDULER_BATCH_SIZE") or 200)
+SCHEDULER_WORKERS = int(os.getenv("SCHEDULER_WORKERS") or 4)
+SCHEDULER_POLL_SECONDS = float(os.getenv("SCHEDULER_POLL_SECONDS") or 30)
+SCHEDULER_LOCK_PATH = os.getenv("SCHEDULER_LOCK_PATH") or "silent_bid_scheduler.lock"
+SCHEDULER_RECOVERY_HOURS = float(os.getenv("SCHEDULER_RECOVERY_HOURS") or 24)
+SCHEDULER_POLL_OVERLAP_SECONDS = float(os.getenv("SCHEDULER_POLL_OVERLAP_SECONDS") or 300)
+
+# Bulk reveals: commitment checks move to a process pool of REVEAL_WORKERS once a
+# batch has at least REVEAL_PARALLEL_MIN reveals
+REVEAL_WORKERS = int(os.getenv("REVEAL_WORKERS") or os.cpu_count() or 1)
+REVEAL_PARALLEL_MIN = int(os.getenv("REVEAL_PARALLEL_MIN") or 5000)
+
+# Analytics export (python -m src export): output directory, file format
+# (auto = parquet when pyarrow is installed, else csv) and rows buffered per written batch
+EXPORT_DIR = os.getenv("EXPORT_DIR") or "exports"
+EXPORT_FORMAT = os.getenv("EXPORT_FORMAT") or "auto"
+EXPORT_BATCH_ROWS = int(os.getenv("EXPORT_BATCH_ROWS") or 50000)
+# incremental exports re-read this far behind the last exported row, for rows committed late
+# (audit rows queued by the write-behind sink, journaled bids) and rows changed soon after insert
+EXPORT_OVERLAP_SECONDS = float(os.getenv("EXPORT_OVERLAP_SECONDS") or 300)
+
+
+# Payment reconciliation (python -m src reconcile): watermark file for incremental runs,
+# how far before the watermark the next run starts (rows written late, e.g. through the
+# audit queue), and rows held in memory before join partitions spill to disk
+RECONCILE_STATE_PATH = os.getenv("RECONCILE_STATE_PATH") or "reconcile-state.json"
+RECONCILE_OVERLAP_SECONDS = float(os.getenv("RECONCILE_OVERLAP_SECONDS") or 600)
+RECONCILE_MEMORY_ROWS = int(os.getenv("RECONCILE_MEMORY_ROWS") or 500000)
+
+
+def secret(name: str):
+    """Environment first, then Streamlit Cloud secrets - but only when the
+    process is already running under Streamlit, so CLI and batch runs never
+    import it."""
+    value = os.getenv(name)
+    if value:
+        return value
+    st = sys.modules.get("streamlit")
+    if st is None:
+        return None
+    try:
+        return st.secrets.get(name)
+    except Exception:
+        return None
+
+
+def _supabase_credentials():
+    url, key = secret("SUPABASE_URL"), secret("SUPABASE_KEY")
+    if not url or not key:
+        raise RuntimeError(
+            "Missing Supabase credentials. Please set SUPABASE_URL and SUPABASE_KEY "
+            "in your .env file (for local) or Streamlit Cloud Secrets (for deployment)."
+        )
+    return url, key
+
+
+def create_supabase_client():
+    # imported here: the supabase SDK is slow to import and only needed on first use
+    from supabase import create_client
+
+    return create_client(*_supabase_credentials())
+
+
+async def create_async_supabase_client():
+    from supabase import acreate_client
+
+    return await acreate_client(*_supabase_credentials())
@@ -0,0 +1,35 @@
+# src/dao/alias_dao.py
+from typing import Dict, Iterable, List, Optional
+from .supabase_client import get_client
+
+
+class AliasDAO:
+    def __init__(self, backend=None):
+        # backend: a dedicated store (e.g. a local SQLiteBackend); defaults to the shared client
+        self.sb = backend or get_client()
+
+    def create(self, alias: str, prefix: str, seq: int, target_id: str) -> Optional[Dict]:
+        # None when the alias is already taken (another process got there first)
+        resp = (self.sb.table("aliases").upsert({"id": alias, "prefix": prefix, "seq": seq, "target_id": target_id},
+                                                on_conflict="id", ignore_duplicates=True).execute())
+        return resp.data[0] if resp.data else None
+
+    def get(self, alias: str) -> Optional[Dict]:
+        resp = self.sb.table("aliases").select("*").eq("id", alias).limit(1).execute()
+        return resp.data[0] if resp.data else None
+
+    def get_by_target(self, target_id: str) -> Optional[Dict]:
+        resp = self.sb.table("aliases").select("*").eq("target_id", target_id).limit(1).execute()
+        return resp.data[0] if resp.data else None
+
+    def get_by_targets(self, target_ids: Iterable[str], chunk_size: int = 500) -> List[Dict]:
+        ids = list(dict.fromkeys(target_ids))
+        rows = []
+        for i in range(0, len(ids), chunk_size):
+            rows += self.sb.table("aliases").select("*").in_("target_id", ids[i:i + chunk_size]).execute().data
+        return rows
+
+    def max_seq(self, prefix: str) -> int:
+        # served by the (prefix, seq) index
+        resp = self.sb.table("aliases").select("seq").eq("prefix", prefix).order("seq", desc=True).limit(1).execute()
+        return int(resp.data[0]["seq"]) if resp.data else 0
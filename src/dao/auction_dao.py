@@ -1,27 +1,145 @@
 # src/dao/auction_dao.py
-from typing import Dict, Optional, List
-from .supabase_client import get_client
+from typing import Dict, Iterable, Iterator, Optional, List
+from src.config import AUCTION_CACHE_SIZE, AUCTION_CACHE_TTL, PAGE_SIZE, PAGE_PREFETCH
+from src.models import Auction
+from .cache import TTLCache
+from .pagination import iter_keyset
+from .singleflight import async_reads, reads
+from .supabase_client import get_client, get_async_client
+
+
+# shared by every AuctionDAO in the process so writes invalidate for all readers
+_cache = TTLCache(AUCTION_CACHE_SIZE, AUCTION_CACHE_TTL)
+
 
 class AuctionDAO:
     def __init__(self):
         self.sb = get_client()
+        self.cache = _cache
 
     def create(self, payload: Dict) -> Dict:
         resp = self.sb.table("auctions").insert(payload).execute()
-    
+        self.cache.invalidate(resp.data[0]["id"])
         return resp.data[0]
 
     def get(self, auction_id: str) -> Optional[Dict]:
+        record = self.get_record(auction_id)
+        return record.to_dict() if record else None
+
+    def get_record(self, auction_id: str) -> Optional[Auction]:
+        record = self.cache.get(auction_id)
+        if record is None:
+            # concurrent misses for one auction (e.g. a burst of bids near its close) share one query
+            record = reads.do(f"auctions:{auction_id}", lambda: self._fetch_record(auction_id))
+        return record
+
+    def _fetch_record(self, auction_id: str) -> Optional[Auction]:
         resp = self.sb.table("auctions").select("*").eq("id", auction_id).limit(1).execute()
+        if not resp.data:
+            return None
+        record = Auction.from_row(resp.data[0])
+        self.cache.set(auction_id, record)
+        return record
+
+    def get_records(self, auction_ids: Iterable[str], chunk_size: int = 500) -> Dict[str, Auction]:
+        found = {}
+        missing = []
+        for auction_id in dict.fromkeys(auction_ids):
+            record = self.cache.get(auction_id)
+            if record is None:
+                missing.append(auction_id)
+            else:
+                found[auction_id] = record
+        for i in range(0, len(missing), chunk_size):
+            resp = self.sb.table("auctions").select("*").in_("id", missing[i:i + chunk_size]).execute()
+            for a in resp.data:
+                record = Auction.from_row(a)
+                self.cache.set(a["id"], record)
+                found[a["id"]] = record
+        return found
 
-        return resp.data[0] if resp.data else None
+    def get_many(self, auction_ids: Iterable[str], chunk_size: int = 500) -> Dict[str, Dict]:
+        return {k: r.to_dict() for k, r in self.get_records(auction_ids, chunk_size).items()}
 
     def list_open(self) -> List[Dict]:
         resp = self.sb.table("auctions").select("*").eq("is_closed", False).execute()
-    
+
         return resp.data
 
+    def iter_open(self, page_size: int = PAGE_SIZE, prefetch: bool = PAGE_PREFETCH,
+                  created_since: Optional[str] = None) -> Iterator[Dict]:
+        def query():
+            q = self.sb.table("auctions").select("*").eq("is_closed", False)
+            return q.gte("created_at", created_since) if created_since else q
+        return iter_keyset(query, page_size, prefetch)
+
     def close(self, auction_id: str) -> Dict:
         resp = self.sb.table("auctions").update({"is_closed": True}).eq("id", auction_id).execute()
-        
+        self.cache.invalidate(auction_id)
+        return resp.data[0]
+
+    def close_many(self, auction_ids: Iterable[str], chunk_size: int = 500) -> List[Dict]:
+        """Close many auctions in chunked bulk updates. Only rows that were still
+        open are returned, so a caller racing another closer sees each auction once."""
+        ids = list(dict.fromkeys(auction_ids))
+        closed = []
+        for i in range(0, len(ids), chunk_size):
+            chunk = ids[i:i + chunk_size]
+            resp = self.sb.table("auctions").update({"is_closed": True}).in_("id", chunk).eq("is_closed", False).execute()
+            closed.extend(resp.data)
+            for auction_id in chunk:
+                self.cache.invalidate(auction_id)
+        return closed
+
+    def iter_closed(self, page_size: int = PAGE_SIZE, prefetch: bool = PAGE_PREFETCH) -> Iterator[Dict]:
+        return iter_keyset(lambda: self.sb.table("auctions").select("*").eq("is_closed", True), page_size, prefetch)
+
+    def iter_closed_since(self, since: str, page_size: int = PAGE_SIZE) -> Iterator[Dict]:
+        """Closed auctions whose end_time is at or after `since` (ISO timestamp)."""
+        return iter_keyset(
+            lambda: self.sb.table("auctions").select("*").eq("is_closed", True).gte("end_time", since), page_size)
+
+    @staticmethod
+    def cache_stats() -> Dict:
+        return _cache.stats()
+
+
+class AsyncAuctionDAO:
+    """Async counterpart of AuctionDAO; shares its record cache."""
+
+    def __init__(self):
+        self.sb = get_async_client()
+        self.cache = _cache
+
+    async def create(self, payload: Dict) -> Dict:
+        resp = await self.sb.table("auctions").insert(payload).execute()
+        self.cache.invalidate(resp.data[0]["id"])
+        return resp.data[0]
+
+    async def get(self, auction_id: str) -> Optional[Dict]:
+        record = await self.get_record(auction_id)
+        return record.to_dict() if record else None
+
+    async def get_record(self, auction_id: str) -> Optional[Auction]:
+        record = self.cache.get(auction_id)
+        if record is None:
+            record = await async_reads.do(f"auctions:{auction_id}", lambda: self._fetch_record(auction_id))
+        return record
+
+    async def _fetch_record(self, auction_id: str) -> Optional[Auction]:
+        resp = await self.sb.table("auctions").select("*").eq("id", auction_id).limit(1).execute()
+        if not resp.data:
+            return None
+        record = Auction.from_row(resp.data[0])
+        self.cache.set(auction_id, record)
+        return record
+
+    async def list_open(self) -> List[Dict]:
+        resp = await self.sb.table("auctions").select("*").eq("is_closed", False).execute()
+
+        return resp.data
+
+    async def close(self, auction_id: str) -> Dict:
+        resp = await self.sb.table("auctions").update({"is_closed": True}).eq("id", auction_id).execute()
+        self.cache.invalidate(auction_id)
         return resp.data[0]
@@ -0,0 +1,227 @@
+# src/dao/audit_chain.py
+"""Append-only, hash-chained audit segments on local disk.
+
+Each entry is one line, `<hash> <body>\\n`. The body is compact JSON that
+starts with the entry's sequence number: {"seq":N,"created_at":...,
+"entity":...,"entity_id":...,"action":...,"details":...}. Its hash is
+sha256(previous hash + body), so editing, dropping or reordering any entry
+breaks every hash after it. The chain starts from GENESIS.
+
+Entries go into numbered segment files of up to `segment_entries` entries.
+Each segment begins with a header line, `#{"first_seq":N,"prev":"<hash>"}`,
+which records the hash the segment continues from. That lets each segment be
+verified on its own, in parallel, and the segments then be linked end to end
+(see src.services.audit_verify).
+
+Appends from several threads or processes are serialised with an flock on
+`<dir>/.lock`. Each batch is written with a single write and fsynced before
+append_many returns."""
+import fcntl
+import hashlib
+import json
+import os
+import re
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple
+
+GENESIS = "0" * 64
+
+_SEGMENT_RE = re.compile(r"^segment-(\d{8})\.log$")
+
+
+def segment_name(number: int) -> str:
+    return f"segment-{number:08d}.log"
+
+
+def list_segments(directory: str) -> List[str]:
+    """Segment paths in chain order."""
+    if not os.path.isdir(directory):
+        return []
+    names = sorted(n for n in os.listdir(directory) if _SEGMENT_RE.match(n))
+    return [os.path.join(directory, n) for n in names]
+
+
+def entry_hash(prev: str, body: bytes) -> str:
+    return hashlib.sha256(prev.encode() + body).hexdigest()
+
+
+def encode_body(seq: int, entry: Dict) -> Tuple[Dict, bytes]:
+    body = {
+        "seq": seq,
+        "created_at": entry.get("created_at") or datetime.now(timezone.utc).isoformat(),
+        "entity": entry["entity"],
+        "entity_id": entry["entity_id"],
+        "action": entry["action"],
+        "details": entry.get("details") or {},
+    }
+    return body, json.dumps(body, separators=(",", ":"), default=str).encode()
+
+
+def header(first_seq: int, prev: str) -> bytes:
+    return b"#" + json.dumps({"first_seq": first_seq, "prev": prev}, separators=(",", ":")).encode() + b"\n"
+
+
+def parse_header(line: bytes) -> Tuple[int, str]:
+    if not line.startswith(b"#"):
+        raise ValueError("missing segment header")
+    h = json.loads(line[1:])
+    return int(h["first_seq"]), h["prev"]
+
+
+class AuditChain:
+    def __init__(self, directory: str, segment_entries: int = 100000, fsync: bool = True):
+        self.directory = directory
+        self.segment_entries = segment_entries
+        self.fsync = fsync
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._lock_file = open(os.path.join(directory, ".lock"), "a+")
+        # tail of the chain as last seen: current segment number, its first seq
+        # and size, and the last seq and hash
+        self._segment = 0
+        self._first_seq = 1
+        self._size = -1
+        self.last_seq = 0
+        self.last_hash = GENESIS
+
+    # --- tail ---
+
+    def _path(self, number: int) -> str:
+        return os.path.join(self.directory, segment_name(number))
+
+    def _load_tail(self) -> None:
+        segments = list_segments(self.directory)
+        if not segments:
+            self._segment, self._first_seq, self._size = 0, 1, -1
+            self.last_seq, self.last_hash = 0, GENESIS
+            return
+        path = segments[-1]
+        self._segment = int(_SEGMENT_RE.match(os.path.basename(path)).group(1))
+        with open(path, "rb+") as f:
+            first = f.readline()
+            if not first.endswith(b"\n"):
+                # crash while starting this segment: nothing in it was acknowledged
+                f.close()
+                os.remove(path)
+                return self._load_tail()
+            self._first_seq, prev = parse_header(first)
+            data_start = f.tell()
+            size = f.seek(0, os.SEEK_END)
+            # read backwards until the block holds the whole last line
+            pos, tail = size, b""
+            while pos > data_start and tail.count(b"\n") < 2:
+                step = min(65536, pos - data_start)
+                pos -= step
+                f.seek(pos)
+                tail = f.read(step) + tail
+            if tail and not tail.endswith(b"\n"):
+                # torn write from a crash: drop the partial line, it was never acknowledged
+                cut = len(tail) - tail.rfind(b"\n") - 1
+                size -= cut
+                f.truncate(size)
+                tail = tail[:len(tail) - cut]
+        self._size = size
+        if tail:
+            last = tail[:-1].rsplit(b"\n", 1)[-1]
+            self.last_hash = last[:64].decode()
+            self.last_seq = json.loads(last[65:])["seq"]
+        else:
+            self.last_hash, self.last_seq = prev, self._first_seq - 1
+
+    def _sync_tail(self) -> None:
+        # another process may have appended or started a new segment since we last looked
+        if self._size < 0 or os.path.exists(self._path(self._segment + 1)):
+            self._load_tail()
+            return
+        try:
+            size = os.path.getsize(self._path(self._segment))
+        except FileNotFoundError:
+            size = -1
+        if size != self._size:
+            self._load_tail()
+
+    # --- append ---
+
+    def append_many(self, entries: List[Dict]) -> List[Dict]:
+        """Chain and durably append entries (entity, entity_id, action, details,
+        optional created_at). Returns them with seq, hash and created_at set."""
+        if not entries:
+            return []
+        with self._lock:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            try:
+                self._sync_tail()
+                return self._append_locked(entries)
+            finally:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def append(self, entry: Dict) -> Dict:
+        return self.append_many([entry])[0]
+
+    def _append_locked(self, entries: List[Dict]) -> List[Dict]:
+        chained = []
+        writes: List[Tuple[int, bytearray]] = []  # (segment number, bytes)
+        segment, first_seq, size = self._segment, self._first_seq, self._size
+        seq, prev = self.last_seq, self.last_hash
+        buf = None
+        if segment and seq - first_seq + 1 < self.segment_entries:
+            buf = bytearray()
+            writes.append((segment, buf))
+        for entry in entries:
+            seq += 1
+            if buf is None or seq - first_seq >= self.segment_entries:
+                segment, first_seq = segment + 1, seq
+                buf = bytearray(header(seq, prev))
+                writes.append((segment, buf))
+            row, body = encode_body(seq, entry)
+            h = entry_hash(prev, body)
+            buf += h.encode() + b" " + body + b"\n"
+            prev = h
+            row["hash"] = h
+            chained.append(row)
+        for number, data in writes:
+            fd = os.open(self._path(number), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                view = memoryview(data)
+                while view:
+                    view = view[os.write(fd, view):]
+                if self.fsync:
+                    os.fsync(fd)
+            finally:
+                os.close(fd)
+            size = (self._size if number == self._segment else 0) + len(data)
+        if self.fsync and writes[-1][0] != self._segment:
+            dir_fd = os.open(self.directory, os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        self._segment, self._first_seq, self._size = segment, first_seq, size
+        self.last_seq, self.last_hash = seq, prev
+        return chained
+
+    def head(self) -> Dict:
+        with self._lock:
+            fcntl.flock(self._lock_file, fcntl.LOCK_SH)
+            try:
+                self._sync_tail()
+            finally:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+            return {"seq": self.last_seq, "hash": self.last_hash, "segment": self._segment}
+
+    def close(self) -> None:
+        self._lock_file.close()
+
+
+_chains: Dict[str, AuditChain] = {}
+_chains_lock = threading.Lock()
+
+
+def get_chain(directory: str, segment_entries: int = 100000, fsync: bool = True) -> AuditChain:
+    """One AuditChain per directory in this process."""
+    with _chains_lock:
+        chain = _chains.get(directory)
+        if chain is None:
+            chain = _chains[directory] = AuditChain(directory, segment_entries, fsync)
+        return chain
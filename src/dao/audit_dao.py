@@ -1,17 +1,164 @@
 # src/dao/audit_dao.py
-from typing import Dict
-from .supabase_client import get_client
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+from src.config import (PAGE_SIZE, PAGE_PREFETCH, AUDIT_MODE, AUDIT_BATCH_SIZE, AUDIT_FLUSH_INTERVAL,
+                        AUDIT_QUEUE_SIZE, AUDIT_SPILL_PATH, AUDIT_CHAIN_DIR,
+                        AUDIT_SEGMENT_ENTRIES, AUDIT_CHAIN_FSYNC)
+from .audit_chain import get_chain
+from .audit_sink import AsyncAuditSink
+from .pagination import iter_keyset
+from .supabase_client import get_client, get_async_client
+
+_sink: Optional[AsyncAuditSink] = None
+_sink_lock = threading.Lock()
+
+
+def get_sink() -> AsyncAuditSink:
+    """Process-wide write-behind sink used when AUDIT_MODE=async."""
+    global _sink
+    if _sink is None:
+        with _sink_lock:
+            if _sink is None:
+                writer = AuditDAO(mode="sync")
+                _sink = AsyncAuditSink(writer.log_many, AUDIT_BATCH_SIZE, AUDIT_FLUSH_INTERVAL,
+                                       AUDIT_QUEUE_SIZE, AUDIT_SPILL_PATH)
+    return _sink
+
+
+def _entry(entity: str, entity_id: str, action: str, details: Dict) -> Dict:
+    return {
+        "entity": entity,
+        "entity_id": entity_id,
+        "action": action,
+        "details": details
+    }
+
+
+def _enqueue(entry: Dict) -> Dict:
+    # stamp now so the row keeps event time, not flush time
+    entry["created_at"] = datetime.now(timezone.utc).isoformat()
+    get_sink().put(entry)
+    return entry
+
+
+async def _enqueue_async(entries: List[Dict]) -> List[Dict]:
+    """_enqueue for the event loop: queue without blocking, and hand whatever does
+    not fit to a worker thread, where `put` may wait for room or write synchronously."""
+    sink = get_sink()
+    now = datetime.now(timezone.utc).isoformat()
+    full = []
+    for entry in entries:
+        entry["created_at"] = now
+        if full or not sink.put_nowait(entry):
+            full.append(entry)
+    if full:
+        import asyncio  # kept off the module import path
+
+        await asyncio.get_running_loop().run_in_executor(None, sink.put_many, full)
+    return entries
+
+
+def _chain(entries: List[Dict]) -> List[Dict]:
+    """AUDIT_MODE=chained: append to the local hash chain (durable on return),
+    then mirror to audit_log through the write-behind sink, with seq and hash."""
+    chained = get_chain(AUDIT_CHAIN_DIR, AUDIT_SEGMENT_ENTRIES, AUDIT_CHAIN_FSYNC).append_many(entries)
+    get_sink().put_many([dict(e) for e in chained])
+    return chained
+
+
+async def _chain_async(entries: List[Dict]) -> List[Dict]:
+    import asyncio  # kept off the module import path
+
+    # the append blocks on fsync: run it off the event loop
+    return await asyncio.get_running_loop().run_in_executor(None, _chain, entries)
+
 
 class AuditDAO:
-    def __init__(self):
+    def __init__(self, mode: Optional[str] = None):
         self.sb = get_client()
+        self.mode = mode or AUDIT_MODE
 
     def log(self, entity: str, entity_id: str, action: str, details: Dict) -> Dict:
-        resp = self.sb.table("audit_log").insert({
-            "entity": entity,
-            "entity_id": entity_id,
-            "action": action,
-            "details": details
-        }).execute()
-    
+        entry = _entry(entity, entity_id, action, details)
+        if self.mode == "chained":
+            return _chain([entry])[0]
+        if self.mode == "async":
+            return _enqueue(entry)
+        resp = self.sb.table("audit_log").insert(entry).execute()
+
+        return resp.data[0]
+
+    def log_many(self, entries: List[Dict], chunk_size: int = 500) -> List[Dict]:
+        # entries: dicts with entity, entity_id, action, details
+        if self.mode == "chained":
+            return _chain(entries)
+        if self.mode == "async":
+            now = datetime.now(timezone.utc).isoformat()
+            entries = [dict(e, created_at=e.get("created_at", now)) for e in entries]
+            get_sink().put_many(entries)
+            return entries
+        logged = []
+        for i in range(0, len(entries), chunk_size):
+            resp = self.sb.table("audit_log").insert(entries[i:i + chunk_size]).execute()
+            logged.extend(resp.data)
+        return logged
+
+    def entity_ids_with(self, entity: str, action: Union[str, Iterable[str]], entity_ids: List[str],
+                        chunk_size: int = 500) -> set:
+        """The subset of `entity_ids` that already have an `action` entry (any of
+        them, when `action` is a list)."""
+        found = set()
+        for i in range(0, len(entity_ids), chunk_size):
+            q = self.sb.table("audit_log").select("entity_id").eq("entity", entity)
+            q = q.eq("action", action) if isinstance(action, str) else q.in_("action", list(action))
+            resp = q.in_("entity_id", entity_ids[i:i + chunk_size]).execute()
+            found.update(r["entity_id"] for r in resp.data)
+        return found
+
+    def iter_entries(self, entity: str, action: str, since: Optional[str] = None, page_size: int = PAGE_SIZE,
+                     prefetch: bool = PAGE_PREFETCH) -> Iterator[Dict]:
+        """`action` entries created at or after `since` (all when None), in (created_at, id) order."""
+        def query():
+            q = self.sb.table("audit_log").select("*").eq("entity", entity).eq("action", action)
+            return q.gte("created_at", since) if since else q
+        return iter_keyset(query, page_size, prefetch)
+
+    def entries_for(self, entity: str, action: str, entity_ids: List[str], chunk_size: int = 500) -> List[Dict]:
+        entries = []
+        for i in range(0, len(entity_ids), chunk_size):
+            resp = (self.sb.table("audit_log").select("*").eq("entity", entity)
+                    .eq("action", action).in_("entity_id", entity_ids[i:i + chunk_size]).execute())
+            entries.extend(resp.data)
+        return entries
+
+    def flush(self) -> None:
+        if _sink is not None:
+            _sink.flush()
+
+
+class AsyncAuditDAO:
+    def __init__(self, mode: Optional[str] = None):
+        self.sb = get_async_client()
+        self.mode = mode or AUDIT_MODE
+
+    async def log(self, entity: str, entity_id: str, action: str, details: Dict) -> Dict:
+        entry = _entry(entity, entity_id, action, details)
+        if self.mode == "chained":
+            return (await _chain_async([entry]))[0]
+        if self.mode == "async":
+            return (await _enqueue_async([entry]))[0]
+        resp = await self.sb.table("audit_log").insert(entry).execute()
+
         return resp.data[0]
+
+    async def log_many(self, entries: List[Dict], chunk_size: int = 500) -> List[Dict]:
+        if self.mode == "chained":
+            return await _chain_async(entries)
+        if self.mode == "async":
+            return await _enqueue_async([dict(e) for e in entries])
+        logged = []
+        for i in range(0, len(entries), chunk_size):
+            resp = await self.sb.table("audit_log").insert(entries[i:i + chunk_size]).execute()
+            logged.extend(resp.data)
+        return logged
@@ -0,0 +1,189 @@
+# src/dao/audit_sink.py
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+log = logging.getLogger(__name__)
+
+
+class AsyncAuditSink:
+    """Write-behind audit logger. Entries are queued in memory and a background
+    thread writes them with `write_batch` once `batch_size` entries are waiting
+    or `flush_interval` seconds have passed. The queue is bounded: producers
+    block up to `put_timeout` seconds when it is full and then write their entry
+    synchronously. Batches that fail to write are appended to `spill_path`
+    (JSON lines) when set and replayed at start and after the next successful
+    write. A line that does not parse (a torn write from a crash mid-spill) is
+    moved to `<spill_path>.bad` instead of blocking the replay."""
+
+    def __init__(self, write_batch: Callable[[List[Dict]], object], batch_size: int = 200,
+                 flush_interval: float = 1.0, max_queue: int = 10000,
+                 spill_path: Optional[str] = None, put_timeout: Optional[float] = 5.0):
+        self._write = write_batch
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spill_path = spill_path
+        self.put_timeout = put_timeout
+        self._queue: "queue.Queue[Dict]" = queue.Queue(max_queue)
+        self._stop = threading.Event()
+        self._spill_lock = threading.Lock()
+        self._closed = False
+        self.written = 0
+        self.spilled = 0
+        self.replayed = 0
+        self.dropped = 0
+        self.sync_writes = 0
+        self._thread = threading.Thread(target=self._run, name="audit-sink", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def put(self, entry: Dict) -> None:
+        if self._closed:
+            self._write_now([entry])
+            return
+        try:
+            self._queue.put(entry, timeout=self.put_timeout)
+        except queue.Full:
+            # backpressure exhausted: keep the entry by writing it on the caller's thread
+            self.sync_writes += 1
+            self._write_now([entry])
+
+    def put_nowait(self, entry: Dict) -> bool:
+        """Queue without blocking. False when the queue is full or the sink is closed;
+        the caller then falls back to `put` off any thread that must not block."""
+        if self._closed:
+            return False
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            return False
+        return True
+
+    def put_many(self, entries: List[Dict]) -> None:
+        for entry in entries:
+            self.put(entry)
+
+    def flush(self) -> None:
+        """Block until every queued entry has been written (or spilled)."""
+        if self._thread.is_alive():
+            self._queue.join()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self.flush()
+        self._stop.set()
+        self._thread.join(timeout=self.flush_interval + 1)
+
+    def stats(self) -> Dict:
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "spilled": self.spilled,
+            "replayed": self.replayed,
+            "dropped": self.dropped,
+            "sync_writes": self.sync_writes,
+        }
+
+    # --- worker ---
+    def _run(self) -> None:
+        try:
+            self._replay_spill()  # left over from an earlier run
+        except Exception:
+            log.exception("audit spill replay at start failed")
+        while not self._stop.is_set():
+            batch = self._next_batch()
+            if batch:
+                try:
+                    self._write_now(batch)
+                except Exception:
+                    # the thread must outlive any one batch, or every put falls back to put_timeout
+                    log.exception("audit sink: unexpected error writing %d entries", len(batch))
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+
+    def _next_batch(self) -> List[Dict]:
+        batch: List[Dict] = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_now(self, batch: List[Dict]) -> None:
+        try:
+            self._write(batch)
+        except Exception as e:
+            log.warning("audit write of %d entries failed: %s", len(batch), e)
+            self._spill(batch)
+            return
+        self.written += len(batch)
+        self._replay_spill()
+
+    # --- spill file ---
+    def _spill(self, batch: List[Dict]) -> None:
+        if not self.spill_path:
+            self.dropped += len(batch)
+            return
+        with self._spill_lock, open(self.spill_path, "a", encoding="utf-8") as f:
+            for entry in batch:
+                f.write(json.dumps(entry, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.spilled += len(batch)
+
+    def _read_spill(self, path: str) -> List[Dict]:
+        entries, bad = [], []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    bad.append(line if line.endswith("\n") else line + "\n")
+        if bad:
+            log.warning("audit spill %s: %d unreadable lines moved to %s.bad", path, len(bad), self.spill_path)
+            with open(self.spill_path + ".bad", "a", encoding="utf-8") as f:
+                f.writelines(bad)
+        return entries
+
+    def _replay_spill(self) -> None:
+        if not self.spill_path:
+            return
+        replaying = self.spill_path + ".replay"
+        with self._spill_lock:
+            # a .replay file left by a crash mid-replay goes first, then the spill file
+            while os.path.exists(replaying) or os.path.exists(self.spill_path):
+                if not os.path.exists(replaying):
+                    os.replace(self.spill_path, replaying)
+                entries = self._read_spill(replaying)
+                i = 0
+                try:
+                    for i in range(0, len(entries), self.batch_size):
+                        self._write(entries[i:i + self.batch_size])
+                except Exception as e:
+                    log.warning("audit spill replay failed, keeping %s: %s", self.spill_path, e)
+                    # keep the unreplayed tail for the next attempt
+                    with open(self.spill_path, "a", encoding="utf-8") as f:
+                        for entry in entries[i:]:
+                            f.write(json.dumps(entry, default=str) + "\n")
+                        f.flush()
+                        os.fsync(f.fileno())
+                    os.remove(replaying)
+                    return
+                os.remove(replaying)
+                self.replayed += len(entries)
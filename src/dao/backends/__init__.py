@@ -0,0 +1,17 @@
+# src/dao/backends/__init__.py
+from .base import BackendError, Response, StorageBackend
+
+
+def create_backend(name: str, **options) -> StorageBackend:
+    """Build the storage backend named in config: supabase, sqlite or memory."""
+    name = (name or "supabase").lower()
+    if name == "supabase":
+        from .supabase_backend import SupabaseBackend
+        return SupabaseBackend(**options)
+    if name == "sqlite":
+        from .sqlite_backend import SQLiteBackend
+        return SQLiteBackend(**options)
+    if name == "memory":
+        from .sqlite_backend import MemoryBackend
+        return MemoryBackend()
+    raise BackendError(f"Unknown storage backend: {name}")
@@ -0,0 +1,148 @@
+# src/dao/backends/async_backend.py
+import asyncio
+import contextvars
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Tuple
+
+from src.config import METRICS_ENABLED
+from src.dao.metrics import metrics, payload_size
+from .base import WRITE_OPS, Response, StorageBackend
+
+
+class AsyncQuery:
+    """Records the Supabase-style chain (select/eq/order/...) and runs it on the
+    backend when `execute()` is awaited."""
+
+    def __init__(self, backend: "AsyncBackend", table: str):
+        self._backend = backend
+        self._table = table
+        self._calls: List[Tuple[str, tuple, dict]] = []
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def chain(*args, **kwargs):
+            self._calls.append((name, args, kwargs))
+            return self
+        return chain
+
+    async def execute(self) -> Response:
+        return await self._backend.run(self._table, self._calls)
+
+
+class AsyncBackend:
+    name = "async"
+
+    def table(self, name: str) -> AsyncQuery:
+        return AsyncQuery(self, name)
+
+    async def run(self, table: str, calls: List[Tuple[str, tuple, dict]]) -> Any:
+        raise NotImplementedError
+
+    @staticmethod
+    def _build(query, calls):
+        for name, args, kwargs in calls:
+            query = getattr(query, name)(*args, **kwargs)
+        return query
+
+
+class AsyncSupabaseBackend(AsyncBackend):
+    """Native async Supabase client; its HTTP connection pool is shared by all queries."""
+
+    name = "supabase"
+
+    def __init__(self):
+        self._client = None
+        self._lock = asyncio.Lock()
+
+    async def client(self):
+        if self._client is None:
+            async with self._lock:
+                if self._client is None:
+                    from src.config import create_async_supabase_client
+                    self._client = await create_async_supabase_client()
+        return self._client
+
+    async def run(self, table, calls):
+        client = await self.client()
+        if not METRICS_ENABLED:
+            return await self._build(client.table(table), calls).execute()
+        # the sync path is timed by InstrumentedBackend; the native async client is timed here
+        start = time.perf_counter()
+        op = next((name for name, _, _ in calls if name in WRITE_OPS), "select")
+        payload = next((args[0] for name, args, _ in calls if name in WRITE_OPS and args), None)
+        try:
+            resp = await self._build(client.table(table), calls).execute()
+        except Exception:
+            metrics.observe(table, op, (time.perf_counter() - start) * 1000.0,
+                            payload_bytes=payload_size(payload), error=True)
+            raise
+        metrics.observe(table, op, (time.perf_counter() - start) * 1000.0,
+                        len(resp.data or []), payload_size(payload))
+        return resp
+
+
+class AsyncThreadBackend(AsyncBackend):
+    """Adapts a blocking backend (the embedded engines) by running each query
+    on a bounded worker pool so the event loop never blocks on I/O."""
+
+    def __init__(self, backend: StorageBackend, max_workers: int = 8):
+        self.backend = backend
+        self.name = backend.name
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="async-db")
+
+    async def run(self, table, calls):
+        query = self._build(self.backend.table(table), calls)
+        # carry contextvars (request_context) into the worker thread
+        ctx = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(self._pool, ctx.run, query.execute)
+
+
+class AsyncResilientBackend(AsyncBackend):
+    """ResilientBackend for the native async client: the same circuit breaker
+    (pass the sync backend's, so both paths see one backend's health) and the
+    same read retries, sleeping with asyncio instead of blocking the loop."""
+
+    def __init__(self, inner: AsyncBackend, attempts: int = 3, base_ms: float = 50.0, max_ms: float = 1000.0,
+                 breaker=None):
+        from .resilient import CircuitBreaker
+
+        self.inner = inner
+        self.name = inner.name
+        self.attempts = max(1, attempts)
+        self.base_ms = base_ms
+        self.max_ms = max_ms
+        self.breaker = breaker or CircuitBreaker()
+        self.retries = 0
+        self.gave_up = 0
+
+    async def run(self, table, calls):
+        from .resilient import CircuitOpenError, is_transient
+
+        op = next((name for name, _, _ in calls if name in WRITE_OPS), "select")
+        attempts = self.attempts if op == "select" else 1
+        for attempt in range(attempts):
+            if not self.breaker.allow():
+                raise CircuitOpenError(f"backend unavailable (circuit open), {table}.{op} not sent")
+            try:
+                resp = await self.inner.run(table, calls)
+            except Exception as e:
+                if not is_transient(e):
+                    self.breaker.success()  # the backend answered
+                    raise
+                self.breaker.failure()
+                if attempt + 1 >= attempts:
+                    if attempts > 1:
+                        self.gave_up += 1
+                    raise
+                self.retries += 1
+                await asyncio.sleep(random.uniform(0, min(self.max_ms, self.base_ms * 2 ** attempt)) / 1000.0)
+                continue
+            self.breaker.success()
+            return resp
+
+    def stats(self):
+        return {"retries": self.retries, "gave_up": self.gave_up}
@@ -0,0 +1,70 @@
+# src/dao/backends/base.py
+from typing import Any, List, Optional
+
+
+class BackendError(Exception):
+    pass
+
+
+class UniqueViolation(BackendError):
+    """A write broke a unique index (the embedded backends' form of SQLSTATE 23505)."""
+
+
+def is_unique_violation(exc: BaseException) -> bool:
+    """True for a unique-index conflict from any backend: UniqueViolation from the
+    embedded ones, or a postgrest APIError carrying SQLSTATE 23505 from Supabase."""
+    return isinstance(exc, UniqueViolation) or getattr(exc, "code", None) == "23505"
+
+
+class Response:
+    """Result of an executed query, shaped like the Supabase APIResponse."""
+
+    def __init__(self, data: List[dict], count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+class StorageBackend:
+    """What the DAOs need from a store: `table(name)` returning a query builder
+    with the Supabase chaining API (select/insert/update/eq/order/limit/...)
+    that finishes with `.execute()`."""
+
+    name = "base"
+
+    def table(self, name: str) -> Any:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+WRITE_OPS = ("insert", "update", "upsert", "delete")
+
+
+class QueryProxy:
+    """Wraps another backend's query builder. Chain calls pass straight through
+    while the operation and write payload are noted; `.execute()` is handed to
+    `on_execute(proxy, run)` so wrappers can act around the real round trip."""
+
+    def __init__(self, table: str, query: Any, on_execute):
+        self.table = table
+        self.op = "select"
+        self.payload: Any = None
+        self._query = query
+        self._on_execute = on_execute
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._query, name)
+        if not callable(attr):
+            return attr
+
+        def chain(*args, **kwargs):
+            if name in WRITE_OPS:
+                self.op = name
+                self.payload = args[0] if args else kwargs.get("json")
+            self._query = attr(*args, **kwargs)
+            return self
+        return chain
+
+    def execute(self):
+        return self._on_execute(self, self._query.execute)
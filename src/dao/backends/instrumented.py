@@ -0,0 +1,37 @@
+# src/dao/backends/instrumented.py
+import time
+
+from src.dao.metrics import metrics, payload_size
+from .base import QueryProxy, StorageBackend
+
+
+def _rows(resp) -> int:
+    data = getattr(resp, "data", None)
+    return len(data) if isinstance(data, list) else int(data is not None)
+
+
+class InstrumentedBackend(StorageBackend):
+    """Times every `.execute()` of the wrapped backend and reports table,
+    operation, duration, rows returned and write payload size to `metrics`."""
+
+    def __init__(self, inner: StorageBackend):
+        self.inner = inner
+        self.name = inner.name
+
+    def table(self, name: str):
+        return QueryProxy(name, self.inner.table(name), self._execute)
+
+    def _execute(self, query: QueryProxy, run):
+        start = time.perf_counter()
+        try:
+            resp = run()
+        except Exception:
+            metrics.observe(query.table, query.op, (time.perf_counter() - start) * 1000.0,
+                            payload_bytes=payload_size(query.payload), error=True)
+            raise
+        metrics.observe(query.table, query.op, (time.perf_counter() - start) * 1000.0,
+                        _rows(resp), payload_size(query.payload))
+        return resp
+
+    def close(self) -> None:
+        self.inner.close()
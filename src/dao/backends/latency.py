@@ -0,0 +1,48 @@
+# src/dao/backends/latency.py
+import random
+import threading
+import time
+from collections import Counter
+from typing import Dict
+
+from .base import QueryProxy, StorageBackend
+
+
+class LatencyBackend(StorageBackend):
+    """Local stand-in for a remote backend: wraps another backend (normally the
+    in-memory engine), sleeps `latency_ms` +/- `jitter_ms` per `.execute()` to
+    mimic a network round trip, and counts round trips per (table, operation)."""
+
+    def __init__(self, inner: StorageBackend, latency_ms: float = 0.0, jitter_ms: float = 0.0, seed=None):
+        self.inner = inner
+        self.name = f"{inner.name}+latency"
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.counts: Counter = Counter()
+
+    def table(self, name: str):
+        return QueryProxy(name, self.inner.table(name), self._execute)
+
+    def _execute(self, query: QueryProxy, run):
+        self.round_trip(query.table, query.op)
+        return run()
+
+    def round_trip(self, table: str, op: str) -> None:
+        with self._lock:
+            self.counts[(table, op)] += 1
+            delay = self.latency_ms + (self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+
+    def total_round_trips(self) -> int:
+        with self._lock:
+            return sum(self.counts.values())
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {f"{t}.{op}": n for (t, op), n in sorted(self.counts.items())}
+
+    def close(self) -> None:
+        self.inner.close()
@@ -0,0 +1,136 @@
+# src/dao/backends/resilient.py
+import random
+import threading
+import time
+from typing import Dict, Optional
+
+from .base import BackendError, QueryProxy, StorageBackend
+
+
+class CircuitOpenError(BackendError):
+    """Raised without calling the backend while the circuit breaker is open."""
+
+
+def http_status(exc: BaseException) -> Optional[int]:
+    """HTTP status behind a backend error, if it carries one: httpx's
+    HTTPStatusError has `response.status_code`; postgrest's APIError puts the
+    status in `code` when the gateway's reply was not a PostgREST error body
+    (PostgREST's own codes are SQLSTATEs or PGRSTnnn, never three digits)."""
+    for status in (getattr(exc, "status_code", None), getattr(getattr(exc, "response", None), "status_code", None),
+                   getattr(exc, "code", None)):
+        if isinstance(status, int) or (isinstance(status, str) and len(status) == 3 and status.isdigit()):
+            return int(status)
+    return None
+
+
+def is_transient(exc: BaseException) -> bool:
+    """Failures worth retrying: socket/timeout errors, httpx transport errors
+    (what supabase-py raises when the API is unreachable), and 5xx or 429
+    replies from a degraded or throttling backend. Query errors the backend
+    reported are not - retrying cannot fix them."""
+    if isinstance(exc, OSError):
+        return True
+    if any(cls.__name__ in ("TransportError", "TimeoutException") and cls.__module__.startswith("httpx")
+           for cls in type(exc).__mro__):
+        return True
+    status = http_status(exc)
+    return status is not None and (status == 429 or 500 <= status <= 599)
+
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive transient failures and fails
+    fast for `reset_seconds`; then lets one probe through (half-open) and
+    closes again on its success."""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 10.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.opens = 0
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and self._clock() - self.opened_at >= self.reset_seconds:
+                self.state = self.HALF_OPEN
+                return True
+            self.rejected += 1
+            return False
+
+    def success(self) -> None:
+        with self._lock:
+            self.state, self.failures = self.CLOSED, 0
+
+    def failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.opens += 1
+                self.state, self.opened_at = self.OPEN, self._clock()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"state": self.state, "consecutive_failures": self.failures,
+                    "opens": self.opens, "rejected": self.rejected}
+
+
+class ResilientBackend(StorageBackend):
+    """Wraps `.execute()` of another backend with a circuit breaker and, for
+    reads, bounded retries with full-jitter exponential backoff. Writes are
+    not retried: an insert that timed out may still have been applied."""
+
+    def __init__(self, inner: StorageBackend, attempts: int = 3, base_ms: float = 50.0, max_ms: float = 1000.0,
+                 breaker: Optional[CircuitBreaker] = None, sleep=time.sleep):
+        self.inner = inner
+        self.name = inner.name
+        self.attempts = max(1, attempts)
+        self.base_ms = base_ms
+        self.max_ms = max_ms
+        self.breaker = breaker or CircuitBreaker()
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.gave_up = 0
+
+    def table(self, name: str):
+        return QueryProxy(name, self.inner.table(name), self._execute)
+
+    def _execute(self, query: QueryProxy, run):
+        attempts = self.attempts if query.op == "select" else 1
+        for attempt in range(attempts):
+            if not self.breaker.allow():
+                raise CircuitOpenError(f"backend unavailable (circuit open), {query.table}.{query.op} not sent")
+            try:
+                resp = run()
+            except Exception as e:
+                if not is_transient(e):
+                    self.breaker.success()  # the backend answered
+                    raise
+                self.breaker.failure()
+                if attempt + 1 >= attempts:
+                    if attempts > 1:
+                        with self._lock:
+                            self.gave_up += 1
+                    raise
+                with self._lock:
+                    self.retries += 1
+                self._sleep(random.uniform(0, min(self.max_ms, self.base_ms * 2 ** attempt)) / 1000.0)
+                continue
+            self.breaker.success()
+            return resp
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return dict(self.breaker.stats(), retries=self.retries, gave_up=self.gave_up)
+
+    def close(self) -> None:
+        self.inner.close()
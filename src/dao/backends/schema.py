@@ -0,0 +1,106 @@
+# src/dao/backends/schema.py
+# Table layout shared by the embedded backends. Mirrors the Supabase tables.
+
+TABLES = {
+    "users": {
+        "id": "uuid",
+        "name": "text",
+        "email": "text",
+        "created_at": "timestamp",
+    },
+    "auctions": {
+        "id": "uuid",
+        "title": "text",
+        "description": "text",
+        "reserve_price": "numeric",
+        "start_time": "timestamp",
+        "end_time": "timestamp",
+        "created_by": "uuid",
+        "is_closed": "bool",
+        "auction_type": "text",
+        "units": "int",
+        "created_at": "timestamp",
+    },
+    "bids": {
+        "id": "uuid",
+        "auction_id": "uuid",
+        "bidder_id": "uuid",
+        "commitment": "text",
+        "amount": "numeric",
+        "revealed": "bool",
+        "created_at": "timestamp",
+    },
+    "payments": {
+        "id": "uuid",
+        "auction_id": "uuid",
+        "bid_id": "uuid",
+        "payer_id": "uuid",
+        "amount_paid": "numeric",
+        "created_at": "timestamp",
+    },
+    "aliases": {
+        "id": "text",
+        "prefix": "text",
+        "seq": "int",
+        "target_id": "text",
+        "created_at": "timestamp",
+    },
+    "audit_log": {
+        "id": "uuid",
+        "entity": "text",
+        "entity_id": "text",
+        "action": "text",
+        "details": "json",
+        "seq": "int",
+        "hash": "text",
+        "created_at": "timestamp",
+    },
+}
+
+# column defaults applied on insert when the payload leaves them out
+DEFAULTS = {
+    "auctions": {"is_closed": False, "auction_type": "first_price", "units": 1},
+    "bids": {"revealed": False},
+}
+
+INDEXES = [
+    "CREATE UNIQUE INDEX IF NOT EXISTS users_email_idx ON users(email)",
+    "CREATE INDEX IF NOT EXISTS auctions_open_idx ON auctions(is_closed, end_time)",
+    "CREATE INDEX IF NOT EXISTS auctions_open_keyset_idx ON auctions(is_closed, created_at, id)",
+    "CREATE INDEX IF NOT EXISTS users_keyset_idx ON users(created_at, id)",
+    "CREATE INDEX IF NOT EXISTS bids_auction_keyset_idx ON bids(auction_id, created_at, id)",
+    "CREATE INDEX IF NOT EXISTS bids_auction_revealed_amount_idx ON bids(auction_id, revealed, amount)",
+    "CREATE INDEX IF NOT EXISTS payments_auction_idx ON payments(auction_id)",
+    "CREATE INDEX IF NOT EXISTS payments_keyset_idx ON payments(created_at, id)",
+    "CREATE INDEX IF NOT EXISTS audit_log_entity_idx ON audit_log(entity, entity_id)",
+    "CREATE INDEX IF NOT EXISTS audit_log_action_keyset_idx ON audit_log(entity, action, created_at, id)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS aliases_target_idx ON aliases(target_id)",
+    "CREATE INDEX IF NOT EXISTS aliases_prefix_seq_idx ON aliases(prefix, seq)",
+]
+
+_SQL_TYPES = {
+    "uuid": "TEXT",
+    "text": "TEXT",
+    # exact decimal text; NUMERIC affinity would turn "10.10" into the REAL 10.1. The "decimal"
+    # collation (registered by the backend) makes comparisons, ORDER BY and indexes numeric
+    "numeric": "TEXT COLLATE decimal",
+    "int": "INTEGER",
+    "bool": "INTEGER",
+    "timestamp": "TEXT",
+    "json": "TEXT",
+}
+
+
+def column_ddl(col: str, kind: str) -> str:
+    sql = f'"{col}" {_SQL_TYPES[kind]}'
+    if col == "id":
+        sql += " PRIMARY KEY"
+    return sql
+
+
+def ddl():
+    stmts = []
+    for table, cols in TABLES.items():
+        parts = [column_ddl(col, kind) for col, kind in cols.items()]
+        stmts.append(f'CREATE TABLE IF NOT EXISTS "{table}" ({", ".join(parts)})')
+    return stmts + INDEXES
@@ -0,0 +1,418 @@
+# src/dao/backends/sqlite_backend.py
+import json
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, Optional
+
+from .base import BackendError, Response, StorageBackend, UniqueViolation
+from .schema import DEFAULTS, INDEXES, TABLES, column_ddl, ddl
+
+# stay below SQLITE_MAX_VARIABLE_NUMBER on older sqlite builds
+_MAX_VARS = 900
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="microseconds")
+
+
+def _timestamp(value: Any) -> str:
+    # store every timestamp as UTC with microseconds so text order == time order
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat(timespec="microseconds")
+
+
+def _encode(kind: str, value: Any) -> Any:
+    if value is None:
+        return None
+    if kind == "bool":
+        return int(bool(value))
+    if kind == "json":
+        return json.dumps(value)
+    if kind == "numeric" and not isinstance(value, str):
+        return str(value)
+    if kind == "timestamp":
+        return _timestamp(value)
+    return value
+
+
+def _decode(kind: str, value: Any) -> Any:
+    if value is None:
+        return None
+    if kind == "bool":
+        return bool(value)
+    if kind == "json":
+        return json.loads(value)
+    if kind == "numeric":
+        return Decimal(value) if isinstance(value, str) else Decimal(str(value))
+    return value
+
+
+def _compare_decimal(a: str, b: str) -> int:
+    """The "decimal" collation: numeric order for money columns stored as text."""
+    try:
+        x, y = Decimal(a), Decimal(b)
+    except InvalidOperation:
+        x, y = a, b
+    return (x > y) - (x < y)
+
+
+def _split_top(filters: str) -> List[str]:
+    # split on commas that are outside parentheses and double quotes
+    terms, depth, quoted, start = [], 0, False, 0
+    for i, ch in enumerate(filters):
+        if ch == '"':
+            quoted = not quoted
+        elif not quoted and ch == "(":
+            depth += 1
+        elif not quoted and ch == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and ch == ",":
+            terms.append(filters[start:i].strip())
+            start = i + 1
+    terms.append(filters[start:].strip())
+    return [t for t in terms if t]
+
+
+def _chunks(items: List, size: int = _MAX_VARS):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class SQLiteQuery:
+    """Query builder implementing the subset of the Supabase/PostgREST chaining
+    API used by the DAOs, compiled to SQL against the embedded database."""
+
+    def __init__(self, backend: "SQLiteBackend", table: str):
+        if table not in TABLES:
+            raise BackendError(f"Unknown table: {table}")
+        self._db = backend
+        self._table = table
+        self._kinds = TABLES[table]
+        self._op = "select"
+        self._columns = list(self._kinds)
+        self._payload: Any = None
+        self._where: List[str] = []
+        self._params: List[Any] = []
+        self._order: List[str] = []
+        self._limit: Optional[int] = None
+        self._offset = 0
+        self._count: Optional[str] = None
+        self._on_conflict = "id"
+        self._ignore_duplicates = False
+
+    def _col(self, name: str) -> str:
+        if name not in self._kinds:
+            raise BackendError(f"Unknown column: {self._table}.{name}")
+        return f'"{name}"'
+
+    # --- operations ---
+    def select(self, columns: str = "*", count: Optional[str] = None):
+        if columns.strip() != "*":
+            self._columns = [c.strip() for c in columns.split(",") if c.strip()]
+            for c in self._columns:
+                self._col(c)
+        self._count = count
+        return self
+
+    def insert(self, payload):
+        self._op = "insert"
+        self._payload = payload
+        return self
+
+    def upsert(self, payload, on_conflict: str = "id", ignore_duplicates: bool = False):
+        self._op = "upsert"
+        self._payload = payload
+        self._on_conflict = on_conflict or "id"
+        self._col(self._on_conflict)
+        self._ignore_duplicates = ignore_duplicates
+        return self
+
+    def update(self, payload: Dict):
+        self._op = "update"
+        self._payload = payload
+        return self
+
+    def delete(self):
+        self._op = "delete"
+        return self
+
+    # --- filters ---
+    def _filter(self, column: str, op: str, value: Any):
+        self._where.append(f"{self._col(column)} {op} ?")
+        self._params.append(_encode(self._kinds[column], value))
+        return self
+
+    def eq(self, column: str, value: Any):
+        return self._filter(column, "=", value)
+
+    def neq(self, column: str, value: Any):
+        return self._filter(column, "!=", value)
+
+    def gt(self, column: str, value: Any):
+        return self._filter(column, ">", value)
+
+    def gte(self, column: str, value: Any):
+        return self._filter(column, ">=", value)
+
+    def lt(self, column: str, value: Any):
+        return self._filter(column, "<", value)
+
+    def lte(self, column: str, value: Any):
+        return self._filter(column, "<=", value)
+
+    def in_(self, column: str, values):
+        values = list(values)
+        if not values:
+            self._where.append("0")
+            return self
+        kind = self._kinds[column]
+        self._where.append(f"{self._col(column)} IN ({', '.join('?' * len(values))})")
+        self._params.extend(_encode(kind, v) for v in values)
+        return self
+
+    def is_(self, column: str, value: Any):
+        if value is None or value == "null":
+            self._where.append(f"{self._col(column)} IS NULL")
+            return self
+        return self._filter(column, "=", value)
+
+    def or_(self, filters: str):
+        """PostgREST logic-tree filter, e.g. `a.gt.1,and(a.eq.1,b.gt.2)`."""
+        sql, params = self._logic(filters, "OR")
+        self._where.append(sql)
+        self._params.extend(params)
+        return self
+
+    _OPS = {"eq": "=", "neq": "!=", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+    def _logic(self, filters: str, joiner: str):
+        parts, params = [], []
+        for term in _split_top(filters):
+            for prefix, inner_joiner in (("and(", "AND"), ("or(", "OR")):
+                if term.startswith(prefix) and term.endswith(")"):
+                    sql, p = self._logic(term[len(prefix):-1], inner_joiner)
+                    break
+            else:
+                column, op, value = term.split(".", 2)
+                if len(value) >= 2 and value[0] == value[-1] == '"':
+                    value = value[1:-1]
+                if self._kinds.get(column) == "bool" and value in ("true", "false"):
+                    value = value == "true"
+                if op == "is" and value == "null":
+                    sql, p = f"{self._col(column)} IS NULL", []
+                elif op in self._OPS:
+                    sql, p = f"{self._col(column)} {self._OPS[op]} ?", [_encode(self._kinds[column], value)]
+                else:
+                    raise BackendError(f"Unsupported filter operator: {op}")
+            parts.append(sql)
+            params.extend(p)
+        return "(" + f" {joiner} ".join(parts) + ")", params
+
+    def order(self, column: str, desc: bool = False, **_):
+        self._order.append(f"{self._col(column)} {'DESC' if desc else 'ASC'}")
+        return self
+
+    def limit(self, size: int):
+        self._limit = size
+        return self
+
+    def range(self, start: int, end: int):
+        self._offset = start
+        self._limit = end - start + 1
+        return self
+
+    # --- execution ---
+    def execute(self) -> Response:
+        try:
+            with self._db.transaction() as conn:
+                return getattr(self, f"_run_{self._op}")(conn)
+        except sqlite3.IntegrityError as e:
+            if str(e).startswith("UNIQUE constraint failed"):
+                raise UniqueViolation(str(e)) from e
+            raise BackendError(str(e)) from e
+        except sqlite3.Error as e:
+            raise BackendError(str(e)) from e
+
+    def _where_sql(self) -> str:
+        return f" WHERE {' AND '.join(self._where)}" if self._where else ""
+
+    def _row(self, columns: List[str], row) -> Dict:
+        return {c: _decode(self._kinds[c], v) for c, v in zip(columns, row)}
+
+    def _fetch(self, conn, column: str, values: List) -> List[Dict]:
+        cols = list(self._kinds)
+        found = {}
+        for chunk in _chunks(values):
+            sql = (f'SELECT {", ".join(map(self._col, cols))} FROM "{self._table}" '
+                   f'WHERE {self._col(column)} IN ({", ".join("?" * len(chunk))})')
+            for row in conn.execute(sql, chunk):
+                rec = self._row(cols, row)
+                found[_encode(self._kinds[column], rec[column])] = rec
+        return [found[v] for v in values if v in found]
+
+    def _run_select(self, conn) -> Response:
+        sql = f'SELECT {", ".join(map(self._col, self._columns))} FROM "{self._table}"{self._where_sql()}'
+        if self._order:
+            sql += f" ORDER BY {', '.join(self._order)}"
+        if self._limit is not None or self._offset:
+            sql += f" LIMIT {int(self._limit) if self._limit is not None else -1} OFFSET {int(self._offset)}"
+        data = [self._row(self._columns, r) for r in conn.execute(sql, self._params)]
+        count = None
+        if self._count:
+            count = conn.execute(f'SELECT COUNT(*) FROM "{self._table}"{self._where_sql()}', self._params).fetchone()[0]
+        return Response(data, count)
+
+    def _prepare(self, row: Dict, defaults: bool) -> Dict:
+        for c in row:
+            self._col(c)
+        rec = dict(DEFAULTS.get(self._table, {})) if defaults else {}
+        rec.update(row)
+        rec.setdefault("id", str(uuid.uuid4()))
+        rec.setdefault("created_at", _now_iso())
+        return {c: _encode(self._kinds[c], v) for c, v in rec.items()}
+
+    def _rows(self) -> List[Dict]:
+        payload = self._payload
+        return list(payload) if isinstance(payload, (list, tuple)) else [payload]
+
+    def _insert_sql(self, columns: List[str]) -> str:
+        return (f'INSERT INTO "{self._table}" ({", ".join(map(self._col, columns))}) '
+                f'VALUES ({", ".join("?" * len(columns))})')
+
+    def _run_insert(self, conn) -> Response:
+        rows = [self._prepare(r, defaults=True) for r in self._rows()]
+        if not rows:
+            return Response([])
+        columns = [c for c in self._kinds if any(c in r for r in rows)]
+        conn.executemany(self._insert_sql(columns), [[r.get(c) for c in columns] for r in rows])
+        return Response(self._fetch(conn, "id", [r["id"] for r in rows]))
+
+    def _run_upsert(self, conn) -> Response:
+        raw = self._rows()
+        if not raw:
+            return Response([])
+        key = self._on_conflict
+        rows = [self._prepare(r, defaults=True) for r in raw]
+        keys = [r.get(key) for r in rows]
+        existing = {_encode(self._kinds[key], r[key]) for r in self._fetch(conn, key, keys)}
+        columns = [c for c in self._kinds if any(c in r for r in rows)]
+        sql = self._insert_sql(columns) + f" ON CONFLICT({self._col(key)}) "
+        updatable = [c for c in self._kinds if c not in (key, "id", "created_at") and any(c in r for r in raw)]
+        if self._ignore_duplicates or not updatable:
+            sql += "DO NOTHING"
+        else:
+            sql += "DO UPDATE SET " + ", ".join(f"{self._col(c)} = excluded.{self._col(c)}" for c in updatable)
+        conn.executemany(sql, [[r.get(c) for c in columns] for r in rows])
+        if self._ignore_duplicates:
+            keys = [k for k in dict.fromkeys(keys) if k not in existing]
+        return Response(self._fetch(conn, key, list(dict.fromkeys(keys))))
+
+    def _matching_ids(self, conn) -> List[str]:
+        return [r[0] for r in conn.execute(f'SELECT "id" FROM "{self._table}"{self._where_sql()}', self._params)]
+
+    def _run_update(self, conn) -> Response:
+        ids = self._matching_ids(conn)
+        if not ids:
+            return Response([])
+        values = self._prepare_update(self._payload)
+        assignments = ", ".join(f"{self._col(c)} = ?" for c in values)
+        for chunk in _chunks(ids, _MAX_VARS - len(values)):
+            conn.execute(f'UPDATE "{self._table}" SET {assignments} WHERE "id" IN ({", ".join("?" * len(chunk))})',
+                         list(values.values()) + chunk)
+        return Response(self._fetch(conn, "id", ids))
+
+    def _prepare_update(self, payload: Dict) -> Dict:
+        for c in payload:
+            self._col(c)
+        return {c: _encode(self._kinds[c], v) for c, v in payload.items()}
+
+    def _run_delete(self, conn) -> Response:
+        ids = self._matching_ids(conn)
+        data = self._fetch(conn, "id", ids)
+        for chunk in _chunks(ids):
+            conn.execute(f'DELETE FROM "{self._table}" WHERE "id" IN ({", ".join("?" * len(chunk))})', chunk)
+        return Response(data)
+
+
+class SQLiteBackend(StorageBackend):
+    """Embedded single-node store. One shared connection guarded by a lock;
+    WAL mode for file databases so readers in other processes are not blocked."""
+
+    name = "sqlite"
+
+    def __init__(self, path: str = "silent_bid.db"):
+        self.path = path
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.create_collation("decimal", _compare_decimal)
+        if path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.transaction() as conn:
+            for stmt in ddl():
+                conn.execute(stmt)
+            self._add_missing_columns(conn)
+            if self._migrate_numeric(conn):
+                for stmt in INDEXES:
+                    conn.execute(stmt)
+
+    @staticmethod
+    def _add_missing_columns(conn) -> None:
+        # databases created before a column was added to the schema
+        for table, cols in TABLES.items():
+            have = {r[1] for r in conn.execute(f'PRAGMA table_info("{table}")')}
+            for col, kind in cols.items():
+                if col not in have:
+                    conn.execute(f'ALTER TABLE "{table}" ADD COLUMN {column_ddl(col, kind)}')
+
+    @staticmethod
+    def _migrate_numeric(conn) -> bool:
+        # databases created when money columns were NUMERIC: rebuild those tables with
+        # the text columns. Amounts already stored as REAL keep the value they were given
+        migrated = False
+        for table, cols in TABLES.items():
+            declared = {r[1]: r[2].upper() for r in conn.execute(f'PRAGMA table_info("{table}")')}
+            if not any(declared.get(c) == "NUMERIC" for c, kind in cols.items() if kind == "numeric"):
+                continue
+            names = ", ".join(f'"{c}"' for c in cols)
+            values = ", ".join(f'CAST("{c}" AS TEXT)' if kind == "numeric" else f'"{c}"' for c, kind in cols.items())
+            conn.execute(f'CREATE TABLE "{table}__new" ({", ".join(column_ddl(c, k) for c, k in cols.items())})')
+            conn.execute(f'INSERT INTO "{table}__new" ({names}) SELECT {values} FROM "{table}"')
+            conn.execute(f'DROP TABLE "{table}"')
+            conn.execute(f'ALTER TABLE "{table}__new" RENAME TO "{table}"')
+            migrated = True
+        return migrated
+
+    @contextmanager
+    def transaction(self):
+        with self.lock:
+            self.conn.execute("BEGIN")
+            try:
+                yield self.conn
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    def table(self, name: str) -> SQLiteQuery:
+        return SQLiteQuery(self, name)
+
+    def close(self) -> None:
+        with self.lock:
+            self.conn.close()
+
+
+class MemoryBackend(SQLiteBackend):
+    """Process-local, non-durable store (SQLite `:memory:`), same indexes."""
+
+    name = "memory"
+
+    def __init__(self):
+        super().__init__(":memory:")
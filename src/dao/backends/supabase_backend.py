@@ -0,0 +1,15 @@
+# src/dao/backends/supabase_backend.py
+from .base import StorageBackend
+
+
+class SupabaseBackend(StorageBackend):
+    name = "supabase"
+
+    def __init__(self, client=None):
+        if client is None:
+            from src.config import create_supabase_client
+            client = create_supabase_client()
+        self.client = client
+
+    def table(self, name: str):
+        return self.client.table(name)
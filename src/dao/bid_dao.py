@@ -1,33 +1,89 @@
 # src/dao/bid_dao.py
-from typing import Dict, List, Optional
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from decimal import Decimal
-from .supabase_client import get_client
+from src.config import PAGE_SIZE, PAGE_PREFETCH
+from src.models import Bid, BidBatch
+from .pagination import iter_keyset
+from .singleflight import async_reads, reads
+from .supabase_client import get_client, get_async_client
+
+
+def _sealed_payload(auction_id: str, bidder_id: str, commitment: str) -> Dict:
+    return {
+        "auction_id": auction_id,
+        "bidder_id": bidder_id,
+        "commitment": commitment,
+        "amount": None,
+        "revealed": False
+    }
+
+
+def new_sealed_row(auction_id: str, bidder_id: str, commitment: str) -> Dict:
+    """A full sealed-bid row with its id and created_at assigned here, for bids
+    acknowledged before they reach the backend (the bid journal)."""
+    return dict(_sealed_payload(auction_id, bidder_id, commitment), id=str(uuid.uuid4()),
+                created_at=datetime.now(timezone.utc).isoformat())
+
 
 class BidDAO:
     def __init__(self):
         self.sb = get_client()
 
     def create_sealed(self, auction_id: str, bidder_id: str, commitment: str) -> Dict:
-        payload = {
-            "auction_id": auction_id,
-            "bidder_id": bidder_id,
-            "commitment": commitment,
-            "amount": None,
-            "revealed": False
-        }
-        resp = self.sb.table("bids").insert(payload).execute()
+        resp = self.sb.table("bids").insert(_sealed_payload(auction_id, bidder_id, commitment)).execute()
     
         return resp.data[0]
 
+    def create_sealed_many(self, items: Iterable[Tuple[str, str, str]], chunk_size: int = 500) -> List[Dict]:
+        # multi-row inserts, one round trip per chunk
+        payloads = [_sealed_payload(*item) for item in items]
+        created = []
+        for i in range(0, len(payloads), chunk_size):
+            resp = self.sb.table("bids").insert(payloads[i:i + chunk_size]).execute()
+            created.extend(resp.data)
+        return created
+
+    def insert_sealed_rows(self, rows: List[Dict], chunk_size: int = 500) -> List[Dict]:
+        # rows from new_sealed_row; keyed on their id, so sending them again is a no-op.
+        # Returns only the rows this call inserted
+        inserted = []
+        for i in range(0, len(rows), chunk_size):
+            resp = self.sb.table("bids").upsert(rows[i:i + chunk_size], on_conflict="id", ignore_duplicates=True).execute()
+            inserted.extend(resp.data)
+        return inserted
+
     def reveal(self, bid_id: str, amount: Decimal) -> Dict:
         resp = self.sb.table("bids").update({"amount": str(amount), "revealed": True}).eq("id", bid_id).execute()
         
         return resp.data[0]
 
-    def get(self, bid_id: str) -> Optional[Dict]:
+    def get(self, bid_id: str) -> Optional[Bid]:
+        # concurrent reads of one bid share a query (and the read-only record)
+        return reads.do(f"bids:{bid_id}", lambda: self._fetch(bid_id))
+
+    def _fetch(self, bid_id: str) -> Optional[Bid]:
         resp = self.sb.table("bids").select("*").eq("id", bid_id).limit(1).execute()
-        
-        return resp.data[0] if resp.data else None
+
+        return Bid.from_row(resp.data[0]) if resp.data else None
+
+    def get_many(self, bid_ids: Iterable[str], chunk_size: int = 500) -> Dict[str, Bid]:
+        ids = list(dict.fromkeys(bid_ids))
+        found = {}
+        for i in range(0, len(ids), chunk_size):
+            resp = self.sb.table("bids").select("*").in_("id", ids[i:i + chunk_size]).execute()
+            found.update((b["id"], Bid.from_row(b)) for b in resp.data)
+        return found
+
+    def reveal_many(self, reveals: List[Tuple[Bid, Decimal]], chunk_size: int = 500) -> List[Dict]:
+        # (bid, amount) pairs; amounts differ per row, so each chunk is one upsert of full rows keyed on id
+        rows = [dict(bid.to_dict(), amount=str(amount), revealed=True) for bid, amount in reveals]
+        revealed = []
+        for i in range(0, len(rows), chunk_size):
+            resp = self.sb.table("bids").upsert(rows[i:i + chunk_size], on_conflict="id").execute()
+            revealed.extend(resp.data)
+        return revealed
 
     def list_public(self, auction_id: str) -> List[Dict]:
         # public: ids only (no amounts)
@@ -35,7 +91,91 @@ class BidDAO:
     
         return resp.data
 
+    def iter_public(self, auction_id: str, page_size: int = PAGE_SIZE, prefetch: bool = PAGE_PREFETCH) -> Iterator[Dict]:
+        return iter_keyset(lambda: self.sb.table("bids").select("id, bidder_id, created_at").eq("auction_id", auction_id),
+                           page_size, prefetch)
+
     def list_revealed(self, auction_id: str) -> List[Dict]:
         resp = self.sb.table("bids").select("*").eq("auction_id", auction_id).eq("revealed", True).order("amount", desc=True).execute()
         
         return resp.data
+
+    def top_n(self, auction_id: str, n: int) -> List[Bid]:
+        # highest revealed bids, earliest first on ties; served by the (auction_id, revealed, amount) index
+        resp = (self.sb.table("bids").select("*").eq("auction_id", auction_id).eq("revealed", True)
+                .order("amount", desc=True).order("created_at").limit(n).execute())
+
+        return Bid.from_rows(resp.data)
+
+    def count_revealed(self, auction_id: str) -> int:
+        resp = self.sb.table("bids").select("id", count="exact").eq("auction_id", auction_id).eq("revealed", True).limit(1).execute()
+
+        return resp.count or 0
+
+    def batch_for_auctions(self, auction_ids: Iterable[str], chunk_size: int = 200, page_size: int = 1000) -> BidBatch:
+        # bulk load for reporting: auction ids in chunks, each chunk paged past the response row cap,
+        # appended straight into columns so no page of dicts outlives its request
+        ids = list(dict.fromkeys(auction_ids))
+        batch = BidBatch()
+        for i in range(0, len(ids), chunk_size):
+            start = 0
+            while True:
+                resp = (self.sb.table("bids").select("auction_id, revealed, amount, created_at")
+                        .in_("auction_id", ids[i:i + chunk_size]).order("id").range(start, start + page_size - 1).execute())
+                batch.append_rows(resp.data)
+                if len(resp.data) < page_size:
+                    break
+                start += page_size
+        return batch
+
+
+class AsyncBidDAO:
+    def __init__(self):
+        self.sb = get_async_client()
+
+    async def create_sealed(self, auction_id: str, bidder_id: str, commitment: str) -> Dict:
+        resp = await self.sb.table("bids").insert(_sealed_payload(auction_id, bidder_id, commitment)).execute()
+
+        return resp.data[0]
+
+    async def create_sealed_many(self, items: Iterable[Tuple[str, str, str]], chunk_size: int = 500) -> List[Dict]:
+        payloads = [_sealed_payload(*item) for item in items]
+        created = []
+        for i in range(0, len(payloads), chunk_size):
+            resp = await self.sb.table("bids").insert(payloads[i:i + chunk_size]).execute()
+            created.extend(resp.data)
+        return created
+
+    async def reveal(self, bid_id: str, amount: Decimal) -> Dict:
+        resp = await self.sb.table("bids").update({"amount": str(amount), "revealed": True}).eq("id", bid_id).execute()
+
+        return resp.data[0]
+
+    async def get(self, bid_id: str) -> Optional[Bid]:
+        return await async_reads.do(f"bids:{bid_id}", lambda: self._fetch(bid_id))
+
+    async def _fetch(self, bid_id: str) -> Optional[Bid]:
+        resp = await self.sb.table("bids").select("*").eq("id", bid_id).limit(1).execute()
+
+        return Bid.from_row(resp.data[0]) if resp.data else None
+
+    async def list_public(self, auction_id: str) -> List[Dict]:
+        resp = await self.sb.table("bids").select("id, bidder_id, created_at").eq("auction_id", auction_id).execute()
+
+        return resp.data
+
+    async def list_revealed(self, auction_id: str) -> List[Dict]:
+        resp = await self.sb.table("bids").select("*").eq("auction_id", auction_id).eq("revealed", True).order("amount", desc=True).execute()
+
+        return resp.data
+
+    async def top_n(self, auction_id: str, n: int) -> List[Bid]:
+        resp = await (self.sb.table("bids").select("*").eq("auction_id", auction_id).eq("revealed", True)
+                      .order("amount", desc=True).order("created_at").limit(n).execute())
+
+        return Bid.from_rows(resp.data)
+
+    async def count_revealed(self, auction_id: str) -> int:
+        resp = await self.sb.table("bids").select("id", count="exact").eq("auction_id", auction_id).eq("revealed", True).limit(1).execute()
+
+        return resp.count or 0
@@ -0,0 +1,310 @@
+# src/dao/bid_journal.py
+"""Local write-ahead journal for sealed bids (BID_ACCEPT_MODE=journal).
+
+Each accepted bid is appended to `<dir>/bids.journal` as one JSON line. The
+line is fsynced before the bid is acknowledged, and the caller gives the row
+its id and created_at. Concurrent appends share fsyncs (group commit): if
+another writer's fsync already covered a line, its writer returns without
+calling fsync itself.
+
+A background thread replicates journaled bids to the backend in batches
+through `replicate(rows)`. That callback must be idempotent, since a batch is
+sent again after a failure or a crash. `<dir>/bids.offset` holds the journal
+offset up to which every bid has been replicated. On start, the journal is
+replayed from there. Once everything is replicated and the journal has grown
+past `compact_bytes`, it is truncated.
+
+Transient backend errors (see `backends.resilient.is_transient`) are retried with
+exponential backoff. When the backend rejects a batch outright, the batch is
+bisected until the rejected rows are isolated. Those rows are moved to
+`<dir>/bids.rejected` with the error, so one bad row cannot hold up the bids
+behind it.
+
+A journal directory belongs to one process at a time, enforced with an flock
+on the journal file."""
+import atexit
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Tuple
+from .backends.resilient import CircuitOpenError, is_transient
+
+log = logging.getLogger(__name__)
+
+JOURNAL_NAME = "bids.journal"
+OFFSET_NAME = "bids.offset"
+REJECTED_NAME = "bids.rejected"
+
+
+class BidJournalError(Exception):
+    pass
+
+
+class BidJournal:
+    def __init__(self, directory: str, replicate: Callable[[List[Dict]], object], batch_size: int = 500,
+                 flush_interval: float = 0.2, fsync: bool = True, compact_bytes: int = 64 << 20,
+                 max_backoff: float = 30.0):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.path = os.path.join(directory, JOURNAL_NAME)
+        self.offset_path = os.path.join(directory, OFFSET_NAME)
+        self.rejected_path = os.path.join(directory, REJECTED_NAME)
+        self._replicate = replicate
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.compact_bytes = compact_bytes
+        self.max_backoff = max_backoff
+        self._fd = os.open(self.path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(self._fd)
+            raise BidJournalError(f"{self.path} is in use by another process; give each process its own BID_JOURNAL_DIR")
+        self._lock = threading.Lock()
+        self._replicated_cond = threading.Condition(self._lock)
+        self._sync_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._closed = False
+        self._pending: deque = deque()  # (end offset, row), in journal order
+        self._pending_ids = set()
+        self._size = 0
+        self._synced = 0
+        self.appended = 0
+        self.replicated = 0
+        self.recovered = 0
+        self.fsyncs = 0
+        self.failures = 0
+        self.rejected = 0
+        self._backoff = 0.0
+        self._retry_at = 0.0
+        self._recover()
+        self._thread = threading.Thread(target=self._run, name="bid-journal", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # --- recovery ---
+
+    def _load_offset(self) -> int:
+        try:
+            with open(self.offset_path, encoding="utf-8") as f:
+                return int(f.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+
+    def _save_offset(self, offset: int, durable: bool = False) -> None:
+        # a stale offset only replays bids that were already replicated; only compaction needs it on disk
+        tmp = self.offset_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(str(offset))
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, self.offset_path)
+        if durable:
+            dir_fd = os.open(self.directory, os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+
+    def _recover(self) -> None:
+        size = os.fstat(self._fd).st_size
+        offset = self._load_offset()
+        if offset > size:
+            offset = 0  # the journal was replaced under us; replay it all (replication is idempotent)
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+        pos = 0
+        while pos < len(data):
+            nl = data.find(b"\n", pos)
+            if nl < 0:
+                break  # torn write from a crash: never acknowledged
+            try:
+                row = json.loads(data[pos:nl])
+            except ValueError:
+                log.warning("bid journal %s: unreadable entry at byte %d, dropping the rest", self.path, offset + pos)
+                break
+            pos = nl + 1
+            self._pending.append((offset + pos, row))
+            self._pending_ids.add(row["id"])
+        if offset + pos < size:
+            os.ftruncate(self._fd, offset + pos)
+        self._size = self._synced = offset + pos
+        self.recovered = self.appended = len(self._pending)
+        if self._pending:
+            log.info("bid journal %s: replaying %d bids", self.path, len(self._pending))
+
+    # --- append ---
+
+    def append_many(self, rows: List[Dict]) -> List[Dict]:
+        """Journal rows (each with its id set) and return once they are on disk."""
+        if not rows:
+            return rows
+        lines = [json.dumps(r, separators=(",", ":"), default=str).encode() + b"\n" for r in rows]
+        data = b"".join(lines)
+        with self._lock:
+            if self._closed:
+                raise BidJournalError("bid journal is closed")
+            view = memoryview(data)
+            while view:
+                view = view[os.write(self._fd, view):]
+            end = self._size
+            for row, line in zip(rows, lines):
+                end += len(line)
+                self._pending.append((end, row))
+                self._pending_ids.add(row["id"])
+            self._size = end
+            self.appended += len(rows)
+            backlog = len(self._pending)
+        self._sync(end)
+        if backlog >= self.batch_size:
+            self._wake.set()
+        return rows
+
+    def append(self, row: Dict) -> Dict:
+        return self.append_many([row])[0]
+
+    def _sync(self, end: int) -> None:
+        if not self.fsync:
+            with self._lock:
+                self._synced = max(self._synced, end)
+            return
+        with self._sync_lock:
+            # another writer's fsync may already have covered this line
+            if self._synced >= end:
+                return
+            with self._lock:
+                target = self._size
+            os.fsync(self._fd)
+            with self._lock:
+                self._synced = max(self._synced, target)
+                self.fsyncs += 1
+
+    def contains(self, bid_id: str) -> bool:
+        """True while the bid is journaled but not yet replicated."""
+        with self._lock:
+            return bid_id in self._pending_ids
+
+    # --- replication ---
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(max(self.flush_interval, self._retry_at - time.monotonic()))
+            self._wake.clear()
+            stopping = self._stop.is_set()
+            # a flush() wake-up does not cut a backoff short
+            if stopping or time.monotonic() >= self._retry_at:
+                while self._replicate_batch():
+                    pass
+            if stopping:
+                return
+
+    def _send(self, rows: List[Dict]) -> List[Tuple[Dict, str]]:
+        """Replicate rows, bisecting around the ones the backend rejects. Returns
+        the rejected (row, error) pairs; transient errors propagate."""
+        try:
+            self._replicate(rows)
+            return []
+        except Exception as e:
+            if is_transient(e) or isinstance(e, CircuitOpenError):
+                raise
+            if len(rows) == 1:
+                return [(rows[0], f"{type(e).__name__}: {e}")]
+        mid = len(rows) // 2
+        return self._send(rows[:mid]) + self._send(rows[mid:])
+
+    def _dead_letter(self, rejected: List[Tuple[Dict, str]]) -> None:
+        # on disk before the offset moves past these rows
+        with open(self.rejected_path, "a", encoding="utf-8") as f:
+            for row, error in rejected:
+                f.write(json.dumps({"row": row, "error": error}, separators=(",", ":"), default=str) + "\n")
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        for row, error in rejected:
+            log.error("bid journal: backend rejected bid %s, moved to %s: %s", row.get("id"), self.rejected_path, error)
+
+    def _replicate_batch(self) -> bool:
+        with self._lock:
+            batch, last = [], 0
+            for end, row in self._pending:
+                # only lines already on disk: a replicated bid must survive a crash in the journal too
+                if end > self._synced or len(batch) >= self.batch_size:
+                    break
+                batch.append(row)
+                last = end
+        if not batch:
+            return False
+        try:
+            rejected = self._send(batch)
+        except Exception as e:
+            self.failures += 1
+            self._backoff = min(self.max_backoff, max(self.flush_interval, self._backoff * 2))
+            self._retry_at = time.monotonic() + self._backoff
+            log.warning("bid journal: replicating %d bids failed, retrying in %.1fs: %s", len(batch), self._backoff, e)
+            return False
+        self._backoff = 0.0
+        if rejected:
+            self._dead_letter(rejected)
+        with self._lock:
+            for _ in batch:
+                _, row = self._pending.popleft()
+                self._pending_ids.discard(row["id"])
+            self.replicated += len(batch) - len(rejected)
+            self.rejected += len(rejected)
+            compact = not self._pending and self._size >= self.compact_bytes
+            if compact:
+                # offset 0 must be on disk before the truncate, or a crash could skip new bids
+                self._save_offset(0, durable=True)
+                os.ftruncate(self._fd, 0)
+                self._size = self._synced = 0
+            self._replicated_cond.notify_all()
+        if not compact:
+            # only this thread writes the offset, so saves cannot reorder
+            self._save_offset(last)
+        return True
+
+    def flush(self, timeout: float = None) -> bool:
+        """Wait until every bid journaled so far is replicated (or rejected). False on timeout."""
+        with self._lock:
+            target = self.appended
+            self._wake.set()
+            return self._replicated_cond.wait_for(lambda: self.replicated + self.rejected >= target, timeout)
+
+    def wait_for(self, bid_ids: List[str], timeout: float = None) -> bool:
+        """Wait until these bids have left the journal (replicated or rejected),
+        without waiting for the rest of the backlog. False on timeout."""
+        with self._lock:
+            self._wake.set()
+            return self._replicated_cond.wait_for(lambda: self._pending_ids.isdisjoint(bid_ids), timeout)
+
+    def close(self) -> None:
+        """Stop after one last replication attempt; anything left is replayed on the next start."""
+        if self._closed:
+            return
+        with self._lock:
+            self._closed = True
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout=self.flush_interval + 5)
+        os.close(self._fd)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "pending": len(self._pending),
+                "appended": self.appended,
+                "replicated": self.replicated,
+                "recovered": self.recovered,
+                "fsyncs": self.fsyncs,
+                "failures": self.failures,
+                "rejected": self.rejected,
+                "journal_bytes": self._size,
+            }
@@ -0,0 +1,19 @@
+# src/dao/export_dao.py
+from typing import Dict, Iterator, Optional
+from src.config import PAGE_SIZE, PAGE_PREFETCH
+from .pagination import Cursor, iter_keyset
+from .supabase_client import get_client
+
+
+class ExportDAO:
+    def __init__(self):
+        self.sb = get_client()
+
+    def iter_rows(self, table: str, since: Optional[str] = None, after: Optional[Cursor] = None,
+                  page_size: int = PAGE_SIZE, prefetch: bool = PAGE_PREFETCH) -> Iterator[Dict]:
+        """Every row of `table` in (created_at, id) order, created at or after
+        `since` and past the `after` cursor, one page in memory at a time."""
+        def query():
+            q = self.sb.table(table).select("*")
+            return q.gte("created_at", since) if since else q
+        return iter_keyset(query, page_size, prefetch, after)
@@ -0,0 +1,175 @@
+# src/dao/metrics.py
+"""In-process metrics for backend round trips: per (table, operation) counters
+and latency histograms, a slow-query log, Prometheus text export and a
+per-request context that totals round trips and backend time."""
+import contextvars
+import json
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+from src.config import SLOW_QUERY_MS
+
+slow_log = logging.getLogger("src.dao.slow_query")
+
+# histogram upper bounds, milliseconds
+BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class _Series:
+    __slots__ = ("count", "errors", "rows", "payload_bytes", "sum_ms", "max_ms", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.rows = 0
+        self.payload_bytes = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, ms: float, rows: int, payload_bytes: int, error: bool) -> None:
+        self.count += 1
+        self.errors += int(error)
+        self.rows += rows
+        self.payload_bytes += payload_bytes
+        self.sum_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        for i, bound in enumerate(BUCKETS_MS):
+            if ms <= bound:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bucket bound holding the q-quantile (histogram estimate)."""
+        if not self.count:
+            return 0.0
+        target, seen = q * self.count, 0
+        for i, n in enumerate(self.buckets[:-1]):
+            seen += n
+            if seen >= target:
+                return float(BUCKETS_MS[i])
+        return self.max_ms
+
+
+class RequestStats:
+    """Backend usage of one service call or request, see `request_context`."""
+    __slots__ = ("name", "round_trips", "backend_ms", "rows", "queries")
+
+    def __init__(self, name: Optional[str] = None):
+        self.name = name
+        self.round_trips = 0
+        self.backend_ms = 0.0
+        self.rows = 0
+        self.queries: List[str] = []
+
+    def as_dict(self) -> Dict:
+        return {"name": self.name, "round_trips": self.round_trips, "backend_ms": round(self.backend_ms, 3),
+                "rows": self.rows, "queries": list(self.queries)}
+
+
+_request: contextvars.ContextVar = contextvars.ContextVar("backend_request_stats", default=None)
+
+
+@contextmanager
+def request_context(name: Optional[str] = None):
+    """Collect the round trips made inside the block:
+
+        with request_context("place_sealed") as stats:
+            bsvc.place_sealed(...)
+        stats.round_trips, stats.backend_ms
+    """
+    stats = RequestStats(name)
+    token = _request.set(stats)
+    try:
+        yield stats
+    finally:
+        _request.reset(token)
+
+
+def payload_size(payload: Any) -> int:
+    if payload is None:
+        return 0
+    try:
+        return len(json.dumps(payload, default=str))
+    except (TypeError, ValueError):
+        return 0
+
+
+class QueryMetrics:
+    def __init__(self, slow_ms: float = 500.0):
+        self.slow_ms = slow_ms
+        self._lock = threading.Lock()
+        self._series: Dict[tuple, _Series] = {}
+
+    def observe(self, table: str, op: str, ms: float, rows: int = 0, payload_bytes: int = 0, error: bool = False) -> None:
+        with self._lock:
+            series = self._series.get((table, op))
+            if series is None:
+                series = self._series[(table, op)] = _Series()
+            series.add(ms, rows, payload_bytes, error)
+        stats = _request.get()
+        if stats is not None:
+            stats.round_trips += 1
+            stats.backend_ms += ms
+            stats.rows += rows
+            stats.queries.append(f"{table}.{op}")
+        if ms >= self.slow_ms:
+            slow_log.warning("slow query: %s.%s took %.1f ms (rows=%d, payload=%dB)", table, op, ms, rows, payload_bytes)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            items = sorted(self._series.items())
+            return {
+                f"{table}.{op}": {
+                    "count": s.count,
+                    "errors": s.errors,
+                    "rows": s.rows,
+                    "payload_bytes": s.payload_bytes,
+                    "total_ms": round(s.sum_ms, 3),
+                    "mean_ms": round(s.sum_ms / s.count, 3) if s.count else 0.0,
+                    "max_ms": round(s.max_ms, 3),
+                    "p50_ms": s.quantile(0.5),
+                    "p95_ms": s.quantile(0.95),
+                    "p99_ms": s.quantile(0.99),
+                }
+                for (table, op), s in items
+            }
+
+    def prometheus(self, prefix: str = "silentbid_db") -> str:
+        with self._lock:
+            items = sorted(self._series.items())
+            lines = []
+
+            def counter(name: str, help_text: str, attr: str):
+                lines.append(f"# HELP {prefix}_{name} {help_text}")
+                lines.append(f"# TYPE {prefix}_{name} counter")
+                for (table, op), s in items:
+                    lines.append(f'{prefix}_{name}{{table="{table}",op="{op}"}} {getattr(s, attr)}')
+
+            counter("queries_total", "Backend round trips.", "count")
+            counter("query_errors_total", "Backend round trips that raised.", "errors")
+            counter("rows_total", "Rows returned by backend round trips.", "rows")
+            counter("payload_bytes_total", "Approximate JSON size of write payloads.", "payload_bytes")
+
+            name = f"{prefix}_query_duration_seconds"
+            lines.append(f"# HELP {name} Backend round-trip latency.")
+            lines.append(f"# TYPE {name} histogram")
+            for (table, op), s in items:
+                labels = f'table="{table}",op="{op}"'
+                cumulative = 0
+                for bound, n in zip(BUCKETS_MS, s.buckets):
+                    cumulative += n
+                    lines.append(f'{name}_bucket{{{labels},le="{bound / 1000:g}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {s.count}')
+                lines.append(f"{name}_sum{{{labels}}} {s.sum_ms / 1000:.6f}")
+                lines.append(f"{name}_count{{{labels}}} {s.count}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = QueryMetrics(SLOW_QUERY_MS)
@@ -0,0 +1,46 @@
+# src/dao/pagination.py
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+Cursor = Tuple[str, str]
+
+
+def _keyset_filter(after: Cursor) -> str:
+    created_at, row_id = after
+    return f'created_at.gt."{created_at}",and(created_at.eq."{created_at}",id.gt.{row_id})'
+
+
+def fetch_page(make_query: Callable, after: Optional[Cursor], page_size: int) -> List[Dict]:
+    """One page ordered by (created_at, id), starting after the `after` cursor.
+    `make_query()` returns a fresh filtered builder; selected columns must
+    include created_at and id."""
+    query = make_query()
+    if after is not None:
+        query = query.or_(_keyset_filter(after))
+    return query.order("created_at").order("id").limit(page_size).execute().data
+
+
+def iter_keyset(make_query: Callable, page_size: int = 500, prefetch: bool = False,
+                after: Optional[Cursor] = None) -> Iterator[Dict]:
+    """Stream rows page by page with keyset pagination, holding at most one page
+    (two with `prefetch`, which fetches the next page in the background while
+    the current one is consumed). `after` resumes past a previously seen
+    (created_at, id) cursor."""
+    if not prefetch:
+        while True:
+            rows = fetch_page(make_query, after, page_size)
+            yield from rows
+            if len(rows) < page_size:
+                return
+            after = (rows[-1]["created_at"], rows[-1]["id"])
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch") as pool:
+        future = pool.submit(fetch_page, make_query, after, page_size)
+        while True:
+            rows = future.result()
+            more = len(rows) == page_size
+            if more:
+                future = pool.submit(fetch_page, make_query, (rows[-1]["created_at"], rows[-1]["id"]), page_size)
+            yield from rows
+            if not more:
+                return
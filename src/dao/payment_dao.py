@@ -1,16 +1,49 @@
 # src/dao/payment_dao.py
-from typing import Dict
-from .supabase_client import get_client
+from typing import Dict, Iterable, Iterator, List, Optional
+from src.config import PAGE_SIZE, PAGE_PREFETCH
+from src.models import Payment
+from .pagination import iter_keyset
+from .supabase_client import get_client, get_async_client
+
+
+def _payment_payload(auction_id: str, bid_id: str, payer_id: str, amount: float) -> Dict:
+    return {
+        "auction_id": auction_id,
+        "bid_id": bid_id,
+        "payer_id": payer_id,
+        "amount_paid": amount
+    }
+
 
 class PaymentDAO:
     def __init__(self):
         self.sb = get_client()
 
     def record_payment(self, auction_id: str, bid_id: str, payer_id: str, amount: float) -> Dict:
-        resp = self.sb.table("payments").insert({
-            "auction_id": auction_id,
-            "bid_id": bid_id,
-            "payer_id": payer_id,
-            "amount_paid": amount
-        }).execute()
+        resp = self.sb.table("payments").insert(_payment_payload(auction_id, bid_id, payer_id, amount)).execute()
+        return resp.data[0]
+
+    def list_for_auctions(self, auction_ids: Iterable[str], chunk_size: int = 500) -> List[Payment]:
+        ids = list(dict.fromkeys(auction_ids))
+        payments = []
+        for i in range(0, len(ids), chunk_size):
+            resp = self.sb.table("payments").select("*").in_("auction_id", ids[i:i + chunk_size]).execute()
+            payments.extend(Payment.from_rows(resp.data))
+        return payments
+
+    def iter_since(self, since: Optional[str] = None, page_size: int = PAGE_SIZE,
+                   prefetch: bool = PAGE_PREFETCH) -> Iterator[Payment]:
+        """Every payment created at or after `since` (all when None), in (created_at, id) order."""
+        def query():
+            q = self.sb.table("payments").select("*")
+            return q.gte("created_at", since) if since else q
+        return map(Payment.from_row, iter_keyset(query, page_size, prefetch))
+
+
+class AsyncPaymentDAO:
+    def __init__(self):
+        self.sb = get_async_client()
+
+    async def record_payment(self, auction_id: str, bid_id: str, payer_id: str, amount: float) -> Dict:
+        resp = await self.sb.table("payments").insert(_payment_payload(auction_id, bid_id, payer_id, amount)).execute()
         return resp.data[0]
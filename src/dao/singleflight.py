@@ -0,0 +1,134 @@
+# src/dao/singleflight.py
+"""Request coalescing: concurrent identical reads share one backend call.
+
+The first caller for a key runs the fetch; callers arriving while it is in
+flight wait for it and get the same result (or the same exception). Nothing
+is kept once the call finishes - caching is the TTLCache's job - so a result
+is never older than the moment it was asked for."""
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+from src.config import SINGLE_FLIGHT
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class _Stats:
+    """Per-key calls and backend executions, for the `max_keys` most recently used keys."""
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._keys: "OrderedDict[Hashable, list]" = OrderedDict()  # key -> [calls, executions]
+        self.calls = 0
+        self.executions = 0
+
+    def record(self, key: Hashable, executed: bool) -> None:
+        # caller holds the owner's lock
+        self.calls += 1
+        self.executions += int(executed)
+        if self.max_keys <= 0:
+            return
+        entry = self._keys.get(key)
+        if entry is None:
+            entry = self._keys[key] = [0, 0]
+            if len(self._keys) > self.max_keys:
+                self._keys.popitem(last=False)
+        else:
+            self._keys.move_to_end(key)
+        entry[0] += 1
+        entry[1] += int(executed)
+
+    def snapshot(self, in_flight: int, top: int) -> Dict:
+        hottest = sorted(self._keys.items(), key=lambda kv: kv[1][0] - kv[1][1], reverse=True)[:top]
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.calls - self.executions,
+            "in_flight": in_flight,
+            "keys": {str(k): {"calls": c, "executions": e, "coalesced": c - e} for k, (c, e) in hottest},
+        }
+
+
+class SingleFlight:
+    def __init__(self, max_keys: int = 1000, enabled: bool = True):
+        self.enabled = enabled
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self._stats = _Stats(max_keys)
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        if not self.enabled:
+            return fn()
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            self._stats.record(key, leader)
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def stats(self, top: int = 10) -> Dict:
+        """Totals plus the `top` keys that saved the most backend calls."""
+        with self._lock:
+            return self._stats.snapshot(len(self._calls), top)
+
+
+class AsyncSingleFlight:
+    """SingleFlight for coroutines. `fn` returns a coroutine; calls are shared
+    between coroutines on the same event loop."""
+
+    def __init__(self, max_keys: int = 1000, enabled: bool = True):
+        self.enabled = enabled
+        self._calls: Dict[Hashable, Any] = {}  # (loop, key) -> asyncio future
+        self._lock = threading.Lock()
+        self._stats = _Stats(max_keys)
+
+    async def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        if not self.enabled:
+            return await fn()
+        import asyncio
+
+        slot = (asyncio.get_running_loop(), key)
+        with self._lock:
+            future = self._calls.get(slot)
+            self._stats.record(key, future is None)
+            if future is None:
+                future = self._calls[slot] = asyncio.ensure_future(fn())
+
+                def done(f):
+                    with self._lock:
+                        if self._calls.get(slot) is f:
+                            del self._calls[slot]
+                future.add_done_callback(done)
+        # shield: one cancelled caller must not cancel the fetch the others wait on
+        return await asyncio.shield(future)
+
+    def stats(self, top: int = 10) -> Dict:
+        with self._lock:
+            return self._stats.snapshot(len(self._calls), top)
+
+
+# process-wide, shared by every DAO instance so concurrent callers coalesce
+reads = SingleFlight(enabled=SINGLE_FLIGHT)
+async_reads = AsyncSingleFlight(enabled=SINGLE_FLIGHT)
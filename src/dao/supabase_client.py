@@ -1,5 +1,83 @@
 # src/dao/supabase_client.py
-from src.config import supabase
+import threading
+from typing import Dict
+from src.config import (STORAGE_BACKEND, SQLITE_PATH, ASYNC_MAX_WORKERS, METRICS_ENABLED, RETRY_ATTEMPTS,
+                        RETRY_BASE_MS, RETRY_MAX_MS, BREAKER_FAILURES, BREAKER_RESET_SECONDS)
+from .backends import create_backend
+
+_backend = None
+_async_backend = None
+_breaker = None
+_lock = threading.Lock()
+
+
+def _ensure_client():
+    # caller holds _lock
+    global _backend
+    if _backend is None:
+        options = {"path": SQLITE_PATH} if STORAGE_BACKEND == "sqlite" else {}
+        _backend = _wrap(create_backend(STORAGE_BACKEND, **options))
+    return _backend
+
+
+def _wrap(backend):
+    # metrics see every attempt; retries and the circuit breaker sit outside them
+    if METRICS_ENABLED:
+        from .backends.instrumented import InstrumentedBackend
+        backend = InstrumentedBackend(backend)
+    from .backends.resilient import ResilientBackend
+    return ResilientBackend(backend, RETRY_ATTEMPTS, RETRY_BASE_MS, RETRY_MAX_MS, _get_breaker())
+
+
+def _get_breaker():
+    # caller holds _lock; one breaker for the sync and async clients of the same backend
+    global _breaker
+    if _breaker is None:
+        from .backends.resilient import CircuitBreaker
+        _breaker = CircuitBreaker(BREAKER_FAILURES, BREAKER_RESET_SECONDS)
+    return _breaker
+
 
 def get_client():
-    return supabase
+    """Shared storage backend for all DAOs, chosen by STORAGE_BACKEND."""
+    if _backend is None:
+        with _lock:
+            _ensure_client()
+    return _backend
+
+
+def get_async_client():
+    """Shared async backend for the Async*DAO classes. Supabase uses its native
+    async client, with the same retries and circuit breaker as the sync client;
+    other backends run the (already resilient) sync client on a bounded worker pool."""
+    global _async_backend
+    if _async_backend is None:
+        from .backends.async_backend import AsyncResilientBackend, AsyncSupabaseBackend, AsyncThreadBackend
+        with _lock:
+            if _async_backend is None:
+                name = _backend.name if _backend is not None else STORAGE_BACKEND
+                if name == "supabase":
+                    _async_backend = AsyncResilientBackend(AsyncSupabaseBackend(), RETRY_ATTEMPTS, RETRY_BASE_MS,
+                                                           RETRY_MAX_MS, _get_breaker())
+                else:
+                    _async_backend = AsyncThreadBackend(_ensure_client(), ASYNC_MAX_WORKERS)
+    return _async_backend
+
+
+def set_client(backend) -> None:
+    """Swap the shared backend (used by tooling that runs against a stand-in)."""
+    global _backend, _async_backend, _breaker
+    with _lock:
+        _breaker = None  # the stand-in's health says nothing about the real backend
+        _backend = _wrap(backend)
+        _async_backend = None
+
+
+def resilience_stats() -> Dict:
+    """Circuit breaker state and retry counts of the shared backend."""
+    stats = getattr(_backend, "stats", None)
+    result = stats() if stats else {}
+    async_stats = getattr(_async_backend, "stats", None)  # only the native async client has its own
+    if async_stats:
+        result.update({f"async_{k}": v for k, v in async_stats().items()})
+    return result
@@ -1,7 +1,8 @@
 # src/dao/user_dao.py
-import email
-from typing import Dict, Optional, List
-from .supabase_client import get_client
+from typing import Dict, Iterable, Iterator, Optional, List, Set
+from src.config import PAGE_SIZE, PAGE_PREFETCH
+from .pagination import iter_keyset
+from .supabase_client import get_client, get_async_client
 
 class UserDAO:
     def __init__(self):
@@ -11,6 +12,21 @@ class UserDAO:
         resp = self.sb.table("users").insert({"name": name, "email": email}).execute()
         return resp.data[0] if resp.data else None
 
+    def create_if_absent(self, name: str, email: str) -> Optional[Dict]:
+        # one round trip; the unique email index settles concurrent sign-ups. None if the email exists
+        resp = (self.sb.table("users").upsert({"name": name, "email": email}, on_conflict="email",
+                                              ignore_duplicates=True).execute())
+        return resp.data[0] if resp.data else None
+
+    def create_many_if_absent(self, users: Iterable[Dict], chunk_size: int = 1000) -> List[Dict]:
+        # users: dicts with name and email; returns only the rows that were created
+        users = list(users)
+        created = []
+        for i in range(0, len(users), chunk_size):
+            resp = (self.sb.table("users").upsert(users[i:i + chunk_size], on_conflict="email",
+                                                  ignore_duplicates=True).execute())
+            created.extend(resp.data)
+        return created
 
     def get_by_email(self, email: str):
         resp = self.sb.table("users").select("*").eq("email", email).execute()
@@ -22,6 +38,50 @@ class UserDAO:
         
         return resp.data[0] if resp.data else None
 
+    def existing_ids(self, user_ids: Iterable[str], chunk_size: int = 500) -> Set[str]:
+        ids = list(dict.fromkeys(user_ids))
+        found = set()
+        for i in range(0, len(ids), chunk_size):
+            found.update(u["id"] for u in self.sb.table("users").select("id").in_("id", ids[i:i + chunk_size]).execute().data)
+        return found
+
     def list_all(self) -> List[Dict]:
         resp = self.sb.table("users").select("*").execute()
         return resp.data
+
+    def iter_all(self, page_size: int = PAGE_SIZE, prefetch: bool = PAGE_PREFETCH) -> Iterator[Dict]:
+        return iter_keyset(lambda: self.sb.table("users").select("*"), page_size, prefetch)
+
+
+class AsyncUserDAO:
+    def __init__(self):
+        self.sb = get_async_client()
+
+    async def create(self, name: str, email: str):
+        resp = await self.sb.table("users").insert({"name": name, "email": email}).execute()
+        return resp.data[0] if resp.data else None
+
+    async def create_if_absent(self, name: str, email: str) -> Optional[Dict]:
+        resp = await (self.sb.table("users").upsert({"name": name, "email": email}, on_conflict="email",
+                                                    ignore_duplicates=True).execute())
+        return resp.data[0] if resp.data else None
+
+    async def get_by_email(self, email: str):
+        resp = await self.sb.table("users").select("*").eq("email", email).execute()
+        return resp.data[0] if resp.data else None
+
+    async def get_by_id(self, user_id: str) -> Optional[Dict]:
+        resp = await self.sb.table("users").select("*").eq("id", user_id).execute()
+        return resp.data[0] if resp.data else None
+
+    async def existing_ids(self, user_ids: Iterable[str], chunk_size: int = 500) -> Set[str]:
+        ids = list(dict.fromkeys(user_ids))
+        found = set()
+        for i in range(0, len(ids), chunk_size):
+            resp = await self.sb.table("users").select("id").in_("id", ids[i:i + chunk_size]).execute()
+            found.update(u["id"] for u in resp.data)
+        return found
+
+    async def list_all(self) -> List[Dict]:
+        resp = await self.sb.table("users").select("*").execute()
+        return resp.data
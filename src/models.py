@@ -1,33 +1,172 @@
 # src/models.py
-from dataclasses import dataclass
-from datetime import datetime
-from typing import Optional
-
-@dataclass
-class User:
-    id: str
-    name: str
-    email: str
-    created_at: Optional[datetime] = None
-
-@dataclass
-class Auction:
-    id: str
-    title: str
-    description: Optional[str]
-    reserve_price: float
-    start_time: str
-    end_time: str
-    created_by: Optional[str]
-    is_closed: bool = False
-    created_at: Optional[str] = None
-
-@dataclass
-class Bid:
-    id: str
-    auction_id: str
-    bidder_id: Optional[str]
-    commitment: Optional[str]
-    amount: Optional[float]
-    revealed: bool = False
-    created_at: Optional[str] = None
+"""Typed records decoded once from backend rows.
+
+Rows come back from every backend as JSON-shaped dicts: timestamps are ISO
+strings and amounts are strings or floats. Records decode them once, when the
+DAO builds them: timestamps become aware UTC datetimes and numeric columns
+become Decimal. Services then compute on the attributes directly. `to_dict()`
+turns a record back into the JSON-shaped dict the app and CLI display.
+
+Records use __slots__, so they take a fraction of a dict's memory. Treat them
+as read-only, because the DAOs share them through caches and coalesced reads.
+For bulk loads, BidBatch stores bids as parallel typed arrays instead of one
+object per row.
+
+DAOs return records where services compute on the values:
+- `AuctionDAO.get_record` / `get_records`;
+- `BidDAO.get` / `get_many` / `top_n`;
+- `PaymentDAO.list_for_auctions` / `iter_since`.
+Everything else returns the backend's row dicts. That covers writes
+(`create_*`, `reveal`, `reveal_many`, `close`), `AuctionDAO.get` / `get_many`
+and the display listings (`list_*`, `iter_*`). Those rows go to callers
+unchanged, and decoding them only to re-encode would be wasted work."""
+from array import array
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+from src.dao.backends.schema import DEFAULTS, TABLES
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def parse_timestamp(value) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        dt = value
+    else:
+        dt = datetime.fromisoformat(value)
+    if dt is not None and dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+def parse_decimal(value) -> Optional[Decimal]:
+    if value is None or isinstance(value, Decimal):
+        return value
+    return Decimal(value if isinstance(value, str) else str(value))
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+_DECODERS = {
+    "timestamp": parse_timestamp,
+    "numeric": parse_decimal,
+    "bool": bool,
+    "int": int,
+}
+
+
+class Record:
+    """Base for the typed records; subclasses list the table's columns in __slots__."""
+    __slots__ = ()
+    TABLE = ""
+    _fields: Tuple = ()  # (column, decoder or None, default)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        kinds = TABLES[cls.TABLE]
+        defaults = DEFAULTS.get(cls.TABLE, {})
+        if set(cls.__slots__) != set(kinds):
+            raise TypeError(f"{cls.__name__} slots must match the {cls.TABLE} columns")
+        cls._fields = tuple((col, _DECODERS.get(kinds[col]), defaults.get(col)) for col in cls.__slots__)
+
+    @classmethod
+    def from_row(cls, row: Dict):
+        """Decode a backend row. Columns the query did not select are None
+        (or the column default)."""
+        record = cls.__new__(cls)
+        for col, decode, default in cls._fields:
+            value = row.get(col)
+            if value is None:
+                value = default
+            elif decode is not None:
+                value = decode(value)
+            setattr(record, col, value)
+        return record
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict]) -> List:
+        return [cls.from_row(r) for r in rows]
+
+    def to_dict(self) -> Dict:
+        return {col: _encode(getattr(self, col)) for col, _, _ in self._fields}
+
+    def __repr__(self):
+        return f"{type(self).__name__}(id={getattr(self, 'id', None)!r})"
+
+
+class User(Record):
+    __slots__ = ("id", "name", "email", "created_at")
+    TABLE = "users"
+
+
+class Auction(Record):
+    __slots__ = ("id", "title", "description", "reserve_price", "start_time", "end_time", "created_by",
+                 "is_closed", "auction_type", "units", "created_at")
+    TABLE = "auctions"
+
+    def is_open_at(self, now: datetime) -> bool:
+        return self.start_time <= now <= self.end_time
+
+
+class Bid(Record):
+    __slots__ = ("id", "auction_id", "bidder_id", "commitment", "amount", "revealed", "created_at")
+    TABLE = "bids"
+
+
+class Payment(Record):
+    __slots__ = ("id", "auction_id", "bid_id", "payer_id", "amount_paid", "created_at")
+    TABLE = "payments"
+
+
+class BidBatch:
+    """Many bids as parallel columns: the auction each bid belongs to (an index
+    into `auctions`), whether it was revealed, its amount as float64 (NaN when
+    unrevealed) and created_at as epoch microseconds. The columns are stdlib
+    arrays, so NumPy can wrap them without copying (see `numpy_columns`). That
+    is 25 bytes per bid (8 + 1 + 8 + 8), plus one string per distinct auction,
+    against several hundred for a dict per row."""
+    __slots__ = ("auctions", "_index", "auction", "revealed", "amount", "created_us")
+
+    def __init__(self):
+        self.auctions: List[str] = []
+        self._index: Dict[str, int] = {}
+        self.auction = array("q")  # "q" is 8 bytes everywhere; "l" is 4 on Windows
+        self.revealed = array("b")
+        self.amount = array("d")
+        self.created_us = array("q")
+
+    def append_rows(self, rows: Iterable[Dict]) -> None:
+        nan = float("nan")
+        index, auction, revealed, amount, created = (self._index, self.auction, self.revealed,
+                                                     self.amount, self.created_us)
+        for r in rows:
+            i = index.get(r["auction_id"])
+            if i is None:
+                i = index[r["auction_id"]] = len(self.auctions)
+                self.auctions.append(r["auction_id"])
+            auction.append(i)
+            revealed.append(1 if r["revealed"] else 0)
+            a = r["amount"]
+            amount.append(nan if a is None else float(a))
+            created.append((parse_timestamp(r["created_at"]) - _EPOCH) // _MICROSECOND)
+
+    def __len__(self):
+        return len(self.auction)
+
+    def numpy_columns(self):
+        """(auction index int64, revealed bool, amount float64, created epoch-seconds
+        float64) as NumPy arrays; the auction and amount columns share memory with the batch."""
+        import numpy as np
+
+        return (np.frombuffer(self.auction, dtype=np.int64),
+                np.frombuffer(self.revealed, dtype=np.int8).astype(bool),
+                np.frombuffer(self.amount, dtype=np.float64),
+                np.frombuffer(self.created_us, dtype=np.int64) / 1e6)
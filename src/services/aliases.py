@@ -0,0 +1,141 @@
+# src/services/aliases.py
+"""Short, durable aliases for ids: U1 for the first user, A3 for the third
+auction, B12 for the twelfth bid.
+
+Aliases live in the "aliases" table of the storage backend (or a local SQLite
+file with ALIAS_STORE=sqlite), so they survive restarts and are shared by every
+Streamlit session and CLI process. Each prefix keeps an in-memory next-number
+counter, seeded once from the highest stored number; when another process took
+that number first the insert comes back empty and the counter is re-seeded.
+Lookups in both directions go through a bounded LRU cache - an alias never
+changes once assigned."""
+import re
+import threading
+from typing import Dict, Iterable, Optional
+from src.config import ALIAS_STORE, ALIAS_SQLITE_PATH, ALIAS_CACHE_SIZE
+from src.dao.alias_dao import AliasDAO
+from src.dao.backends.base import is_unique_violation
+from src.dao.cache import TTLCache
+
+_ALIAS_RE = re.compile(r"^([A-Z]+)(\d+)$")
+
+
+class AliasError(Exception):
+    pass
+
+
+class AliasRegistry:
+    def __init__(self, dao: Optional[AliasDAO] = None, cache_size: int = ALIAS_CACHE_SIZE, max_attempts: int = 20):
+        self.dao = dao or AliasDAO()
+        self.max_attempts = max_attempts
+        self._targets = TTLCache(cache_size, float("inf"))  # alias -> target id
+        self._aliases = TTLCache(cache_size, float("inf"))  # target id -> alias
+        self._next: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _remember(self, alias: str, target_id: str) -> str:
+        self._targets.set(alias, target_id)
+        self._aliases.set(target_id, alias)
+        return alias
+
+    def _take_number(self, prefix: str, refresh: bool = False) -> int:
+        with self._lock:
+            if refresh or prefix not in self._next:
+                self._next[prefix] = max(self._next.get(prefix, 1), self.dao.max_seq(prefix) + 1)
+            seq = self._next[prefix]
+            self._next[prefix] = seq + 1
+            return seq
+
+    def assign(self, prefix: str, target_id: str) -> str:
+        """Alias for `target_id` under `prefix` (upper-case letters); the existing
+        one if the id already has an alias."""
+        if not re.fullmatch(r"[A-Z]+", prefix):
+            raise AliasError("prefix must be upper-case letters")
+        cached = self._aliases.get(target_id)
+        if cached:
+            return cached
+        # looked up first so an id that already has an alias does not use up a number
+        row = self.dao.get_by_target(target_id)
+        if row is not None:
+            return self._remember(row["id"], target_id)
+        refresh = False
+        for _ in range(self.max_attempts):
+            seq = self._take_number(prefix, refresh)
+            alias = f"{prefix}{seq}"
+            try:
+                row = self.dao.create(alias, prefix, seq, target_id)
+            except Exception as e:
+                if not is_unique_violation(e):
+                    raise
+                # unique target_id: a concurrent assign for the same id won
+                row = self.dao.get_by_target(target_id)
+                if row is None:
+                    raise
+                return self._remember(row["id"], target_id)
+            if row is not None:
+                return self._remember(alias, target_id)
+            refresh = True
+        raise AliasError(f"could not allocate an alias for prefix {prefix}")
+
+    def resolve(self, value: str) -> str:
+        """Target id for an alias like U1 or A3; anything else is returned unchanged."""
+        value = (value or "").strip()
+        if not _ALIAS_RE.match(value):
+            return value
+        target = self._targets.get(value)
+        if target is None:
+            row = self.dao.get(value)
+            if row is None:
+                return value
+            target = row["target_id"]
+            self._remember(value, target)
+        return target
+
+    def alias_for(self, target_id: str) -> Optional[str]:
+        alias = self._aliases.get(target_id)
+        if alias is None:
+            row = self.dao.get_by_target(target_id)
+            if row is None:
+                return None
+            alias = self._remember(row["id"], target_id)
+        return alias
+
+    def aliases_for(self, target_ids: Iterable[str]) -> Dict[str, str]:
+        """Aliases of many ids, with one query for all the uncached ones. Ids
+        without an alias are left out."""
+        found, missing = {}, []
+        for target_id in dict.fromkeys(target_ids):
+            alias = self._aliases.get(target_id)
+            if alias is None:
+                missing.append(target_id)
+            else:
+                found[target_id] = alias
+        if missing:
+            for row in self.dao.get_by_targets(missing):
+                found[row["target_id"]] = self._remember(row["id"], row["target_id"])
+        return found
+
+    def stats(self) -> Dict:
+        return {"aliases": self._targets.stats(), "targets": self._aliases.stats()}
+
+
+_registry: Optional[AliasRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> AliasRegistry:
+    """Process-wide registry on the configured store, created on first use."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                dao = None
+                if ALIAS_STORE == "sqlite":
+                    from src.dao.backends import create_backend
+                    dao = AliasDAO(create_backend("sqlite", path=ALIAS_SQLITE_PATH))
+                _registry = AliasRegistry(dao)
+    return _registry
+
+
+def resolve_id(value: str) -> str:
+    return get_registry().resolve(value)
@@ -0,0 +1,100 @@
+# src/services/analytics.py
+"""Vectorized per-auction bid statistics over columnar (NumPy) arrays.
+
+Imported lazily by ReportingService.summaries so the regular service import path
+does not pay for NumPy."""
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from src.models import BidBatch
+
+PERCENTILES = (25, 50, 75, 90)
+TIME_BINS = 10
+
+
+class BidColumns:
+    """Bids of many auctions as parallel arrays, one entry per bid, with
+    `auction` indexing into `auction_ids`."""
+
+    def __init__(self, auction_ids: List[str], batch: BidBatch):
+        self.auction_ids = auction_ids
+        index = {a: i for i, a in enumerate(auction_ids)}
+        # the batch numbers auctions in the order it met them; renumber onto auction_ids
+        remap = np.array([index[a] for a in batch.auctions], dtype=np.int64)
+        auction, self.revealed, self.amount, self.created = batch.numpy_columns()
+        self.auction = remap[auction]
+
+    def __len__(self):
+        return len(self.auction)
+
+
+def _group_quantiles(sorted_values: "np.ndarray", starts: "np.ndarray", counts: "np.ndarray", q: float) -> "np.ndarray":
+    """Linear-interpolated quantile of each group in an array sorted by (group, value)."""
+    out = np.full(len(counts), np.nan)
+    has = counts > 0
+    pos = starts[has] + (counts[has] - 1) * q
+    lo = np.floor(pos).astype(np.int64)
+    hi = np.ceil(pos).astype(np.int64)
+    frac = pos - lo
+    out[has] = sorted_values[lo] * (1 - frac) + sorted_values[hi] * frac
+    return out
+
+
+def auction_stats(auction_ids: List[str], batch: BidBatch, reserves: Sequence[float],
+                  starts: Sequence[float], ends: Sequence[float]) -> Dict[str, Dict]:
+    """Per-auction stats. `reserves`, `starts` and `ends` (epoch seconds) are
+    aligned with `auction_ids`; `batch` holds their bids."""
+    n = len(auction_ids)
+    reserves = np.asarray(reserves, dtype=np.float64)
+    starts = np.asarray(starts, dtype=np.float64)
+    ends = np.asarray(ends, dtype=np.float64)
+    cols = BidColumns(auction_ids, batch)
+    total = np.bincount(cols.auction, minlength=n)
+
+    # revealed amounts sorted by (auction, amount) so each auction is one contiguous run
+    mask = cols.revealed & ~np.isnan(cols.amount)
+    r_auction = cols.auction[mask]
+    r_amount = cols.amount[mask]
+    order = np.lexsort((r_amount, r_auction))
+    r_auction, r_amount = r_auction[order], r_amount[order]
+    revealed = np.bincount(r_auction, minlength=n)
+    group_start = np.concatenate(([0], np.cumsum(revealed)[:-1])).astype(np.int64)
+    has = revealed > 0
+
+    highest = np.full(n, np.nan)
+    highest[has] = r_amount[group_start[has] + revealed[has] - 1]
+    two = revealed > 1
+    second = np.full(n, np.nan)
+    second[two] = r_amount[group_start[two] + revealed[two] - 2]
+    sums = np.bincount(r_auction, weights=r_amount, minlength=n)
+    mean = np.divide(sums, revealed, out=np.full(n, np.nan), where=has)
+    pcts = {p: _group_quantiles(r_amount, group_start, revealed, p / 100.0) for p in PERCENTILES}
+    hits = np.bincount(r_auction, weights=(r_amount >= reserves[r_auction]).astype(np.float64), minlength=n)
+    reserve_hit_rate = np.divide(hits, revealed, out=np.full(n, np.nan), where=has)
+    reveal_rate = np.divide(revealed, total, out=np.full(n, np.nan), where=total > 0)
+
+    # when in the bidding window bids arrived, as TIME_BINS equal slices
+    span = np.maximum(ends - starts, 1e-9)
+    frac = (cols.created - starts[cols.auction]) / span[cols.auction]
+    bins = np.clip((frac * TIME_BINS).astype(np.int64), 0, TIME_BINS - 1)
+    time_hist = np.bincount(cols.auction * TIME_BINS + bins, minlength=n * TIME_BINS).reshape(n, TIME_BINS)
+
+    def num(x):
+        return None if np.isnan(x) else float(x)
+
+    return {
+        auction_id: {
+            "total_bids": int(total[i]),
+            "total_revealed": int(revealed[i]),
+            "reveal_rate": num(reveal_rate[i]),
+            "highest": num(highest[i]),
+            "second_price": num(second[i]),
+            "mean": num(mean[i]),
+            "median": num(pcts[50][i]),
+            "percentiles": {f"p{p}": num(pcts[p][i]) for p in PERCENTILES},
+            "reserve_hit_rate": num(reserve_hit_rate[i]),
+            "bid_time_distribution": time_hist[i].tolist(),
+        }
+        for i, auction_id in enumerate(auction_ids)
+    }
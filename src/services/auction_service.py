@@ -1,31 +1,87 @@
 # src/services/auction_service.py
-from typing import Dict, Optional, List
+from typing import Callable, Dict, Iterable, Iterator, Optional, List
 from decimal import Decimal
 from datetime import datetime, timezone
-from src.dao.auction_dao import AuctionDAO
-from src.dao.audit_dao import AuditDAO
+from src.dao.auction_dao import AuctionDAO, AsyncAuctionDAO
+from src.dao.audit_dao import AuditDAO, AsyncAuditDAO
+from src.services.clearing import AUCTION_TYPES, FIRST_PRICE, MULTI_UNIT_TYPES
+from src.services.views import views
 
 class AuctionError(Exception):
     pass
 
+def _auction_payload(title: str, description: str, reserve_price: float, start: datetime, end: datetime, creator_id: str,
+                     auction_type: str = FIRST_PRICE, units: int = 1) -> Dict:
+    if end <= start:
+        raise AuctionError("end must be after start")
+    if auction_type not in AUCTION_TYPES:
+        raise AuctionError(f"auction_type must be one of {', '.join(AUCTION_TYPES)}")
+    if units < 1 or (units > 1 and auction_type not in MULTI_UNIT_TYPES):
+        raise AuctionError("units must be 1, or more for uniform and discriminatory auctions")
+    payload = {
+        "title": title,
+        "description": description,
+        "reserve_price": str(reserve_price),
+        "start_time": start.isoformat(),
+        "end_time": end.isoformat(),
+        "created_by": creator_id
+    }
+    # only sent when not the default, so tables without these columns keep working
+    if auction_type != FIRST_PRICE or units != 1:
+        payload["auction_type"] = auction_type
+        payload["units"] = units
+    return payload
+
+# called with each newly created auction (e.g. by the close scheduler to track its end_time)
+_create_listeners: List[Callable[[Dict], None]] = []
+
+
+def on_create(listener: Callable[[Dict], None]) -> None:
+    if listener not in _create_listeners:
+        _create_listeners.append(listener)
+
+
+def remove_create_listener(listener: Callable[[Dict], None]) -> None:
+    if listener in _create_listeners:
+        _create_listeners.remove(listener)
+
+
+def _notify_created(auction: Dict) -> None:
+    views.auction_changed(auction["id"])
+    for listener in list(_create_listeners):
+        listener(auction)
+
+# called with the ids of auctions that were just closed, wherever the close happened
+_close_listeners: List[Callable[[List[str]], None]] = []
+
+
+def on_close(listener: Callable[[List[str]], None]) -> None:
+    if listener not in _close_listeners:
+        _close_listeners.append(listener)
+
+
+def remove_close_listener(listener: Callable[[List[str]], None]) -> None:
+    if listener in _close_listeners:
+        _close_listeners.remove(listener)
+
+
+def notify_closed(auction_ids: Iterable[str]) -> None:
+    ids = list(auction_ids)
+    views.auctions_changed(ids)
+    for listener in list(_close_listeners):
+        listener(ids)
+
 class AuctionService:
     def __init__(self):
         self.dao = AuctionDAO()
         self.audit = AuditDAO()
 
-    def create(self, title: str, description: str, reserve_price: float, start: datetime, end: datetime, creator_id: str) -> Dict:
-        if end <= start:
-            raise AuctionError("end must be after start")
-        payload = {
-            "title": title,
-            "description": description,
-            "reserve_price": str(reserve_price),
-            "start_time": start.isoformat(),
-            "end_time": end.isoformat(),
-            "created_by": creator_id
-        }
+    def create(self, title: str, description: str, reserve_price: float, start: datetime, end: datetime, creator_id: str,
+               auction_type: str = FIRST_PRICE, units: int = 1) -> Dict:
+        payload = _auction_payload(title, description, reserve_price, start, end, creator_id, auction_type, units)
         auction = self.dao.create(payload)
         self.audit.log("auction", auction["id"], "create", {"title": title})
+        _notify_created(auction)
         return auction
 
     def get(self, auction_id: str) -> Optional[Dict]:
@@ -34,7 +90,48 @@ class AuctionService:
     def list_open(self) -> List[Dict]:
         return self.dao.list_open()
 
+    def iter_open(self) -> Iterator[Dict]:
+        """Stream open auctions page by page instead of loading them all."""
+        return self.dao.iter_open()
+
+    def search(self, query: str = "", min_reserve: Optional[float] = None, max_reserve: Optional[float] = None,
+               ends_after: Optional[datetime] = None, ends_before: Optional[datetime] = None,
+               sort: str = "end_time", page: int = 1, page_size: int = 20) -> Dict:
+        """One page of open auctions matching `query` and the filters; see src.services.search."""
+        from src.services.search import get_index  # the index subscribes to this module's events
+        return get_index().search(query, min_reserve, max_reserve, ends_after, ends_before, sort, page, page_size)
+
     def close(self, auction_id: str) -> Dict:
         closed = self.dao.close(auction_id)
+        notify_closed([auction_id])
         self.audit.log("auction", auction_id, "close", {})
         return closed
+
+    def cache_stats(self) -> Dict:
+        return self.dao.cache_stats()
+
+
+class AsyncAuctionService:
+    def __init__(self):
+        self.dao = AsyncAuctionDAO()
+        self.audit = AsyncAuditDAO()
+
+    async def create(self, title: str, description: str, reserve_price: float, start: datetime, end: datetime, creator_id: str,
+                     auction_type: str = FIRST_PRICE, units: int = 1) -> Dict:
+        payload = _auction_payload(title, description, reserve_price, start, end, creator_id, auction_type, units)
+        auction = await self.dao.create(payload)
+        await self.audit.log("auction", auction["id"], "create", {"title": title})
+        _notify_created(auction)
+        return auction
+
+    async def get(self, auction_id: str) -> Optional[Dict]:
+        return await self.dao.get(auction_id)
+
+    async def list_open(self) -> List[Dict]:
+        return await self.dao.list_open()
+
+    async def close(self, auction_id: str) -> Dict:
+        closed = await self.dao.close(auction_id)
+        notify_closed([auction_id])
+        await self.audit.log("auction", auction_id, "close", {})
+        return closed
@@ -0,0 +1,191 @@
+# src/services/audit_verify.py
+"""Verify the hash-chained audit segments written in AUDIT_MODE=chained.
+
+    python -m src verify-audit [--dir audit_chain] [--workers N] [--checkpoint PATH] [--full]
+
+Segments are memory-mapped and checked in parallel, one per worker process.
+Each check recomputes every hash in the segment, starting from the prev hash
+in its header, and confirms that seq numbers run without gaps. The segments
+are then linked: each must start from the last hash and next seq of the one
+before it, and the first must start from GENESIS.
+
+Each clean segment's result, including the SHA-256 of its bytes, is saved to a
+checkpoint file as soon as it is verified. A later run does not re-walk the
+chain of a segment whose digest still matches, so an interrupted or repeated
+verification only re-checks new or modified segments, usually just the one
+still being appended to. Size and mtime are never trusted on their own: both
+can be reset after an edit. The checkpoint lives outside the audit directory
+(AUDIT_VERIFY_CHECKPOINT), since anyone who can rewrite segments there could
+rewrite a checkpoint next to them too. `--full` ignores the checkpoint and
+re-reads everything. An unterminated line at the end of the
+newest segment is an append in progress (or a crash the writer repairs) and
+is left out rather than reported."""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+from typing import Dict, List, Optional
+from src.config import AUDIT_CHAIN_DIR, AUDIT_VERIFY_CHECKPOINT
+from src.dao.audit_chain import GENESIS, list_segments, parse_header
+
+
+def verify_segment(path: str) -> Dict:
+    """Check one segment on its own. Top level so it can run in pool workers."""
+    st = os.stat(path)
+    result = {"segment": os.path.basename(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns,
+              "first_seq": None, "prev": None, "last_seq": None, "last_hash": None,
+              "entries": 0, "partial_tail": False, "error": None, "sha256": None}
+    if not st.st_size:
+        result["error"] = "empty segment"
+        return result
+    sha256 = hashlib.sha256
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        end = m.find(b"\n")
+        try:
+            if end < 0:
+                raise ValueError("incomplete header")
+            first_seq, prev = parse_header(m[:end])
+        except ValueError as e:
+            result["error"] = f"bad segment header: {e}"
+            return result
+        result["first_seq"], result["prev"] = first_seq, prev
+        seq, prev_hash, pos, size = first_seq, prev.encode(), end + 1, len(m)
+        while pos < size:
+            nl = m.find(b"\n", pos)
+            if nl < 0:
+                # an append in progress, or a torn write the next append cuts off
+                result["partial_tail"] = True
+                break
+            line = m[pos:nl]
+            body = line[65:]
+            if line[64:65] != b" " or not body.startswith(b'{"seq":%d,' % seq):
+                result["error"] = f"seq {seq}: malformed or out-of-order entry at byte {pos}"
+                break
+            if sha256(prev_hash + body).hexdigest().encode() != line[:64]:
+                result["error"] = f"seq {seq}: hash mismatch at byte {pos}"
+                break
+            prev_hash = line[:64]
+            seq += 1
+            pos = nl + 1
+        if result["error"] is None and not result["partial_tail"]:
+            result["sha256"] = hashlib.sha256(m).hexdigest()  # what a checkpoint re-check compares
+    result["last_seq"], result["last_hash"] = seq - 1, prev_hash.decode()
+    result["entries"] = seq - first_seq
+    return result
+
+
+def load_checkpoint(path: Optional[str], directory: str) -> Dict:
+    """Saved segment results for `directory` (a checkpoint of another directory counts as empty)."""
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        saved = json.load(f)
+    return saved.get("segments", {}) if saved.get("directory") == os.path.abspath(directory) else {}
+
+
+def save_checkpoint(path: str, directory: str, segments: Dict) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"directory": os.path.abspath(directory), "segments": segments}, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def _file_digest(path: str) -> str:
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        return hashlib.sha256(m).hexdigest()
+
+
+def _unchanged(saved: Optional[Dict], path: str) -> bool:
+    """The segment still has exactly the bytes that were verified. A size change
+    rules that out cheaply; otherwise the content digest decides."""
+    if not saved or not saved.get("sha256") or os.path.getsize(path) != saved["size"]:
+        return False
+    return _file_digest(path) == saved["sha256"]
+
+
+def verify_chain(directory: str = AUDIT_CHAIN_DIR, workers: Optional[int] = None,
+                 checkpoint_path: Optional[str] = None, full: bool = False) -> Dict:
+    """Verify every segment in `directory` and the links between them. Returns
+    counts, the verified head (last seq and hash of the segments before the
+    first failure) and a list of errors."""
+    segments = list_segments(directory)
+    checkpoint = {} if full else load_checkpoint(checkpoint_path, directory)
+    results: Dict[str, Dict] = {}
+    todo: List[str] = []
+    for path in segments:
+        name = os.path.basename(path)
+        if _unchanged(checkpoint.get(name), path):
+            results[name] = checkpoint[name]
+        else:
+            todo.append(path)
+    checkpoint = dict(results)
+
+    workers = workers or os.cpu_count() or 1
+    pool = None
+    if workers > 1 and len(todo) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        pool = ProcessPoolExecutor(max_workers=min(workers, len(todo)))
+    try:
+        for result in (pool.map(verify_segment, todo) if pool else map(verify_segment, todo)):
+            results[result["segment"]] = result
+            if checkpoint_path and result["error"] is None and not result["partial_tail"]:
+                checkpoint[result["segment"]] = result
+                save_checkpoint(checkpoint_path, directory, checkpoint)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    errors = []
+    expected_seq, expected_prev = 1, GENESIS
+    linked = True  # False right after a broken segment, whose real end is unknown
+    head = {"seq": 0, "hash": GENESIS}  # end of the clean prefix: nothing after a failure counts
+    for i, path in enumerate(segments):
+        r = results[os.path.basename(path)]
+        if r["error"]:
+            errors.append(f"{r['segment']}: {r['error']}")
+        elif r["partial_tail"] and i < len(segments) - 1:
+            errors.append(f"{r['segment']}: incomplete last entry in a closed segment")
+        elif linked and (r["first_seq"] != expected_seq or r["prev"] != expected_prev):
+            errors.append(f"{r['segment']}: does not continue the chain "
+                          f"(expected seq {expected_seq} after {expected_prev[:12]}...)")
+        linked = r["error"] is None
+        if r["last_seq"] is not None:
+            expected_seq, expected_prev = r["last_seq"] + 1, r["last_hash"]
+            if not errors:
+                head = {"seq": r["last_seq"], "hash": r["last_hash"]}
+    return {
+        "segments": len(segments),
+        "verified": len(todo),
+        "skipped": len(segments) - len(todo),
+        "entries": sum(r["entries"] for r in results.values()),
+        "head": head,
+        "errors": errors,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src verify-audit",
+                                     description="Verify the hash-chained audit segments.")
+    parser.add_argument("--dir", default=AUDIT_CHAIN_DIR, help="segment directory")
+    parser.add_argument("--workers", type=int, default=None, help="verifier processes (default: CPU count)")
+    parser.add_argument("--checkpoint", default=AUDIT_VERIFY_CHECKPOINT,
+                        help="checkpoint file, kept outside --dir (default: AUDIT_VERIFY_CHECKPOINT)")
+    parser.add_argument("--full", action="store_true", help="ignore the checkpoint and re-verify every segment")
+    args = parser.parse_args(argv)
+
+    if not list_segments(args.dir):
+        print(f"no audit segments in {args.dir}")
+        return 1
+    checkpoint = args.checkpoint
+    if checkpoint and os.path.commonpath([os.path.abspath(checkpoint), os.path.abspath(args.dir)]) \
+            == os.path.abspath(args.dir):
+        parser.error("--checkpoint must be outside the audit directory")
+    report = verify_chain(args.dir, args.workers, checkpoint, args.full)
+    print(f"{report['entries']} entries in {report['segments']} segments "
+          f"({report['verified']} verified, {report['skipped']} unchanged since checkpoint)")
+    head = report["head"]
+    print(f"{'verified up to' if report['errors'] else 'head'}: seq {head['seq']} {head['hash']}")
+    for error in report["errors"]:
+        print(f"FAIL {error}")
+    return 1 if report["errors"] else 0
@@ -1,72 +1,397 @@
 # src/services/bid_service.py
-from typing import Dict, Optional, List
+import threading
+import uuid
+from typing import Dict, Iterable, Iterator, Optional, List, Set, Tuple
 from decimal import Decimal
 from datetime import datetime, timezone
-from src.dao.bid_dao import BidDAO
-from src.dao.auction_dao import AuctionDAO
-from src.dao.audit_dao import AuditDAO
+from src.dao.bid_dao import BidDAO, AsyncBidDAO, new_sealed_row
+from src.dao.bid_journal import BidJournal
+from src.dao.auction_dao import AuctionDAO, AsyncAuctionDAO
+from src.dao.backends.resilient import CircuitOpenError, is_transient
+from src.dao.audit_dao import AuditDAO, AsyncAuditDAO
+from src.dao.cache import TTLCache
+from src.dao.user_dao import UserDAO, AsyncUserDAO
+from src.services.auction_service import notify_closed
+from src.config import (REVEAL_WORKERS, REVEAL_PARALLEL_MIN, BID_ACCEPT_MODE, BID_JOURNAL_DIR,
+                        BID_JOURNAL_BATCH_SIZE, BID_JOURNAL_FLUSH_INTERVAL, BID_JOURNAL_FSYNC)
+from src.models import Auction, Bid
+from src.services.clearing import MULTI_UNIT_TYPES, PRICE_FROM_LOSER_TYPES
+from src.services.commitment import canonical_amount, is_commitment, verify_commitment, verify_many
+from src.services.leaderboard import leaderboards
+from src.services.views import views
 
 class BidError(Exception):
     pass
 
+# how long a reveal waits for its bid to leave the local journal
+_REPLICATION_WAIT = 10.0
+
+_journal: Optional[BidJournal] = None
+_journal_lock = threading.Lock()
+
+# bidders already confirmed to exist (users are never deleted), so journal mode checks each once
+_known_bidders = TTLCache(100000, float("inf"))
+
+
+def get_journal() -> BidJournal:
+    """Process-wide bid journal used when BID_ACCEPT_MODE=journal."""
+    global _journal
+    if _journal is None:
+        with _journal_lock:
+            if _journal is None:
+                _journal = BidJournal(BID_JOURNAL_DIR, _replicate, BID_JOURNAL_BATCH_SIZE,
+                                      BID_JOURNAL_FLUSH_INTERVAL, BID_JOURNAL_FSYNC)
+    return _journal
+
+
+def _replicate(rows: List[Dict]) -> None:
+    """Journal -> backend: insert the bids, then audit the ones no earlier attempt audited."""
+    inserted = {b["id"] for b in BidDAO().insert_sealed_rows(rows)}
+    again = [r["id"] for r in rows if r["id"] not in inserted]
+    audit = AuditDAO()
+    if again:
+        # sent before: that attempt may have failed or crashed between the two inserts
+        inserted.update(set(again) - audit.entity_ids_with("bid", "create_sealed", again))
+    audit.log_many([{"entity": "bid", "entity_id": r["id"], "action": "create_sealed", "created_at": r["created_at"],
+                     "details": {"auction_id": r["auction_id"], "bidder_id": r["bidder_id"]}}
+                    for r in rows if r["id"] in inserted])
+    views.auctions_changed({r["auction_id"] for r in rows})
+
+
+def _await_journal(bid_ids: List[str]) -> bool:
+    """Wait for these bids, if any are still in the local journal, to reach the
+    backend; bids journaled by other callers are not waited for. True if there
+    were some."""
+    if _journal is None:
+        return False
+    waiting = [b for b in bid_ids if _journal.contains(b)]
+    if not waiting:
+        return False
+    if not _journal.wait_for(waiting, _REPLICATION_WAIT):
+        raise BidError("Bid accepted but not yet stored; try the reveal again shortly")
+    return True
+
+def _unknown(bidder_ids: Iterable[str], existing: Set[str]) -> Set[str]:
+    for b in existing:
+        _known_bidders.set(b, True)
+    return set(bidder_ids) - existing
+
+def _unconfirmed(bidder_ids: Iterable[str]) -> Set[str]:
+    return {b for b in bidder_ids if not _known_bidders.get(b)}
+
+def _check_commitment(commitment: str) -> None:
+    if not commitment or not commitment.strip():
+        raise BidError("Commitment required")
+    if not is_commitment(commitment):
+        raise BidError("Commitment must be a SHA-256 hex digest (see src.services.commitment.make_commitment)")
+
+def _check_bidder(bidder_id: str) -> None:
+    # journal mode acknowledges before the backend sees the row, so catch what it would reject
+    try:
+        uuid.UUID(str(bidder_id))
+    except ValueError:
+        raise BidError("Bidder id must be a user id (UUID)") from None
+
+def _check_bidders_exist(user_dao: UserDAO, bidder_ids: Iterable[str]) -> Set[str]:
+    """Bidders the backend does not know; one query for all the unconfirmed ones."""
+    todo = _unconfirmed(bidder_ids)
+    return _unknown(todo, user_dao.existing_ids(todo)) if todo else set()
+
+def _check_open(auction: Optional[Auction], now: datetime) -> None:
+    if not auction:
+        raise BidError("Auction not found")
+    if not auction.is_open_at(now):
+        raise BidError("Auction not open for bidding")
+
+def _check_reveal(bid: Optional[Bid], amount: float) -> None:
+    if amount <= 0:
+        raise BidError("Amount must be positive")
+    if not bid:
+        raise BidError("Bid not found")
+    if bid.revealed:
+        raise BidError("Bid already revealed")
+
+def _verify(bid: Bid, amount: float, nonce: str) -> None:
+    if not verify_commitment(bid.commitment, amount, nonce, bid.bidder_id, bid.auction_id):
+        raise BidError("Amount and nonce do not match the commitment")
+
+def _bids_needed(auction: Auction) -> int:
+    # the first losing bid sets the price of second-price and uniform auctions
+    return auction.units + 1 if auction.auction_type in PRICE_FROM_LOSER_TYPES else auction.units
+
+def _winner(auction: Auction, top_bids: List[Bid]) -> Optional[Dict]:
+    """Clear the best revealed bids (as ordered by BidDAO.top_n) under the auction's
+    rule. Returns the best winner with the price it pays; multi-unit auctions also
+    list every winner under "winners"."""
+    if not top_bids:
+        return None
+    from src.services.clearing import RESERVE, clear  # deferred: NumPy
+    result = clear(auction.auction_type, [float(b.amount) for b in top_bids], list(range(len(top_bids))),
+                   float(auction.reserve_price), auction.units)
+    if not len(result):
+        return None
+    if result.price_bid is None:
+        price = None
+    elif result.price_bid == RESERVE:
+        price = str(auction.reserve_price)
+    else:
+        price = str(top_bids[result.price_bid].amount)
+    winners = [{"bid_id": b.id, "bidder_id": b.bidder_id, "amount": str(b.amount),
+                "price": str(b.amount) if price is None else price}
+               for b in (top_bids[i] for i in result.winners)]
+    winner = dict(winners[0])
+    if auction.auction_type in MULTI_UNIT_TYPES:
+        winner["winners"] = winners
+    return winner
+
 class BidService:
-    def __init__(self):
+    def __init__(self, accept_mode: Optional[str] = None):
         self.dao = BidDAO()
         self.auction_dao = AuctionDAO()
         self.audit = AuditDAO()
+        self.users = UserDAO()
+        self.accept_mode = accept_mode or BID_ACCEPT_MODE
 
     def place_sealed(self, auction_id: str, bidder_id: str, commitment: str) -> Dict:
-        if not commitment or not commitment.strip():
-            raise BidError("Commitment required")
-        auction = self.auction_dao.get(auction_id)
-        if not auction:
-            raise BidError("Auction not found")
-        now = datetime.now(timezone.utc)
-        start = datetime.fromisoformat(auction["start_time"])
-        end = datetime.fromisoformat(auction["end_time"])
-        if not (start <= now <= end):
-            raise BidError("Auction not open for bidding")
+        _check_commitment(commitment)
+        auction = self.auction_dao.get_record(auction_id)
+        _check_open(auction, datetime.now(timezone.utc))
+        if self.accept_mode == "journal":
+            _check_bidder(bidder_id)
+            if _check_bidders_exist(self.users, [bidder_id]):
+                raise BidError("Bidder not found")
+            # durable locally on return; the journal's flusher inserts the bid and its audit row
+            return get_journal().append(new_sealed_row(auction_id, bidder_id, commitment))
         b = self.dao.create_sealed(auction_id, bidder_id, commitment)
+        views.auction_changed(auction_id)
         self.audit.log("bid", b["id"], "create_sealed", {"auction_id": auction_id, "bidder_id": bidder_id})
         return b
 
-    def reveal(self, bid_id: str, amount: float) -> Dict:
-        if amount <= 0:
-            raise BidError("Amount must be positive")
+    def place_sealed_many(self, items: Iterable[Tuple[str, str, str]], chunk_size: int = 500) -> List[Dict]:
+        """Ingest many (auction_id, bidder_id, commitment) tuples. Each distinct auction
+        is fetched once, accepted bids and their audit rows go in chunked bulk inserts.
+        Returns one result per item, in input order: {"accepted": True, "bid": ...}
+        or {"accepted": False, "error": ...}. A row the backend rejects fails on its
+        own, not with the rest of its chunk."""
+        items = list(items)
+        auctions = self.auction_dao.get_records(a for a, _, _ in items)
+        now = datetime.now(timezone.utc)
+        results: List[Dict] = [{} for _ in items]
+        accepted = []
+        for i, (auction_id, bidder_id, commitment) in enumerate(items):
+            try:
+                _check_commitment(commitment)
+                _check_open(auctions.get(auction_id), now)
+                if self.accept_mode == "journal":
+                    _check_bidder(bidder_id)
+            except BidError as e:
+                results[i] = {"auction_id": auction_id, "bidder_id": bidder_id, "accepted": False, "error": str(e)}
+                continue
+            accepted.append(i)
+
+        if self.accept_mode == "journal":
+            unknown = _check_bidders_exist(self.users, (items[i][1] for i in accepted))
+            if unknown:
+                for i in accepted:
+                    if items[i][1] in unknown:
+                        results[i] = {"auction_id": items[i][0], "bidder_id": items[i][1], "accepted": False,
+                                      "error": "Bidder not found"}
+                accepted = [i for i in accepted if items[i][1] not in unknown]
+            rows = get_journal().append_many([new_sealed_row(*items[i]) for i in accepted])
+            for i, b in zip(accepted, rows):
+                results[i] = {"auction_id": b["auction_id"], "bidder_id": b["bidder_id"], "accepted": True, "bid": b}
+            return results
+
+        audit_entries = []
+        for c in range(0, len(accepted), chunk_size):
+            chunk = accepted[c:c + chunk_size]
+            inserted, failed = self._insert_sealed(items, chunk)
+            for i, error in failed:
+                results[i] = {"auction_id": items[i][0], "bidder_id": items[i][1], "accepted": False, "error": error}
+            for i, b in inserted:
+                results[i] = {"auction_id": b["auction_id"], "bidder_id": b["bidder_id"], "accepted": True, "bid": b}
+                audit_entries.append({
+                    "entity": "bid",
+                    "entity_id": b["id"],
+                    "action": "create_sealed",
+                    "details": {"auction_id": b["auction_id"], "bidder_id": b["bidder_id"]}
+                })
+        views.auctions_changed(e["details"]["auction_id"] for e in audit_entries)
+        self.audit.log_many(audit_entries, chunk_size)
+        return results
+
+    def _insert_sealed(self, items: List[Tuple[str, str, str]], chunk: List[int]) -> Tuple[List, List]:
+        """Insert items[i] for i in chunk. A rejected multi-row insert writes nothing, so it
+        is bisected until the offending rows are isolated and only those fail. A network
+        error fails the whole chunk: the insert may have landed, and sending it again
+        could create the bids twice. Returns (index, bid) and (index, error) pairs."""
+        try:
+            return list(zip(chunk, self.dao.create_sealed_many([items[i] for i in chunk], len(chunk)))), []
+        except Exception as e:
+            if len(chunk) == 1 or is_transient(e) or isinstance(e, CircuitOpenError):
+                return [], [(i, str(e)) for i in chunk]
+        mid = len(chunk) // 2
+        left, right = self._insert_sealed(items, chunk[:mid]), self._insert_sealed(items, chunk[mid:])
+        return left[0] + right[0], left[1] + right[1]
+
+    def reveal(self, bid_id: str, amount: float, nonce: str) -> Dict:
         bid = self.dao.get(bid_id)
-        if not bid:
-            raise BidError("Bid not found")
-        if bid.get("revealed"):
-            raise BidError("Bid already revealed")
-        revealed = self.dao.reveal(bid_id, Decimal(str(amount)))
+        if bid is None and _await_journal([bid_id]):
+            bid = self.dao.get(bid_id)
+        _check_reveal(bid, amount)
+        _verify(bid, amount, nonce)
+        revealed = self.dao.reveal(bid_id, Decimal(canonical_amount(amount)))
+        leaderboards.record_reveal(Bid.from_row(revealed))
+        views.auction_changed(bid.auction_id)
         self.audit.log("bid", bid_id, "reveal", {"amount": amount})
         return revealed
 
+    def reveal_many(self, items: Iterable[Tuple[str, float, str]], chunk_size: int = 500,
+                    workers: int = REVEAL_WORKERS) -> List[Dict]:
+        """Reveal many (bid_id, amount, nonce) tuples. Bids are fetched in bulk,
+        commitments verified across a process pool for large batches, and the
+        accepted reveals written in chunks. Returns one result per item, in input
+        order: {"accepted": True, "bid": ...} or {"accepted": False, "error": ...}."""
+        items = list(items)
+        bids = self.dao.get_many((b for b, _, _ in items), chunk_size)
+        missing = [b for b, _, _ in items if b not in bids]
+        if missing and _await_journal(missing):
+            bids.update(self.dao.get_many(missing, chunk_size))
+        results: List[Dict] = [{} for _ in items]
+        candidates, seen = [], set()
+        for i, (bid_id, amount, nonce) in enumerate(items):
+            try:
+                _check_reveal(bids.get(bid_id), amount)
+                if bid_id in seen:
+                    raise BidError("Bid revealed twice in the same batch")
+                canonical_amount(amount)
+            except (BidError, ValueError) as e:
+                results[i] = {"bid_id": bid_id, "accepted": False, "error": str(e)}
+                continue
+            seen.add(bid_id)
+            candidates.append(i)
+
+        checks = [(bids[items[i][0]].commitment, str(items[i][1]), items[i][2],
+                   bids[items[i][0]].bidder_id, bids[items[i][0]].auction_id) for i in candidates]
+        accepted = []
+        for i, ok in zip(candidates, verify_many(checks, workers, REVEAL_PARALLEL_MIN)):
+            if ok:
+                accepted.append(i)
+            else:
+                results[i] = {"bid_id": items[i][0], "accepted": False,
+                              "error": "Amount and nonce do not match the commitment"}
+
+        audit_entries = []
+        for c in range(0, len(accepted), chunk_size):
+            chunk = accepted[c:c + chunk_size]
+            try:
+                revealed = self.dao.reveal_many(
+                    [(bids[items[i][0]], Decimal(canonical_amount(items[i][1]))) for i in chunk], chunk_size)
+            except Exception as e:
+                for i in chunk:
+                    results[i] = {"bid_id": items[i][0], "accepted": False, "error": str(e)}
+                continue
+            by_id = {b["id"]: b for b in revealed}
+            for i in chunk:
+                bid_id, amount, _ = items[i]
+                b = by_id[bid_id]
+                leaderboards.record_reveal(Bid.from_row(b))
+                views.auction_changed(b["auction_id"])
+                results[i] = {"bid_id": bid_id, "accepted": True, "bid": b}
+                audit_entries.append({"entity": "bid", "entity_id": bid_id, "action": "reveal", "details": {"amount": amount}})
+        self.audit.log_many(audit_entries, chunk_size)
+        return results
+
     def list_public(self, auction_id: str) -> List[Dict]:
         return self.dao.list_public(auction_id)
 
+    def iter_public(self, auction_id: str) -> Iterator[Dict]:
+        return self.dao.iter_public(auction_id)
+
     def list_revealed(self, auction_id: str) -> List[Dict]:
         return self.dao.list_revealed(auction_id)
 
     def declare_winner(self, auction_id: str) -> Optional[Dict]:
-        auction = self.auction_dao.get(auction_id)
+        auction = self.auction_dao.get_record(auction_id)
         if not auction:
             raise BidError("Auction not found")
         # close auction if not closed
-        if not auction.get("is_closed"):
+        if not auction.is_closed:
             self.auction_dao.close(auction_id)
-        revealed = self.dao.list_revealed(auction_id)
-        if not revealed:
-            return None
-        # sort: highest amount first, tie-breaker earliest created_at
-        from decimal import Decimal
-        def key(b):
-            amt = Decimal(b["amount"])
-            dt = datetime.fromisoformat(b["created_at"])
-            return (-amt, dt.timestamp())
-        revealed_sorted = sorted(revealed, key=key)
-        top = revealed_sorted[0]
-        if Decimal(str(top["amount"])) < Decimal(str(auction["reserve_price"])):
-            return None
-        self.audit.log("auction", auction_id, "declare_winner", {"bid_id": top["id"], "bidder_id": top["bidder_id"], "amount": top["amount"]})
-        return {"bid_id": top["id"], "bidder_id": top["bidder_id"], "amount": top["amount"]}
+            notify_closed([auction_id])
+        # authoritative index-backed read: in-process leaderboards may miss reveals made elsewhere
+        winner = _winner(auction, self.dao.top_n(auction_id, _bids_needed(auction)))
+        if winner:
+            self.audit.log("auction", auction_id, "declare_winner", winner)
+        else:
+            # recorded so a restarted scheduler does not settle the auction again
+            self.audit.log("auction", auction_id, "no_winner", {})
+        return winner
+
+
+class AsyncBidService:
+    """asyncio counterpart of BidService; independent round trips run concurrently."""
+
+    def __init__(self, accept_mode: Optional[str] = None):
+        self.dao = AsyncBidDAO()
+        self.auction_dao = AsyncAuctionDAO()
+        self.audit = AsyncAuditDAO()
+        self.users = AsyncUserDAO()
+        self.accept_mode = accept_mode or BID_ACCEPT_MODE
+
+    async def place_sealed(self, auction_id: str, bidder_id: str, commitment: str) -> Dict:
+        _check_commitment(commitment)
+        auction = await self.auction_dao.get_record(auction_id)
+        _check_open(auction, datetime.now(timezone.utc))
+        if self.accept_mode == "journal":
+            _check_bidder(bidder_id)
+            todo = _unconfirmed([bidder_id])
+            if todo and _unknown(todo, await self.users.existing_ids(todo)):
+                raise BidError("Bidder not found")
+            import asyncio
+            # the append blocks on fsync: run it off the event loop
+            row = new_sealed_row(auction_id, bidder_id, commitment)
+            return await asyncio.get_running_loop().run_in_executor(None, get_journal().append, row)
+        b = await self.dao.create_sealed(auction_id, bidder_id, commitment)
+        views.auction_changed(auction_id)
+        await self.audit.log("bid", b["id"], "create_sealed", {"auction_id": auction_id, "bidder_id": bidder_id})
+        return b
+
+    async def reveal(self, bid_id: str, amount: float, nonce: str) -> Dict:
+        bid = await self.dao.get(bid_id)
+        if bid is None and _journal is not None and _journal.contains(bid_id):
+            import asyncio
+            await asyncio.get_running_loop().run_in_executor(None, _await_journal, [bid_id])
+            bid = await self.dao.get(bid_id)
+        _check_reveal(bid, amount)
+        _verify(bid, amount, nonce)
+        revealed = await self.dao.reveal(bid_id, Decimal(canonical_amount(amount)))
+        leaderboards.record_reveal(Bid.from_row(revealed))
+        views.auction_changed(bid.auction_id)
+        await self.audit.log("bid", bid_id, "reveal", {"amount": amount})
+        return revealed
+
+    async def list_public(self, auction_id: str) -> List[Dict]:
+        return await self.dao.list_public(auction_id)
+
+    async def list_revealed(self, auction_id: str) -> List[Dict]:
+        return await self.dao.list_revealed(auction_id)
+
+    async def declare_winner(self, auction_id: str) -> Optional[Dict]:
+        auction = await self.auction_dao.get_record(auction_id)
+        if not auction:
+            raise BidError("Auction not found")
+        import asyncio  # deferred: keeps the sync import path light
+        # closing and reading the top bid are independent round trips
+        if not auction.is_closed:
+            _, top_bids = await asyncio.gather(self.auction_dao.close(auction_id),
+                                               self.dao.top_n(auction_id, _bids_needed(auction)))
+            notify_closed([auction_id])
+        else:
+            top_bids = await self.dao.top_n(auction_id, _bids_needed(auction))
+        winner = _winner(auction, top_bids)
+        if winner:
+            await self.audit.log("auction", auction_id, "declare_winner", winner)
+        else:
+            await self.audit.log("auction", auction_id, "no_winner", {})
+        return winner
@@ -0,0 +1,82 @@
+# src/services/clearing.py
+"""Clearing rules for sealed-bid auctions, on pre-parsed numeric arrays.
+
+Bids rank by amount (highest first), then created_at (earliest first), then
+position - the same order as BidDAO.top_n. Only bids at or above the reserve
+take part. Each bid asks for one unit.
+
+- first_price: the best bid wins and pays its amount.
+- second_price (Vickrey): the best bid wins and pays the next bid, or the reserve.
+- uniform: the best `units` bids win; all pay the highest losing bid, or the reserve.
+- discriminatory: the best `units` bids win; each pays its own amount.
+
+NumPy is imported on first use so the auction type names stay cheap to import."""
+from typing import Optional, Sequence
+
+FIRST_PRICE = "first_price"
+SECOND_PRICE = "second_price"
+UNIFORM = "uniform"
+DISCRIMINATORY = "discriminatory"
+
+AUCTION_TYPES = (FIRST_PRICE, SECOND_PRICE, UNIFORM, DISCRIMINATORY)
+MULTI_UNIT_TYPES = (UNIFORM, DISCRIMINATORY)
+# rules where the price comes from the first losing bid
+PRICE_FROM_LOSER_TYPES = (SECOND_PRICE, UNIFORM)
+
+RESERVE = -1  # Clearing.price_bid when the reserve sets the price
+
+
+class Clearing:
+    """Winning bid indices, best first, and the index of the bid that sets the
+    common price (RESERVE when the reserve does, None when each winner pays
+    their own bid)."""
+    __slots__ = ("winners", "price_bid")
+
+    def __init__(self, winners, price_bid: Optional[int]):
+        self.winners = winners
+        self.price_bid = price_bid
+
+    def __len__(self):
+        return len(self.winners)
+
+
+def top_k(amounts, created, k: int, eligible=None):
+    """Indices of the k best bids, best first. A partition finds the k-th amount
+    in linear time; only bids at that boundary are sorted, never the whole array."""
+    import numpy as np
+
+    idx = np.flatnonzero(eligible) if eligible is not None else np.arange(len(amounts))
+    if k <= 0 or not len(idx):
+        return idx[:0]
+    if k < len(idx):
+        a = amounts[idx]
+        threshold = np.partition(a, len(a) - k)[len(a) - k]
+        above = idx[a > threshold]
+        tied = idx[a == threshold]
+        need = k - len(above)
+        if len(tied) > need:
+            # earliest created_at, then position, among bids tied at the cut
+            tied = tied[np.lexsort((tied, created[tied]))[:need]]
+        idx = np.concatenate((above, tied))
+    return idx[np.lexsort((idx, created[idx], -amounts[idx]))]
+
+
+def clear(auction_type: str, amounts: Sequence[float], created: Sequence[float],
+          reserve: float = 0.0, units: int = 1) -> Clearing:
+    """Clear one auction. `amounts` and `created` (any increasing time key) are
+    aligned per bid; NaN amounts (unrevealed bids) never win."""
+    import numpy as np
+
+    if auction_type not in AUCTION_TYPES:
+        raise ValueError(f"unknown auction type: {auction_type}")
+    if auction_type not in MULTI_UNIT_TYPES:
+        units = 1
+    amounts = np.asarray(amounts, dtype=np.float64)
+    created = np.asarray(created)
+    eligible = amounts >= reserve  # False for NaN
+    if auction_type in PRICE_FROM_LOSER_TYPES:
+        ranked = top_k(amounts, created, units + 1, eligible)
+        price_bid = int(ranked[units]) if len(ranked) > units else RESERVE
+        winners = ranked[:units]
+        return Clearing(winners, price_bid if len(winners) else None)
+    return Clearing(top_k(amounts, created, units, eligible), None)
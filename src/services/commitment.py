@@ -0,0 +1,112 @@
+# src/services/commitment.py
+"""Sealed-bid commitments: SHA-256 over (amount, nonce, bidder, auction).
+
+A bidder picks an amount, generates a commitment with `make_commitment`, submits
+only the commitment and keeps the nonce. At reveal time the amount and nonce are
+checked against the stored commitment, so a bid cannot be changed after the fact
+and cannot be guessed from the commitment."""
+import hashlib
+import hmac
+import os
+import re
+import threading
+from decimal import Decimal, InvalidOperation
+from typing import List, Sequence, Tuple, Union
+
+SCHEME = "sbn-commit-v1"
+NONCE_BYTES = 16
+
+_COMMITMENT_RE = re.compile(r"^[0-9a-f]{64}$")
+
+Amount = Union[str, int, float, Decimal]
+
+
+def canonical_amount(amount: Amount) -> str:
+    """One spelling per value, so 12.5, "12.50" and Decimal("12.500") commit the same."""
+    try:
+        value = Decimal(str(amount))
+    except InvalidOperation:
+        raise ValueError(f"invalid amount: {amount!r}")
+    if not value.is_finite():
+        raise ValueError(f"invalid amount: {amount!r}")
+    return format(value.normalize(), "f")
+
+
+def _message(amount: str, nonce: str, bidder_id: str, auction_id: str) -> bytes:
+    # length-prefixed fields: no value can run into its neighbour
+    parts = [SCHEME, amount, nonce, str(bidder_id), str(auction_id)]
+    return "".join(f"{len(p)}:{p};" for p in parts).encode()
+
+
+def compute_commitment(amount: Amount, nonce: str, bidder_id: str, auction_id: str) -> str:
+    return hashlib.sha256(_message(canonical_amount(amount), nonce, bidder_id, auction_id)).hexdigest()
+
+
+def new_nonce() -> str:
+    return os.urandom(NONCE_BYTES).hex()
+
+
+def make_commitment(amount: Amount, bidder_id: str, auction_id: str) -> Tuple[str, str]:
+    """Client side: returns (commitment, nonce). Keep the nonce until the reveal."""
+    nonce = new_nonce()
+    return compute_commitment(amount, nonce, bidder_id, auction_id), nonce
+
+
+def is_commitment(value: str) -> bool:
+    return bool(value) and _COMMITMENT_RE.match(value) is not None
+
+
+def verify_commitment(commitment: str, amount: Amount, nonce: str, bidder_id: str, auction_id: str) -> bool:
+    try:
+        expected = compute_commitment(amount, nonce, bidder_id, auction_id)
+    except ValueError:
+        return False
+    return hmac.compare_digest(expected, commitment or "")
+
+
+def verify_batch(items: Sequence[Tuple[str, str, str, str, str]]) -> List[bool]:
+    """Verify (commitment, amount, nonce, bidder_id, auction_id) tuples. Top level
+    so it can be shipped to process-pool workers."""
+    return [verify_commitment(*item) for item in items]
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers: int):
+    """Process pool shared by every verify_many call; started on first big batch."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            from concurrent.futures import ProcessPoolExecutor
+            _pool = ProcessPoolExecutor(max_workers=workers)
+        return _pool
+
+
+def verify_many(items: Sequence[Tuple[str, str, str, str, str]], workers: int,
+                parallel_min: int, chunks_per_worker: int = 4) -> List[bool]:
+    """verify_batch, split across a process pool once the batch is big enough
+    to pay for shipping it to the workers; small batches verify in-process."""
+    if workers <= 1 or len(items) < parallel_min:
+        return verify_batch(items)
+    size = -(-len(items) // (workers * chunks_per_worker))
+    chunks = [items[i:i + size] for i in range(0, len(items), size)]
+    from concurrent.futures.process import BrokenProcessPool
+    results: List[bool] = []
+    try:
+        for part in _get_pool(workers).map(verify_batch, chunks):
+            results.extend(part)
+    except BrokenProcessPool:
+        # workers could not start or died (e.g. spawn from an unguarded script): verify here
+        shutdown_pool()
+        return verify_batch(items)
+    return results
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
@@ -0,0 +1,279 @@
+# src/services/export.py
+"""Streaming export of auctions, bids, payments and audit_log for analytics.
+
+    python -m src export [auctions bids ...] [--out exports] [--format auto|parquet|arrow|csv]
+                         [--since 2024-01-01T00:00:00+00:00] [--state export_state.json]
+
+Each table is read page by page in (created_at, id) order and written in
+batches of EXPORT_BATCH_ROWS rows, so memory stays bounded whatever the table
+size. Columns are typed from the shared schema: numeric as decimal(38, 9),
+timestamps as UTC microseconds, JSON as text. Parquet and Arrow IPC files are
+zstd-compressed and need pyarrow; without it `auto` falls back to gzipped CSV.
+
+`--since` exports rows created at or after a timestamp. `--state` keeps, per
+table, the last exported (created_at, id) in a JSON file, so the next run with
+the same file only exports newer rows. Files are written under a temporary
+name and renamed when complete; the state is saved only after that.
+
+Incremental runs are at-least-once, keyed by id. `created_at` is stamped when
+a row is made, which can be before it is committed: the audit write-behind
+sink and the bid journal insert rows seconds after stamping them. So each run
+re-reads the last EXPORT_OVERLAP_SECONDS before its cursor. The state keeps a
+digest of every row exported in that window. A re-read row is skipped when
+its digest is unchanged, and exported again when it is new (committed late)
+or changed (e.g. a bid revealed soon after it was placed). Consumers keep the
+latest version of each id. Changes made after a row has left the window, such
+as an auction closing hours later, are not re-exported. They are recorded in
+audit_log (`reveal` and `close` entries), or a full export picks them up.
+EXPORT_OVERLAP_SECONDS=0 gives the old strict-cursor behaviour."""
+import argparse
+import csv
+import gzip
+import hashlib
+import importlib.util
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, List, Optional
+from src.config import EXPORT_DIR, EXPORT_FORMAT, EXPORT_BATCH_ROWS, EXPORT_OVERLAP_SECONDS, PAGE_SIZE
+from src.dao.backends.schema import TABLES
+from src.dao.export_dao import ExportDAO
+
+EXPORT_TABLES = ("auctions", "bids", "payments", "audit_log")
+FORMATS = ("parquet", "arrow", "csv")
+EXTENSIONS = {"parquet": "parquet", "arrow": "arrow", "csv": "csv.gz"}
+
+DECIMAL_PRECISION = 38
+DECIMAL_SCALE = 9
+_QUANTUM = Decimal(1).scaleb(-DECIMAL_SCALE)
+
+
+class ExportError(Exception):
+    pass
+
+
+def _decimal(value) -> Decimal:
+    return Decimal(str(value)).quantize(_QUANTUM)
+
+
+def _timestamp(value) -> datetime:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _json(value) -> str:
+    return value if isinstance(value, str) else json.dumps(value, sort_keys=True, default=str)
+
+
+_CONVERT = {"numeric": _decimal, "timestamp": _timestamp, "json": _json, "bool": bool, "int": int}
+
+
+def resolve_format(fmt: str) -> str:
+    have_arrow = importlib.util.find_spec("pyarrow") is not None
+    if fmt == "auto":
+        return "parquet" if have_arrow else "csv"
+    if fmt not in FORMATS:
+        raise ExportError(f"format must be auto or one of {', '.join(FORMATS)}")
+    if fmt != "csv" and not have_arrow:
+        raise ExportError(f"{fmt} export needs pyarrow (pip install pyarrow), or use --format csv")
+    return fmt
+
+
+def arrow_schema(table: str):
+    import pyarrow as pa
+
+    types = {
+        "uuid": pa.string(),
+        "text": pa.string(),
+        "json": pa.string(),
+        "numeric": pa.decimal128(DECIMAL_PRECISION, DECIMAL_SCALE),
+        "int": pa.int64(),
+        "bool": pa.bool_(),
+        "timestamp": pa.timestamp("us", tz="UTC"),
+    }
+    return pa.schema([pa.field(col, types[kind]) for col, kind in TABLES[table].items()])
+
+
+class _ArrowWriter:
+    def __init__(self, path: str, table: str, fmt: str):
+        import pyarrow as pa
+
+        self.schema = arrow_schema(table)
+        self._sink = None
+        if fmt == "parquet":
+            import pyarrow.parquet as pq
+            self._writer = pq.ParquetWriter(path, self.schema, compression="zstd")
+        else:
+            self._sink = pa.OSFile(path, "wb")
+            self._writer = pa.ipc.new_file(self._sink, self.schema,
+                                           options=pa.ipc.IpcWriteOptions(compression="zstd"))
+
+    def write(self, columns: Dict[str, List]) -> None:
+        import pyarrow as pa
+
+        arrays = [pa.array(columns[f.name], type=f.type) for f in self.schema]
+        self._writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self) -> None:
+        self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, datetime):
+        return value.isoformat(timespec="microseconds")
+    return value
+
+
+class _CsvWriter:
+    def __init__(self, path: str, table: str):
+        self.columns = list(TABLES[table])
+        self._file = gzip.open(path, "wt", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self.columns)
+
+    def write(self, columns: Dict[str, List]) -> None:
+        self._writer.writerows(zip(*([_csv_value(v) for v in columns[c]] for c in self.columns)))
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def _digest(row: Dict) -> str:
+    return hashlib.sha256(json.dumps(row, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def _open_writer(path: str, table: str, fmt: str):
+    return _CsvWriter(path, table) if fmt == "csv" else _ArrowWriter(path, table, fmt)
+
+
+def export_table(table: str, out_dir: str = EXPORT_DIR, fmt: str = "csv", since: Optional[str] = None,
+                 after: Optional[Dict] = None, page_size: int = PAGE_SIZE, batch_rows: int = EXPORT_BATCH_ROWS,
+                 dao: Optional[ExportDAO] = None, overlap: float = EXPORT_OVERLAP_SECONDS) -> Dict:
+    """Export one table to a new file in `out_dir`. Returns the row count, the
+    file path (None when there was nothing to export) and the cursor to pass
+    as `after` next time: the newest exported (created_at, id), plus the
+    digests of the rows exported within `overlap` seconds of it."""
+    if table not in EXPORT_TABLES:
+        raise ExportError(f"table must be one of {', '.join(EXPORT_TABLES)}")
+    dao = dao or ExportDAO()
+    kinds = TABLES[table]
+    convert = {col: _CONVERT.get(kind) for col, kind in kinds.items()}
+    os.makedirs(out_dir, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    path = os.path.join(out_dir, f"{table}-{stamp}.{EXTENSIONS[fmt]}")
+    part = path + ".part"
+    cursor = (after["created_at"], after["id"]) if after else None
+    seen: Dict[str, List] = {}  # id -> [created_at, digest], for rows inside the overlap window
+    legacy = None
+    if after and overlap > 0:
+        seen = {k: list(v) for k, v in (after.get("seen") or {}).items()}
+        if "seen" not in after:
+            legacy = (_timestamp(after["created_at"]), after["id"])  # a state file from before the overlap
+        start = _timestamp(after["created_at"]) - timedelta(seconds=overlap)
+        since = max(start, _timestamp(since)).isoformat() if since else start.isoformat()
+        cursor = None
+    newest = (_timestamp(after["created_at"]), after["id"]) if after else None
+
+    writer = None
+    buffer: Dict[str, List] = {col: [] for col in kinds}
+    buffered = rows = 0
+    last = None
+    try:
+        for row in dao.iter_rows(table, since, cursor, page_size):
+            if overlap > 0:
+                digest, key = _digest(row), (_timestamp(row["created_at"]), row["id"])
+                known = seen.get(row["id"])
+                if known is not None and known[1] == digest:
+                    continue
+                seen[row["id"]] = [row["created_at"], digest]
+                if known is None and legacy and key <= legacy:
+                    continue  # exported by the run that wrote the legacy cursor
+                newest = key if newest is None or key > newest else newest
+            for col, values in buffer.items():
+                value = row.get(col)
+                fn = convert[col]
+                values.append(fn(value) if fn is not None and value is not None else value)
+            last = row
+            buffered += 1
+            if buffered >= batch_rows:
+                writer = writer or _open_writer(part, table, fmt)
+                writer.write(buffer)
+                rows += buffered
+                buffer = {col: [] for col in kinds}
+                buffered = 0
+        if buffered:
+            writer = writer or _open_writer(part, table, fmt)
+            writer.write(buffer)
+            rows += buffered
+        if writer is not None:
+            writer.close()
+            writer = None
+            os.replace(part, path)
+    finally:
+        if writer is not None:
+            writer.close()
+            os.remove(part)
+    if not rows:
+        return {"table": table, "rows": 0, "path": None, "cursor": after}
+    if overlap <= 0:
+        return {"table": table, "rows": rows, "path": path,
+                "cursor": {"created_at": last["created_at"], "id": last["id"]}}
+    horizon = newest[0] - timedelta(seconds=overlap)
+    return {"table": table, "rows": rows, "path": path,
+            "cursor": {"created_at": newest[0].isoformat(), "id": newest[1],
+                       "seen": {k: v for k, v in seen.items() if _timestamp(v[0]) >= horizon}}}
+
+
+def load_state(path: str) -> Dict:
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(path: str, state: Dict) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src export",
+                                     description="Export tables to columnar files for analytics.")
+    parser.add_argument("tables", nargs="*", metavar="TABLE", help=f"tables to export (default: {' '.join(EXPORT_TABLES)})")
+    parser.add_argument("--out", default=EXPORT_DIR, help="output directory")
+    parser.add_argument("--format", default=EXPORT_FORMAT, help="auto, parquet, arrow or csv")
+    parser.add_argument("--since", help="only rows created at or after this ISO timestamp")
+    parser.add_argument("--state", help="JSON file with the last exported row per table, for incremental runs")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE, help="rows fetched per query")
+    parser.add_argument("--batch-rows", type=int, default=EXPORT_BATCH_ROWS, help="rows buffered per written batch")
+    args = parser.parse_args(argv)
+
+    unknown = [t for t in args.tables if t not in EXPORT_TABLES]
+    if unknown:
+        parser.error(f"unknown table {unknown[0]}; choose from {', '.join(EXPORT_TABLES)}")
+    try:
+        fmt = resolve_format(args.format)
+    except ExportError as e:
+        parser.error(str(e))
+    since = _timestamp(args.since).isoformat() if args.since else None
+    state = load_state(args.state)
+    dao = ExportDAO()
+    for table in args.tables or EXPORT_TABLES:
+        result = export_table(table, args.out, fmt, since, state.get(table), args.page_size, args.batch_rows, dao)
+        print(f"{table}: {result['rows']} rows" + (f" -> {result['path']}" if result["path"] else ""))
+        if args.state and result["cursor"]:
+            state[table] = result["cursor"]
+            save_state(args.state, state)
+    return 0
@@ -0,0 +1,93 @@
+# src/services/leaderboard.py
+import heapq
+import threading
+from typing import Callable, Dict, List, Optional
+from src.config import LEADERBOARD_K, LEADERBOARD_SIZE, LEADERBOARD_TTL
+from src.dao.cache import TTLCache
+from src.models import Bid
+
+
+def rank_key(bid: Bid):
+    """Sort key for revealed bids: highest amount first, earliest created_at on ties."""
+    return (-bid.amount, bid.created_at.timestamp())
+
+
+class Leaderboard:
+    """Top-k revealed bids of one auction, kept as a min-heap on the inverted
+    rank so the weakest entry is evicted first. A bid already on the board
+    (say, a reveal the seed query also returned) is not added twice; one that
+    was evicted can only rank below the current minimum, so it stays out.
+    Memory is O(k) per auction however many bids are revealed."""
+
+    def __init__(self, k: int, bids: List[Bid] = ()):
+        self.k = k
+        self._heap: List = []
+        self._lock = threading.Lock()
+        for b in bids:
+            self._push(b)
+
+    def _push(self, bid: Bid) -> None:
+        if any(e[2] == bid.id for e in self._heap):
+            return
+        neg_amount, ts = rank_key(bid)
+        entry = (-neg_amount, -ts, bid.id, bid)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry[:3] > self._heap[0][:3]:
+            heapq.heapreplace(self._heap, entry)
+
+    def add(self, bid: Bid) -> None:
+        with self._lock:
+            self._push(bid)
+
+    def top(self, n: Optional[int] = None) -> List[Bid]:
+        with self._lock:
+            entries = heapq.nlargest(n or self.k, self._heap, key=lambda e: e[:3])
+        return [e[3] for e in entries]
+
+    def best(self) -> Optional[Bid]:
+        top = self.top(1)
+        return top[0] if top else None
+
+
+class LeaderboardRegistry:
+    """Leaderboards for recently touched auctions. A board is seeded from the
+    backend (top k rows) and then updated by reveals made in this process; it
+    is reseeded after `ttl` seconds to pick up reveals from other processes.
+    Revealed counts are not kept here: an index-backed count query is exact,
+    where a counter could not tell a reveal the seed already counted from a
+    new one."""
+
+    def __init__(self, k: int = 10, maxsize: int = 10000, ttl: float = 30.0):
+        self.k = k
+        self._boards = TTLCache(maxsize, ttl)
+
+    def get(self, auction_id: str, seed: Callable[[int], tuple]) -> Leaderboard:
+        """`seed(k)` returns the top k revealed bids from the backend."""
+        board = self._boards.get(auction_id)
+        if board is None:
+            board = Leaderboard(self.k, seed(self.k))
+            self._boards.set(auction_id, board)
+        return board
+
+    async def aget(self, auction_id: str, seed) -> Leaderboard:
+        """Like `get`, with `seed(k)` a coroutine function."""
+        board = self._boards.get(auction_id)
+        if board is None:
+            board = Leaderboard(self.k, await seed(self.k))
+            self._boards.set(auction_id, board)
+        return board
+
+    def record_reveal(self, bid: Bid) -> None:
+        board = self._boards.get(bid.auction_id)
+        if board is not None:
+            board.add(bid)
+
+    def invalidate(self, auction_id: str) -> None:
+        self._boards.invalidate(auction_id)
+
+    def stats(self) -> Dict:
+        return self._boards.stats()
+
+
+leaderboards = LeaderboardRegistry(LEADERBOARD_K, LEADERBOARD_SIZE, LEADERBOARD_TTL)
@@ -1,6 +1,6 @@
 # src/services/payment_service.py
-from src.dao.payment_dao import PaymentDAO
-from src.dao.audit_dao import AuditDAO
+from src.dao.payment_dao import PaymentDAO, AsyncPaymentDAO
+from src.dao.audit_dao import AuditDAO, AsyncAuditDAO
 
 class PaymentError(Exception):
     pass
@@ -14,3 +14,14 @@ class PaymentService:
         pay = self.dao.record_payment(auction_id, bid_id, payer_id, amount)
         self.audit.log("payment", pay["id"], "record", {"auction_id": auction_id, "bid_id": bid_id, "payer_id": payer_id, "amount": amount})
         return pay
+
+
+class AsyncPaymentService:
+    def __init__(self):
+        self.dao = AsyncPaymentDAO()
+        self.audit = AsyncAuditDAO()
+
+    async def record(self, auction_id: str, bid_id: str, payer_id: str, amount: float):
+        pay = await self.dao.record_payment(auction_id, bid_id, payer_id, amount)
+        await self.audit.log("payment", pay["id"], "record", {"auction_id": auction_id, "bid_id": bid_id, "payer_id": payer_id, "amount": amount})
+        return pay
@@ -0,0 +1,317 @@
+# src/services/reconcile.py
+"""Reconcile payments against declared winners.
+
+    python -m src reconcile [--incremental] [--state PATH] [--out findings.jsonl]
+                            [--memory-rows N] [--partitions N]
+
+A full run streams three inputs in keyset order:
+- every payment;
+- every declare_winner entry in audit_log;
+- every closed auction.
+
+It hash-joins them on auction id in bounded memory. Rows are bucketed by a
+hash of the auction id, and once more than `--memory-rows` rows are held,
+the largest bucket spills to a temporary file. Each bucket is then joined on
+its own. The latest declaration of an auction is authoritative, and every
+winner it lists is owed one payment of its clearing price, made by the
+winning bidder.
+
+Findings:
+- missing: a winner with no payment for the winning bid;
+- duplicate: more than one payment for the same winning bid;
+- underpaid / overpaid: the amount paid differs from the clearing price;
+- wrong_payer: the winning bid was paid by someone other than its bidder;
+- unexpected: a payment for a bid that did not win, or for an auction with
+  no declared winner.
+
+Every run records the newest payment and declaration it saw as a watermark
+in the state file. `--incremental` only looks at auctions with payments or
+declarations created since then, starting RECONCILE_OVERLAP_SECONDS before
+it, and re-checks each of those auctions in full. Findings on auctions with
+no new rows are not repeated."""
+import argparse
+import json
+import logging
+import os
+import shutil
+import tempfile
+import zlib
+from collections import Counter
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List, Optional
+from src.config import (PAGE_SIZE, RECONCILE_MEMORY_ROWS, RECONCILE_OVERLAP_SECONDS,
+                        RECONCILE_STATE_PATH)
+from src.dao.auction_dao import AuctionDAO
+from src.dao.audit_dao import AuditDAO
+from src.dao.payment_dao import PaymentDAO
+from src.models import parse_timestamp
+from src.services.export import load_state, save_state
+
+log = logging.getLogger(__name__)
+
+# join rows, as JSON-friendly lists so buckets can spill:
+#   ["p", auction_id, payment_id, bid_id, payer_id, amount_paid, created_at]
+#   ["w", auction_id, created_at, entry_id, winners]   (one declare_winner entry)
+#   ["a", auction_id]                                  (a closed auction)
+
+
+class Partitions:
+    """Join rows bucketed by auction id. Buckets stay in memory until more
+    than `max_rows` rows are held in all. Then the largest bucket is appended
+    to its spill file and emptied. Iterating yields one whole bucket at a time."""
+
+    def __init__(self, count: int = 64, max_rows: int = RECONCILE_MEMORY_ROWS):
+        self.max_rows = max_rows
+        self._buckets: List[List] = [[] for _ in range(count)]
+        self._spilled = [False] * count
+        self._held = 0
+        self._dir: Optional[str] = None
+        self.spills = 0
+
+    def add(self, auction_id: str, row: List) -> None:
+        # crc32, not hash(): stable, so a bucket's spill file and memory part always agree
+        self._buckets[zlib.crc32(auction_id.encode()) % len(self._buckets)].append(row)
+        self._held += 1
+        if self._held > self.max_rows:
+            self._spill()
+
+    def _path(self, i: int) -> str:
+        return os.path.join(self._dir, f"bucket-{i:04d}.jsonl")
+
+    def _spill(self) -> None:
+        if self._dir is None:
+            self._dir = tempfile.mkdtemp(prefix="reconcile-")
+        i = max(range(len(self._buckets)), key=lambda b: len(self._buckets[b]))
+        with open(self._path(i), "a", encoding="utf-8") as f:
+            for row in self._buckets[i]:
+                f.write(json.dumps(row, separators=(",", ":"), default=str) + "\n")
+        self._held -= len(self._buckets[i])
+        self._buckets[i] = []
+        self._spilled[i] = True
+        self.spills += 1
+
+    def __iter__(self) -> Iterator[List]:
+        for i in range(len(self._buckets)):
+            rows = []
+            if self._spilled[i]:
+                with open(self._path(i), encoding="utf-8") as f:
+                    rows = [json.loads(line) for line in f]
+            rows.extend(self._buckets[i])
+            self._buckets[i] = []
+            yield rows
+
+    def close(self) -> None:
+        if self._dir is not None:
+            shutil.rmtree(self._dir, ignore_errors=True)
+            self._dir = None
+
+
+def _winners(details: Dict) -> List[Dict]:
+    # multi-unit declarations list every winner; single-winner ones are the winner itself
+    return details.get("winners") or [details]
+
+
+def _payment_row(p) -> List:
+    return ["p", p.auction_id, p.id, p.bid_id, p.payer_id, str(p.amount_paid), p.created_at.isoformat()]
+
+
+def _declare_row(entry: Dict) -> Optional[List]:
+    """Join row for a declare_winner entry, None when it cannot be read. Entries
+    written before clearing prices were recorded only carry the winning `amount`,
+    which is what that (first-price) winner owed."""
+    try:
+        winners = [{"bid_id": w["bid_id"], "bidder_id": w["bidder_id"],
+                    "price": str(Decimal(str(w.get("price", w.get("amount")))))}
+                   for w in _winners(entry.get("details") or {})]
+    except (KeyError, TypeError, AttributeError, ArithmeticError):
+        return None
+    return ["w", entry["entity_id"], entry["created_at"], entry["id"], winners]
+
+
+def reconcile_rows(rows: Iterable[List]) -> Iterator[Dict]:
+    """Join one bucket (all rows of the auctions in it) and yield findings, plus
+    one {"kind": "auction", ...} tally per auction for the summary."""
+    payments: Dict[str, List[List]] = {}
+    declared: Dict[str, List] = {}
+    closed = set()
+    for row in rows:
+        kind, auction_id = row[0], row[1]
+        if kind == "p":
+            payments.setdefault(auction_id, []).append(row)
+        elif kind == "w":
+            # the latest declaration wins; (created_at, entry id) breaks ties deterministically
+            if auction_id not in declared or (row[2], row[3]) > (declared[auction_id][2], declared[auction_id][3]):
+                declared[auction_id] = row
+        else:
+            closed.add(auction_id)
+
+    for auction_id in sorted(set(payments) | set(declared) | closed):
+        paid = payments.get(auction_id, [])
+        declaration = declared.get(auction_id)
+        winners = declaration[4] if declaration else []
+        yield {"kind": "auction", "auction_id": auction_id, "closed": auction_id in closed or bool(declaration),
+               "declared": bool(declaration), "winners": len(winners), "payments": len(paid)}
+        by_bid: Dict[str, List[List]] = {}
+        for p in paid:
+            by_bid.setdefault(p[3], []).append(p)
+        for w in winners:
+            price = Decimal(w["price"])
+            pays = by_bid.pop(w["bid_id"], [])
+            base = {"auction_id": auction_id, "bid_id": w["bid_id"], "bidder_id": w["bidder_id"], "price": str(price)}
+            if not pays:
+                yield dict(base, kind="missing")
+                continue
+            total = sum(Decimal(p[5]) for p in pays)
+            ids = [p[2] for p in pays]
+            if len(pays) > 1:
+                yield dict(base, kind="duplicate", payment_ids=ids, paid=str(total))
+            for p in pays:
+                if p[4] != w["bidder_id"]:
+                    yield dict(base, kind="wrong_payer", payment_id=p[2], payer_id=p[4])
+            if total < price:
+                yield dict(base, kind="underpaid", payment_ids=ids, paid=str(total), short=str(price - total))
+            elif total > price and len(pays) == 1:
+                yield dict(base, kind="overpaid", payment_ids=ids, paid=str(total), excess=str(total - price))
+        reason = "bid did not win" if declaration else "no declared winner"
+        for pays in by_bid.values():
+            for p in pays:
+                yield {"kind": "unexpected", "auction_id": auction_id, "bid_id": p[3], "payment_id": p[2],
+                       "payer_id": p[4], "paid": p[5], "reason": reason}
+
+
+def _latest(watermark: Optional[datetime], created_at) -> datetime:
+    created_at = parse_timestamp(created_at)
+    return created_at if watermark is None or created_at > watermark else watermark
+
+
+class Reconciler:
+    def __init__(self, page_size: int = PAGE_SIZE, memory_rows: int = RECONCILE_MEMORY_ROWS, partitions: int = 64):
+        self.payments = PaymentDAO()
+        self.audit = AuditDAO()
+        self.auctions = AuctionDAO()
+        self.page_size = page_size
+        self.memory_rows = memory_rows
+        self.partitions = partitions
+        self.watermark: Optional[datetime] = None
+        self.spills = 0
+        self.skipped = 0  # declare_winner entries that could not be read
+
+    def _declarations(self, entries: Iterable[Dict]) -> Iterator[List]:
+        for entry in entries:
+            row = _declare_row(entry)
+            if row is None:
+                self.skipped += 1
+                log.warning("reconcile: skipping unreadable declare_winner entry %s", entry.get("id"))
+                continue
+            yield row
+
+    def full(self) -> Iterator[Dict]:
+        """Stream every payment, declaration and closed auction and reconcile them all."""
+        parts = Partitions(self.partitions, self.memory_rows)
+        try:
+            for p in self.payments.iter_since(None, self.page_size):
+                parts.add(p.auction_id, _payment_row(p))
+                self.watermark = _latest(self.watermark, p.created_at)
+            for row in self._declarations(self.audit.iter_entries("auction", "declare_winner", None, self.page_size)):
+                parts.add(row[1], row)
+                self.watermark = _latest(self.watermark, row[2])
+            for a in self.auctions.iter_closed(self.page_size):
+                parts.add(a["id"], ["a", a["id"]])
+            self.spills = parts.spills
+            for bucket in parts:
+                yield from reconcile_rows(bucket)
+        finally:
+            parts.close()
+
+    def incremental(self, watermark: str, chunk_size: int = 500) -> Iterator[Dict]:
+        """Reconcile, in full, the auctions with payments or declarations created
+        since `watermark` (less the overlap)."""
+        self.watermark = parse_timestamp(watermark)
+        since = (self.watermark - timedelta(seconds=RECONCILE_OVERLAP_SECONDS)).isoformat()
+        touched = {}  # insertion-ordered set of auction ids
+        for p in self.payments.iter_since(since, self.page_size):
+            touched[p.auction_id] = None
+            self.watermark = _latest(self.watermark, p.created_at)
+        for entry in self.audit.iter_entries("auction", "declare_winner", since, self.page_size):
+            touched[entry["entity_id"]] = None
+            self.watermark = _latest(self.watermark, entry["created_at"])
+        ids = list(touched)
+        for i in range(0, len(ids), chunk_size):
+            chunk = ids[i:i + chunk_size]
+            rows = [_payment_row(p) for p in self.payments.list_for_auctions(chunk)]
+            rows += self._declarations(self.audit.entries_for("auction", "declare_winner", chunk))
+            rows += [["a", a.id] for a in self.auctions.get_records(chunk).values() if a.is_closed]
+            yield from reconcile_rows(rows)
+
+
+def run(reconciler: Reconciler, watermark: Optional[str], out=None, show: int = 20) -> Dict:
+    """Reconcile (incrementally when `watermark` is set), writing findings to
+    `out` as JSON lines. Returns the summary counts."""
+    results = reconciler.incremental(watermark) if watermark else reconciler.full()
+    counts = Counter()
+    shown = []
+    for finding in results:
+        if finding["kind"] == "auction":
+            counts["auctions"] += 1
+            counts["declared"] += finding["declared"]
+            counts["winners"] += finding["winners"]
+            counts["payments"] += finding["payments"]
+            counts["closed_without_winner"] += finding["closed"] and not finding["declared"]
+            continue
+        counts[finding["kind"]] += 1
+        if out is not None:
+            out.write(json.dumps(finding, sort_keys=True) + "\n")
+        if len(shown) < show:
+            shown.append(finding)
+    return {"mode": "incremental" if watermark else "full", "counts": dict(counts), "shown": shown,
+            "watermark": reconciler.watermark.isoformat() if reconciler.watermark else None, "spills": reconciler.spills,
+            "skipped": reconciler.skipped}
+
+
+FINDINGS = ("missing", "duplicate", "underpaid", "overpaid", "wrong_payer", "unexpected")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src reconcile",
+                                     description="Reconcile payments against declared winners.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only auctions with payments or declarations since the saved watermark")
+    parser.add_argument("--state", default=RECONCILE_STATE_PATH, help="watermark file")
+    parser.add_argument("--out", help="write every finding here as JSON lines")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE, help="rows fetched per query")
+    parser.add_argument("--memory-rows", type=int, default=RECONCILE_MEMORY_ROWS,
+                        help="join rows held in memory before buckets spill to disk")
+    parser.add_argument("--partitions", type=int, default=64, help="join buckets")
+    args = parser.parse_args(argv)
+
+    state = load_state(args.state)
+    watermark = state.get("watermark") if args.incremental else None
+    if args.incremental and not watermark:
+        print(f"no watermark in {args.state}; running a full reconciliation")
+    reconciler = Reconciler(args.page_size, args.memory_rows, max(1, args.partitions))
+    out = open(args.out, "w", encoding="utf-8") if args.out else None
+    try:
+        report = run(reconciler, watermark, out)
+    finally:
+        if out is not None:
+            out.close()
+    if report["watermark"]:
+        save_state(args.state, {"watermark": report["watermark"]})
+
+    c = report["counts"]
+    print(f"{report['mode']}: {c.get('auctions', 0)} auctions, {c.get('declared', 0)} declared "
+          f"({c.get('winners', 0)} winners), {c.get('payments', 0)} payments, "
+          f"{c.get('closed_without_winner', 0)} closed without a winner"
+          + (f"; {report['spills']} bucket spills" if report["spills"] else "")
+          + (f"; {report['skipped']} unreadable declarations skipped" if report["skipped"] else ""))
+    problems = {k: c[k] for k in FINDINGS if c.get(k)}
+    if not problems:
+        print("no discrepancies")
+        return 0
+    print("discrepancies: " + ", ".join(f"{k}={n}" for k, n in problems.items()))
+    for finding in report["shown"]:
+        print("  " + json.dumps(finding, sort_keys=True))
+    if args.out:
+        print(f"all findings written to {args.out}")
+    return 1
@@ -1,7 +1,9 @@
 # src/services/reporting_service.py
-from typing import Dict
-from src.dao.auction_dao import AuctionDAO
-from src.dao.bid_dao import BidDAO
+from typing import Dict, Iterable
+from src.dao.auction_dao import AuctionDAO, AsyncAuctionDAO
+from src.dao.bid_dao import BidDAO, AsyncBidDAO
+from src.services.leaderboard import leaderboards
+from src.services.views import views
 
 class ReportingService:
     def __init__(self):
@@ -10,7 +12,45 @@ class ReportingService:
 
     def summary(self, auction_id: str) -> Dict:
         a = self.auction.get(auction_id)
-        revealed = self.bid.list_revealed(auction_id)
-        total_revealed = len(revealed)
-        highest = revealed[0] if revealed else None
-        return {"auction": a, "total_revealed": total_revealed, "highest": highest}
+        board = leaderboards.get(auction_id, lambda k: self.bid.top_n(auction_id, k))
+        best = board.best()
+        return {"auction": a, "total_revealed": self.bid.count_revealed(auction_id),
+                "highest": best.to_dict() if best else None}
+
+    def cached_summary(self, auction_id: str) -> Dict:
+        """summary() from the shared view cache; read-only."""
+        return views.report(auction_id, lambda: self.summary(auction_id))
+
+    def summaries(self, auction_ids: Iterable[str]) -> Dict[str, Dict]:
+        """Stats for many auctions from one bulk bid load: counts, reveal rate,
+        highest/second price, mean, median and percentiles, reserve-hit rate and
+        when in the bidding window bids arrived. Unknown ids are left out."""
+        from src.services.analytics import auction_stats  # NumPy only for bulk reports
+
+        records = self.auction.get_records(auction_ids)
+        ids = list(records)
+        batch = self.bid.batch_for_auctions(ids)
+        stats = auction_stats(
+            ids, batch,
+            [float(records[a].reserve_price) for a in ids],
+            [records[a].start_time.timestamp() for a in ids],
+            [records[a].end_time.timestamp() for a in ids],
+        )
+        for a in ids:
+            stats[a]["auction"] = records[a].to_dict()
+        return stats
+
+
+class AsyncReportingService:
+    def __init__(self):
+        self.auction = AsyncAuctionDAO()
+        self.bid = AsyncBidDAO()
+
+    async def summary(self, auction_id: str) -> Dict:
+        import asyncio  # deferred: keeps the sync import path light
+        # auction fetch, revealed count and leaderboard seeding go out together
+        a, count, board = await asyncio.gather(
+            self.auction.get(auction_id), self.bid.count_revealed(auction_id),
+            leaderboards.aget(auction_id, lambda k: self.bid.top_n(auction_id, k)))
+        best = board.best()
+        return {"auction": a, "total_revealed": count, "highest": best.to_dict() if best else None}
@@ -0,0 +1,327 @@
+# src/services/scheduler.py
+"""Closes auctions when they expire and settles them after the reveal window.
+
+Each auction has two events in one min-heap ordered by time: close at end_time
+and settle (winner determination) at end_time + REVEAL_GRACE_SECONDS. The heap
+is loaded once from the open auctions, kept current by AuctionService.create in
+this process and by a cheap created_at poll for auctions created elsewhere. The
+poll re-reads SCHEDULER_POLL_OVERLAP_SECONDS before the newest auction seen, so
+one committed after a later-stamped one is not missed; auctions already queued
+are ignored. Due events are closed in bulk updates and settled across a worker
+pool. Settlement is recorded in the audit log as `declare_winner`, or
+`no_winner` when no bid qualified, and either one marks the auction settled.
+
+Only the process holding the leader lock acts; others wait as standbys. The
+lock is a local flock, so it covers processes on one host - run a single
+scheduler per deployment."""
+import argparse
+import heapq
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from src.config import (REVEAL_GRACE_SECONDS, SCHEDULER_BATCH_SIZE, SCHEDULER_WORKERS, SCHEDULER_POLL_SECONDS,
+                        SCHEDULER_LOCK_PATH, SCHEDULER_RECOVERY_HOURS, SCHEDULER_POLL_OVERLAP_SECONDS)
+from src.dao.auction_dao import AuctionDAO
+from src.dao.audit_dao import AuditDAO
+from src.models import parse_timestamp
+from src.services.auction_service import notify_closed, on_create, remove_create_listener
+from src.services.bid_service import BidService
+
+log = logging.getLogger(__name__)
+
+CLOSE, SETTLE = 0, 1
+SETTLED_ACTIONS = ("declare_winner", "no_winner")
+
+
+def _batches(rows: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class LeaderLock:
+    """Exclusive non-blocking file lock. The OS releases it when the holder
+    exits or dies, so a standby scheduler takes over on its next attempt."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    def acquire(self) -> bool:
+        if self._fd is not None:
+            return True
+        try:
+            import fcntl
+        except ImportError:
+            # no flock on this platform: assume a single scheduler process
+            self._fd = -1
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        return True
+
+    def release(self) -> None:
+        if self._fd is None:
+            return
+        if self._fd >= 0:
+            import fcntl
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+        self._fd = None
+
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
+
+
+class AuctionScheduler:
+    def __init__(self, grace_seconds: float = REVEAL_GRACE_SECONDS, batch_size: int = SCHEDULER_BATCH_SIZE,
+                 workers: int = SCHEDULER_WORKERS, poll_seconds: float = SCHEDULER_POLL_SECONDS,
+                 lock_path: Optional[str] = SCHEDULER_LOCK_PATH, poll_overlap: float = SCHEDULER_POLL_OVERLAP_SECONDS):
+        self.auctions = AuctionDAO()
+        self.audit = AuditDAO()
+        self.bids = BidService()
+        self.grace = timedelta(seconds=grace_seconds)
+        self.batch_size = batch_size
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self.poll_overlap = timedelta(seconds=poll_overlap)
+        self.leader = LeaderLock(lock_path) if lock_path else None
+        self._heap: List[Tuple[datetime, int, str]] = []
+        self._queued: Set[Tuple[int, str]] = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._loaded = False
+        self._watermark: Optional[datetime] = None  # newest created_at seen
+        self.counts = {"closed": 0, "settled": 0, "winners": 0, "errors": 0}
+
+    # --- queue ---
+
+    def watch(self, auction: Dict) -> None:
+        """Schedule close and settlement for an auction row."""
+        end = parse_timestamp(auction["end_time"])
+        if not auction.get("is_closed"):
+            self._push(end, CLOSE, auction["id"])
+        self._push(end + self.grace, SETTLE, auction["id"])
+        created = parse_timestamp(auction.get("created_at"))
+        if created and (self._watermark is None or created > self._watermark):
+            self._watermark = created
+        self._wake.set()
+
+    def _push(self, when: datetime, stage: int, auction_id: str) -> None:
+        with self._lock:
+            if (stage, auction_id) in self._queued:
+                return
+            self._queued.add((stage, auction_id))
+            heapq.heappush(self._heap, (when, stage, auction_id))
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._heap)
+
+    def next_due(self) -> Optional[datetime]:
+        with self._lock:
+            return self._heap[0][0] if self._heap else None
+
+    def load(self, now: Optional[datetime] = None) -> int:
+        """Queue every open auction, plus recently closed ones that were never
+        settled (e.g. the previous leader stopped during the grace period)."""
+        now = now or datetime.now(timezone.utc)
+        queued = 0
+        for auction in self.auctions.iter_open():
+            self.watch(auction)
+            queued += 1
+        since = (now - timedelta(hours=SCHEDULER_RECOVERY_HOURS) - self.grace).isoformat()
+        for batch in _batches(self.auctions.iter_closed_since(since), self.batch_size):
+            settled = self.audit.entity_ids_with("auction", SETTLED_ACTIONS, [a["id"] for a in batch])
+            for auction in batch:
+                if auction["id"] not in settled:
+                    self.watch(auction)
+                    queued += 1
+        on_create(self.watch)
+        self._loaded = True
+        return queued
+
+    def sync_new(self) -> int:
+        """Pick up auctions created by other processes since shortly before the
+        newest one seen. Returns how many were new."""
+        since = (self._watermark - self.poll_overlap).isoformat() if self._watermark else None
+        found = 0
+        for auction in self.auctions.iter_open(created_since=since):
+            with self._lock:
+                known = (CLOSE, auction["id"]) in self._queued or (SETTLE, auction["id"]) in self._queued
+            if not known:
+                found += 1
+            self.watch(auction)
+        return found
+
+    # --- work ---
+
+    def run_due(self, now: Optional[datetime] = None) -> Dict:
+        """Process up to one batch of due events. Returns the closed auction ids
+        and the winners (or None) of the settled ones."""
+        now = now or datetime.now(timezone.utc)
+        closing, settling = [], []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now and len(closing) + len(settling) < self.batch_size:
+                _, stage, auction_id = heapq.heappop(self._heap)
+                self._queued.discard((stage, auction_id))
+                (closing if stage == CLOSE else settling).append(auction_id)
+        closed = self._close(closing, now) if closing else []
+        settled = self._settle(settling, now) if settling else {}
+        return {"closed": closed, "settled": settled}
+
+    def drain(self) -> None:
+        """Run batches until nothing is due."""
+        while not self._stop.is_set():
+            due = self.next_due()
+            if due is None or due > datetime.now(timezone.utc):
+                return
+            self.run_due()
+
+    def _retry(self, stage: int, auction_ids: List[str], now: datetime) -> None:
+        self.counts["errors"] += 1
+        for auction_id in auction_ids:
+            self._push(now + timedelta(seconds=self.poll_seconds), stage, auction_id)
+
+    def _close(self, auction_ids: List[str], now: datetime) -> List[str]:
+        try:
+            rows = self.auctions.close_many(auction_ids, self.batch_size)
+            closed = [r["id"] for r in rows]
+            notify_closed(closed)
+            self.audit.log_many([
+                {"entity": "auction", "entity_id": auction_id, "action": "close", "details": {"by": "scheduler"}}
+                for auction_id in closed
+            ])
+        except Exception:
+            log.exception("closing %d auctions failed; will retry", len(auction_ids))
+            self._retry(CLOSE, auction_ids, now)
+            return []
+        self.counts["closed"] += len(closed)
+        return closed
+
+    def _settle(self, auction_ids: List[str], now: datetime) -> Dict[str, Optional[Dict]]:
+        try:
+            done = self.audit.entity_ids_with("auction", SETTLED_ACTIONS, auction_ids)
+        except Exception:
+            log.exception("settlement lookup failed; will retry")
+            self._retry(SETTLE, auction_ids, now)
+            return {}
+        todo = [a for a in auction_ids if a not in done]
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="settle")
+        settled, failed = {}, []
+        for auction_id, winner, error in self._pool.map(self._settle_one, todo):
+            if error is not None:
+                log.error("settling auction %s failed: %s", auction_id, error)
+                failed.append(auction_id)
+            else:
+                settled[auction_id] = winner
+        if failed:
+            self._retry(SETTLE, failed, now)
+        self.counts["settled"] += len(settled)
+        self.counts["winners"] += sum(1 for w in settled.values() if w)
+        return settled
+
+    def _settle_one(self, auction_id: str) -> Tuple[str, Optional[Dict], Optional[Exception]]:
+        try:
+            return auction_id, self.bids.declare_winner(auction_id), None
+        except Exception as e:
+            return auction_id, None, e
+
+    # --- loop ---
+
+    def _delay(self) -> float:
+        due = self.next_due()
+        if due is None:
+            return self.poll_seconds
+        wait = (due - datetime.now(timezone.utc)).total_seconds()
+        return min(max(wait, 0.0), self.poll_seconds)
+
+    def run_forever(self) -> None:
+        while not self._stop.is_set():
+            if self.leader is not None and not self.leader.acquire():
+                self._stop.wait(self.poll_seconds)
+                continue
+            try:
+                if not self._loaded:
+                    log.info("leader acquired; %d auctions queued", self.load())
+                else:
+                    self.sync_new()
+                self.drain()
+            except Exception:
+                log.exception("scheduler pass failed")
+            self._wake.clear()
+            self._wake.wait(self._delay())
+
+    def start(self) -> "AuctionScheduler":
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run_forever, name="auction-scheduler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        remove_create_listener(self.watch)
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        if self.leader is not None:
+            self.leader.release()
+        self._loaded = False
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src scheduler",
+                                     description="Close expired auctions and declare winners.")
+    parser.add_argument("--grace", type=float, default=REVEAL_GRACE_SECONDS, help="reveal grace period in seconds")
+    parser.add_argument("--batch-size", type=int, default=SCHEDULER_BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=SCHEDULER_WORKERS)
+    parser.add_argument("--poll", type=float, default=SCHEDULER_POLL_SECONDS)
+    parser.add_argument("--lock", default=SCHEDULER_LOCK_PATH, help="leader lock file")
+    parser.add_argument("--once", action="store_true", help="process what is due now and exit")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    scheduler = AuctionScheduler(args.grace, args.batch_size, args.workers, args.poll, args.lock)
+    if args.once:
+        if scheduler.leader is not None and not scheduler.leader.acquire():
+            print("another scheduler holds the leader lock")
+            return 1
+        try:
+            scheduler.load()
+            scheduler.drain()
+            print("closed={closed} settled={settled} winners={winners} errors={errors}".format(**scheduler.counts))
+        finally:
+            scheduler.stop()
+        return 0
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        scheduler.stop()
+    return 0
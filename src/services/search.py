@@ -0,0 +1,216 @@
+# src/services/search.py
+"""In-memory search over open auctions.
+
+An inverted index maps each lower-cased word of an auction's title and
+description to the ids of the open auctions containing it. It is built from
+the backend on first search, updated by AuctionService create/close events in
+this process, and rebuilt every SEARCH_REFRESH_SECONDS to pick up changes made
+by other processes (e.g. a separate scheduler closing auctions).
+
+Concurrent searches that find the index stale share one rebuild. Events that
+arrive while the rebuild is loading are applied to the old index and also
+replayed onto the new one before it is swapped in, so an auction created or
+closed mid-rebuild is not lost (or resurrected) by a load that missed it."""
+import bisect
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, List, Optional, Set
+from src.config import SEARCH_REFRESH_SECONDS
+from src.dao.auction_dao import AuctionDAO
+from src.dao.singleflight import SingleFlight
+from src.models import Auction, parse_timestamp
+from src.services.auction_service import on_close, on_create
+
+_TOKEN_RE = re.compile(r"\w+")
+_MIN_TIME = datetime.min.replace(tzinfo=timezone.utc)
+
+SORTS = {
+    "end_time": lambda d: d.auction.end_time,
+    "reserve_price": lambda d: d.auction.reserve_price,
+    "created_at": lambda d: d.auction.created_at or _MIN_TIME,
+    "title": lambda d: d.title_key,
+}
+
+
+class SearchError(Exception):
+    pass
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+class _Doc:
+    __slots__ = ("auction", "tokens", "title_key")
+
+    def __init__(self, data: Dict):
+        self.auction = Auction.from_row(data)
+        self.tokens = set(tokenize(data.get("title")) + tokenize(data.get("description")))
+        self.title_key = (data.get("title") or "").lower()
+
+
+class AuctionIndex:
+    def __init__(self, load: Optional[Callable[[], Iterable[Dict]]] = None, refresh_seconds: float = SEARCH_REFRESH_SECONDS,
+                 clock=time.monotonic):
+        self._load = load or (lambda: AuctionDAO().iter_open())
+        self.refresh_seconds = refresh_seconds
+        self._clock = clock
+        self._docs: Dict[str, _Doc] = {}
+        self._postings: Dict[str, Set[str]] = {}
+        self._vocab: List[str] = []  # sorted, for prefix matches
+        self._built_at: Optional[float] = None
+        self._pending: Optional[List] = None  # events seen while a rebuild is loading
+        self._lock = threading.RLock()
+        self._rebuilds = SingleFlight(max_keys=0)
+
+    # --- maintenance ---
+
+    def _add(self, auction: Dict) -> None:
+        if auction.get("is_closed"):
+            return
+        self._remove(auction["id"])
+        doc = _Doc(auction)
+        self._docs[auction["id"]] = doc
+        for token in doc.tokens:
+            ids = self._postings.get(token)
+            if ids is None:
+                ids = self._postings[token] = set()
+                bisect.insort(self._vocab, token)
+            ids.add(auction["id"])
+
+    def _remove(self, auction_id: str) -> None:
+        doc = self._docs.pop(auction_id, None)
+        if doc is not None:
+            for token in doc.tokens:
+                ids = self._postings[token]
+                ids.discard(auction_id)
+                if not ids:
+                    del self._postings[token]
+                    del self._vocab[bisect.bisect_left(self._vocab, token)]
+
+    def rebuild(self) -> int:
+        with self._lock:
+            self._pending = []
+        try:
+            docs = list(self._load())
+        except BaseException:
+            with self._lock:
+                self._pending = None
+            raise
+        with self._lock:
+            self._docs, self._postings, self._vocab = {}, {}, []
+            for auction in docs:
+                self._add(auction)
+            for closed, event in self._pending:
+                if closed:
+                    self._remove(event)
+                else:
+                    self._add(event)
+            self._pending = None
+            self._built_at = self._clock()
+            return len(self._docs)
+
+    def _stale(self) -> bool:
+        return self._built_at is None or self._clock() - self._built_at >= self.refresh_seconds
+
+    def _ensure(self) -> None:
+        if self._stale():
+            # one rebuild at a time; callers that arrive meanwhile wait for it instead of loading again
+            self._rebuilds.do("rebuild", lambda: self.rebuild() if self._stale() else None)
+
+    def added(self, auction: Dict) -> None:
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((False, auction))
+            if self._built_at is not None:
+                self._add(auction)
+
+    def closed(self, auction_ids: Iterable[str]) -> None:
+        with self._lock:
+            for auction_id in auction_ids:
+                if self._pending is not None:
+                    self._pending.append((True, auction_id))
+                self._remove(auction_id)
+
+    # --- queries ---
+
+    def _matching(self, token: str, prefix: bool) -> Set[str]:
+        if not prefix:
+            return self._postings.get(token, set())
+        ids: Set[str] = set()
+        i = bisect.bisect_left(self._vocab, token)
+        while i < len(self._vocab) and self._vocab[i].startswith(token):
+            ids |= self._postings[self._vocab[i]]
+            i += 1
+        return ids
+
+    def search(self, query: str = "", min_reserve=None, max_reserve=None,
+               ends_after: Optional[datetime] = None, ends_before: Optional[datetime] = None,
+               sort: str = "end_time", page: int = 1, page_size: int = 20) -> Dict:
+        """Open auctions whose title/description contain every word of `query`
+        (the last word also matches as a prefix, for search-as-you-type),
+        filtered by reserve range and end-time window, sorted by `sort`
+        ("-" prefix for descending) and cut to one page."""
+        key = SORTS.get(sort.lstrip("-"))
+        if key is None:
+            raise SearchError(f"sort must be one of {', '.join(SORTS)} (optionally prefixed with -)")
+        if page < 1 or page_size < 1:
+            raise SearchError("page and page_size must be positive")
+        lo = Decimal(str(min_reserve)) if min_reserve is not None else None
+        hi = Decimal(str(max_reserve)) if max_reserve is not None else None
+        try:
+            # naive datetimes and ISO strings are taken as UTC, like every stored timestamp
+            ends_after, ends_before = parse_timestamp(ends_after), parse_timestamp(ends_before)
+        except (TypeError, ValueError):
+            raise SearchError("ends_after and ends_before must be datetimes or ISO timestamps") from None
+        self._ensure()
+        tokens = tokenize(query)
+        with self._lock:
+            if tokens:
+                # rarest word first so the intersection shrinks fast
+                sets = [self._matching(t, i == len(tokens) - 1) for i, t in enumerate(tokens)]
+                sets.sort(key=len)
+                ids = set(sets[0])
+                for other in sets[1:]:
+                    ids &= other
+                docs = [self._docs[i] for i in ids]
+            else:
+                docs = list(self._docs.values())
+        docs = [d for d in docs
+                if (lo is None or d.auction.reserve_price >= lo) and (hi is None or d.auction.reserve_price <= hi)
+                and (ends_after is None or d.auction.end_time >= ends_after)
+                and (ends_before is None or d.auction.end_time <= ends_before)]
+        docs.sort(key=lambda d: (key(d), d.auction.id), reverse=sort.startswith("-"))
+        start = (page - 1) * page_size
+        return {
+            "items": [d.auction.to_dict() for d in docs[start:start + page_size]],
+            "total": len(docs),
+            "page": page,
+            "page_size": page_size,
+            "pages": -(-len(docs) // page_size),
+        }
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"auctions": len(self._docs), "tokens": len(self._vocab),
+                    "age_seconds": None if self._built_at is None else self._clock() - self._built_at}
+
+
+_index: Optional[AuctionIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> AuctionIndex:
+    """Process-wide index, subscribed to auction create/close events."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                index = AuctionIndex()
+                on_create(index.added)
+                on_close(index.closed)
+                _index = index
+    return _index
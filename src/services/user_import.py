@@ -0,0 +1,44 @@
+# src/services/user_import.py
+"""Bulk user import from CSV (header with name and email columns) or JSON lines
+({"name": ..., "email": ...} per line). Files are streamed, never loaded whole.
+
+    python -m src import-users members.csv [--format csv|jsonl] [--chunk-size 1000]"""
+import argparse
+import csv
+import json
+import os
+from typing import Iterator, Optional, Tuple
+from src.services.user_service import UserService
+
+
+def _format(path: str, fmt: Optional[str]) -> str:
+    if fmt:
+        return fmt
+    ext = os.path.splitext(path)[1].lower()
+    return "jsonl" if ext in (".jsonl", ".ndjson", ".json") else "csv"
+
+
+def read_users(path: str, fmt: Optional[str] = None) -> Iterator[Tuple[str, str]]:
+    """Yield (name, email) pairs; missing fields come back as empty strings."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        if _format(path, fmt) == "jsonl":
+            for line in f:
+                if line.strip():
+                    row = json.loads(line)
+                    yield row.get("name") or "", row.get("email") or ""
+        else:
+            for row in csv.DictReader(f):
+                row = {(k or "").strip().lower(): v for k, v in row.items()}
+                yield row.get("name") or "", row.get("email") or ""
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src import-users", description="Register users from a file.")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=("csv", "jsonl"), help="default: from the file extension")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="users per upsert")
+    args = parser.parse_args(argv)
+
+    counts = UserService().register_many(read_users(args.path, args.format), args.chunk_size)
+    print("created={created} existing={existing} duplicates={duplicates} invalid={invalid}".format(**counts))
+    return 0
@@ -1,20 +1,65 @@
 # src/services/user_service.py
-from typing import Dict
-from src.dao.user_dao import UserDAO
+from typing import Dict, Iterable, Iterator, List, Tuple
+from src.dao.user_dao import UserDAO, AsyncUserDAO
 
 class UserError(Exception):
     pass
 
+def _check_user(name: str, email: str) -> None:
+    if not name.strip():
+        raise UserError("Name required")
+    if not email.strip():
+        raise UserError("Email required")
+
 class UserService:
     def __init__(self):
         self.dao = UserDAO()
 
     def register(self, name: str, email: str) -> Dict:
-        if not name.strip():
-            raise UserError("Name required")
-        if not email.strip():
-            raise UserError("Email required")
-        existing = self.dao.get_by_email(email)
-        if existing:
-            return existing
-        return self.dao.create(name, email)
+        _check_user(name, email)
+        # new emails cost one round trip; only an existing email needs the read
+        return self.dao.create_if_absent(name, email) or self.dao.get_by_email(email)
+
+    def register_many(self, users: Iterable[Tuple[str, str]], chunk_size: int = 1000) -> Dict:
+        """Register a stream of (name, email) pairs in chunked upserts. Repeated
+        emails are dropped in memory (first one wins), blank rows are counted as
+        invalid. Returns the created/existing/duplicate/invalid counts."""
+        counts = {"created": 0, "existing": 0, "duplicates": 0, "invalid": 0}
+        seen = set()
+        chunk: List[Dict] = []
+
+        def flush():
+            created = len(self.dao.create_many_if_absent(chunk, chunk_size))
+            counts["created"] += created
+            counts["existing"] += len(chunk) - created
+            chunk.clear()
+
+        for name, email in users:
+            name, email = (name or "").strip(), (email or "").strip()
+            try:
+                _check_user(name, email)
+            except UserError:
+                counts["invalid"] += 1
+                continue
+            if email in seen:
+                counts["duplicates"] += 1
+                continue
+            seen.add(email)
+            chunk.append({"name": name, "email": email})
+            if len(chunk) >= chunk_size:
+                flush()
+        if chunk:
+            flush()
+        return counts
+
+    def iter_all(self) -> Iterator[Dict]:
+        return self.dao.iter_all()
+
+
+class AsyncUserService:
+    def __init__(self):
+        self.dao = AsyncUserDAO()
+
+    async def register(self, name: str, email: str) -> Dict:
+        _check_user(name, email)
+        return await self.dao.create_if_absent(name, email) or await self.dao.get_by_email(email)
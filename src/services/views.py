@@ -0,0 +1,44 @@
+# src/services/views.py
+"""Process-wide cache for read-heavy views (auction reports).
+
+Shared by every caller in the process - all Streamlit sessions included - and
+invalidated by the services on create, close, bid and reveal. Writes made by
+other processes show up once the entry expires (VIEW_CACHE_TTL). Cached values
+are shared: treat them as read-only."""
+from typing import Callable, Dict, Hashable, Iterable
+from src.config import VIEW_CACHE_SIZE, VIEW_CACHE_TTL
+from src.dao.cache import TTLCache
+
+
+class ViewCache:
+    def __init__(self, maxsize: int = VIEW_CACHE_SIZE, ttl: float = VIEW_CACHE_TTL):
+        self.cache = TTLCache(maxsize, ttl)
+        self.invalidations = 0
+
+    def get(self, key: Hashable, load: Callable):
+        value = self.cache.get(key)
+        if value is None:
+            value = load()
+            self.cache.set(key, value)
+        return value
+
+    def report(self, auction_id: str, load: Callable[[], Dict]) -> Dict:
+        return self.get(("report", auction_id), load)
+
+    def auction_changed(self, auction_id: str) -> None:
+        """Drop the auction's report."""
+        self.invalidations += 1
+        self.cache.invalidate(("report", auction_id))
+
+    def auctions_changed(self, auction_ids: Iterable[str]) -> None:
+        for auction_id in set(auction_ids):
+            self.auction_changed(auction_id)
+
+    def clear(self) -> None:
+        self.cache.clear()
+
+    def stats(self) -> Dict:
+        return dict(self.cache.stats(), invalidations=self.invalidations)
+
+
+views = ViewCache()
@@ -0,0 +1,18 @@
+# tests/conftest.py
+import os
+
+# before src.config is imported: run against the in-process engine, writing audit rows inline
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+os.environ.setdefault("AUDIT_MODE", "sync")
+
+import pytest
+
+
+@pytest.fixture
+def backend():
+    """A fresh in-memory backend shared by every DAO created in the test."""
+    from src.dao.backends.sqlite_backend import MemoryBackend
+    from src.dao.supabase_client import get_client, set_client
+
+    set_client(MemoryBackend())
+    return get_client()
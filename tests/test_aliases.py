@@ -0,0 +1,92 @@
+# tests/test_aliases.py
+import pytest
+
+from src.dao.alias_dao import AliasDAO
+from src.dao.backends.base import BackendError, UniqueViolation, is_unique_violation
+from src.services.aliases import AliasError, AliasRegistry
+
+
+@pytest.fixture
+def registry(backend):
+    return AliasRegistry(AliasDAO())
+
+
+def test_numbers_run_per_prefix_and_resolve_both_ways(registry):
+    assert [registry.assign("U", f"user-{i}") for i in range(3)] == ["U1", "U2", "U3"]
+    assert registry.assign("A", "auction-1") == "A1"
+    assert registry.resolve("U2") == "user-1"
+    assert registry.resolve(" A1 ") == "auction-1"
+    assert registry.resolve("not-an-alias") == "not-an-alias"
+    assert registry.resolve("U99") == "U99"
+    assert registry.alias_for("user-2") == "U3"
+    assert registry.alias_for("unknown") is None
+    with pytest.raises(AliasError):
+        registry.assign("u", "x")
+
+
+def test_existing_alias_is_reused_without_using_a_number(backend):
+    first = AliasRegistry(AliasDAO())
+    assert first.assign("U", "user-1") == "U1"
+    second = AliasRegistry(AliasDAO())  # another process: nothing cached
+    assert second.assign("U", "user-1") == "U1"
+    assert second.assign("U", "user-2") == "U2"
+
+
+def test_number_taken_elsewhere_is_skipped(backend):
+    first, second = AliasRegistry(AliasDAO()), AliasRegistry(AliasDAO())
+    assert first.assign("B", "bid-1") == "B1"
+    assert second.assign("B", "bid-2") == "B2"
+    assert first.assign("B", "bid-3") == "B3"  # its counter said B2: re-seeded after the empty insert
+
+
+def test_concurrent_assign_for_the_same_id_returns_the_winner(registry):
+    registry.assign("U", "user-1")
+    dao = registry.dao
+    lookups = []
+    get_by_target = dao.get_by_target
+
+    def racing_lookup(target_id):
+        # the pre-check misses: the other process has not committed yet
+        lookups.append(target_id)
+        return None if len(lookups) == 1 else get_by_target(target_id)
+
+    dao.get_by_target = racing_lookup
+    fresh = AliasRegistry(dao)
+    assert fresh.assign("U", "user-1") == "U1"
+    assert len(lookups) == 2
+
+
+def test_backend_errors_other_than_conflicts_propagate(registry):
+    def broken(*args):
+        raise BackendError("disk I/O error")
+
+    registry.dao.create = broken
+    with pytest.raises(BackendError, match="disk"):
+        registry.assign("U", "user-1")
+
+
+def test_unique_violations_are_recognised(backend):
+    backend.table("aliases").insert({"id": "U1", "prefix": "U", "seq": 1, "target_id": "t"}).execute()
+    with pytest.raises(UniqueViolation) as e:
+        backend.table("aliases").insert({"id": "U2", "prefix": "U", "seq": 2, "target_id": "t"}).execute()
+    assert is_unique_violation(e.value)
+
+    class APIError(Exception):
+        code = "23505"
+
+    assert is_unique_violation(APIError())
+    assert not is_unique_violation(BackendError("no such table"))
+
+
+def test_aliases_for_resolves_a_page_in_one_query(registry):
+    for i in range(5):
+        registry.assign("A", f"auction-{i}")
+    calls = []
+    get_by_targets = registry.dao.get_by_targets
+    registry.dao.get_by_targets = lambda ids: calls.append(list(ids)) or get_by_targets(ids)
+    fresh = AliasRegistry(registry.dao)
+    found = fresh.aliases_for([f"auction-{i}" for i in range(5)] + ["missing"])
+    assert found == {f"auction-{i}": f"A{i + 1}" for i in range(5)}
+    assert len(calls) == 1
+    assert fresh.aliases_for(["auction-0", "auction-3"]) == {"auction-0": "A1", "auction-3": "A4"}
+    assert len(calls) == 1
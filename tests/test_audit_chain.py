@@ -0,0 +1,125 @@
+# tests/test_audit_chain.py
+import os
+
+import pytest
+
+from src.dao.audit_chain import GENESIS, AuditChain, list_segments
+from src.services import audit_verify
+from src.services.audit_verify import verify_chain
+
+
+def _entries(n, start=0):
+    return [{"entity": "bid", "entity_id": str(i), "action": "create_sealed", "details": {"n": i}}
+            for i in range(start, start + n)]
+
+
+@pytest.fixture
+def chain(tmp_path):
+    c = AuditChain(str(tmp_path / "chain"), segment_entries=5, fsync=False)
+    c.append_many(_entries(18))
+    yield c
+    c.close()
+
+
+def _flip_same_length(path, keep_mtime=True):
+    st = os.stat(path)
+    data = bytearray(open(path, "rb").read())
+    i = data.rindex(b'"n":') + 4  # a digit inside the last entry's details
+    data[i] = ord("9") if data[i] != ord("9") else ord("8")
+    with open(path, "wb") as f:
+        f.write(bytes(data))
+    if keep_mtime:
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+
+def test_clean_chain_verifies(chain):
+    report = verify_chain(chain.directory, workers=1)
+    assert report["errors"] == []
+    assert report["entries"] == 18 and report["segments"] == 4
+    assert report["head"] == {"seq": 18, "hash": chain.head()["hash"]}
+
+
+def test_parallel_workers_agree(chain):
+    assert verify_chain(chain.directory, workers=2)["head"] == verify_chain(chain.directory, workers=1)["head"]
+
+
+def test_tampering_is_reported_and_head_stops_before_it(chain):
+    segments = list_segments(chain.directory)
+    _flip_same_length(segments[1])
+    report = verify_chain(chain.directory, workers=1)
+    assert len(report["errors"]) == 1 and "hash mismatch" in report["errors"][0]
+    assert report["head"]["seq"] == 5  # end of the first segment, the last clean one
+
+
+def test_first_segment_failure_leaves_genesis_head(chain):
+    _flip_same_length(list_segments(chain.directory)[0])
+    assert verify_chain(chain.directory, workers=1)["head"] == {"seq": 0, "hash": GENESIS}
+
+
+def test_removed_segment_breaks_the_links(chain):
+    os.remove(list_segments(chain.directory)[1])
+    report = verify_chain(chain.directory, workers=1)
+    assert any("does not continue the chain" in e for e in report["errors"])
+
+
+def test_checkpoint_skips_unchanged_segments(chain, tmp_path):
+    cp = str(tmp_path / "cp.json")
+    first = verify_chain(chain.directory, workers=1, checkpoint_path=cp)
+    second = verify_chain(chain.directory, workers=1, checkpoint_path=cp)
+    assert first["verified"] == 4 and second["skipped"] == 4 and second["errors"] == []
+    chain.append_many(_entries(1, 18))
+    third = verify_chain(chain.directory, workers=1, checkpoint_path=cp)
+    assert third["verified"] == 1 and third["head"]["seq"] == 19
+
+
+def test_checkpoint_does_not_trust_size_and_mtime(chain, tmp_path):
+    cp = str(tmp_path / "cp.json")
+    verify_chain(chain.directory, workers=1, checkpoint_path=cp)
+    # same length, mtime put back: only the content digest can tell
+    _flip_same_length(list_segments(chain.directory)[1])
+    report = verify_chain(chain.directory, workers=1, checkpoint_path=cp)
+    assert report["errors"] and report["head"]["seq"] == 5
+
+
+def test_checkpoint_of_another_directory_is_ignored(chain, tmp_path):
+    cp = str(tmp_path / "cp.json")
+    verify_chain(chain.directory, workers=1, checkpoint_path=cp)
+    other = AuditChain(str(tmp_path / "other"), segment_entries=5, fsync=False)
+    other.append_many(_entries(3))
+    assert verify_chain(other.directory, workers=1, checkpoint_path=cp)["skipped"] == 0
+
+
+def test_cli_refuses_a_checkpoint_inside_the_audit_directory(chain):
+    with pytest.raises(SystemExit):
+        audit_verify.main(["--dir", chain.directory, "--checkpoint", os.path.join(chain.directory, "cp.json")])
+
+
+def test_torn_tail_is_tolerated_then_cut_by_the_writer(chain):
+    last = list_segments(chain.directory)[-1]
+    with open(last, "ab") as f:
+        f.write(b'0123456789abcdef {"seq":19,"torn')  # a crash mid-append
+    report = verify_chain(chain.directory, workers=1)
+    assert report["errors"] == [] and report["head"]["seq"] == 18
+
+    reopened = AuditChain(chain.directory, segment_entries=5, fsync=False)
+    assert reopened.head()["seq"] == 18
+    appended = reopened.append(_entries(1, 99)[0])
+    assert appended["seq"] == 19
+    assert verify_chain(chain.directory, workers=1)["errors"] == []
+    reopened.close()
+
+
+def test_torn_tail_in_a_closed_segment_is_an_error(chain):
+    with open(list_segments(chain.directory)[1], "ab") as f:
+        f.write(b"partial")
+    assert any("incomplete last entry" in e for e in verify_chain(chain.directory, workers=1)["errors"])
+
+
+def test_writer_recovers_from_a_crash_while_starting_a_segment(chain):
+    # a header with no newline: the segment was never acknowledged
+    number = len(list_segments(chain.directory)) + 1
+    with open(os.path.join(chain.directory, f"segment-{number:08d}.log"), "wb") as f:
+        f.write(b"AUDITCHAIN 1 ")
+    reopened = AuditChain(chain.directory, segment_entries=5, fsync=False)
+    assert reopened.head()["seq"] == 18
+    reopened.close()
@@ -0,0 +1,188 @@
+# tests/test_bid_journal.py
+import json
+import os
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.dao.bid_journal import JOURNAL_NAME, OFFSET_NAME, REJECTED_NAME, BidJournal, BidJournalError
+
+
+def _row(**extra):
+    return dict({"id": str(uuid.uuid4()), "auction_id": "a1", "bidder_id": "u1", "commitment": "c"}, **extra)
+
+
+class _Sink:
+    """replicate() callback: records rows, rejects rows marked bad, fails transiently on demand."""
+
+    def __init__(self, transient_failures=0):
+        self.rows = []
+        self.calls = 0
+        self.transient_failures = transient_failures
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def __call__(self, rows):
+        self.gate.wait(5)
+        self.calls += 1
+        if self.transient_failures:
+            self.transient_failures -= 1
+            raise ConnectionError("backend unreachable")
+        bad = [r for r in rows if r.get("bad")]
+        if bad:
+            raise ValueError(f"{len(bad)} invalid rows")
+        self.rows += rows
+
+
+def _journal(tmp_path, sink, **kwargs):
+    kwargs.setdefault("flush_interval", 0.01)
+    return BidJournal(str(tmp_path), sink, fsync=False, **kwargs)
+
+
+def test_replicates_in_order_and_saves_offset(tmp_path):
+    sink = _Sink()
+    journal = _journal(tmp_path, sink, batch_size=3)
+    rows = journal.append_many([_row() for _ in range(7)])
+    assert journal.flush(5)
+    journal.close()
+    assert [r["id"] for r in sink.rows] == [r["id"] for r in rows]
+    assert int((tmp_path / OFFSET_NAME).read_text()) == os.path.getsize(tmp_path / JOURNAL_NAME)
+    assert journal.stats()["pending"] == 0
+
+
+def test_replays_unreplicated_bids_and_drops_torn_tail(tmp_path):
+    done, todo = _row(), _row()
+    line = lambda r: json.dumps(r, separators=(",", ":")).encode() + b"\n"
+    with open(tmp_path / JOURNAL_NAME, "wb") as f:
+        f.write(line(done) + line(todo) + b'{"id":"torn')
+    (tmp_path / OFFSET_NAME).write_text(str(len(line(done))))  # crashed after replicating the first bid
+
+    sink = _Sink()
+    journal = _journal(tmp_path, sink)
+    assert journal.recovered == 1
+    assert journal.flush(5)
+    journal.close()
+    assert [r["id"] for r in sink.rows] == [todo["id"]]
+    assert os.path.getsize(tmp_path / JOURNAL_NAME) == len(line(done) + line(todo))
+
+
+def test_restart_after_crash_before_replication(tmp_path):
+    sink = _Sink()
+    sink.gate.clear()  # backend hangs: nothing replicates before the "crash"
+    journal = _journal(tmp_path, sink)
+    rows = journal.append_many([_row() for _ in range(3)])
+    journal._stop.set()
+    journal._closed = True
+    os.close(journal._fd)  # lose the process without a final flush
+
+    sink2 = _Sink()
+    again = _journal(tmp_path, sink2)
+    assert again.recovered == 3
+    assert again.flush(5)
+    again.close()
+    assert [r["id"] for r in sink2.rows] == [r["id"] for r in rows]
+    sink.gate.set()
+
+
+def test_one_process_per_directory(tmp_path):
+    journal = _journal(tmp_path, _Sink())
+    import subprocess
+    import sys
+    code = ("import sys; from src.dao.bid_journal import BidJournal, BidJournalError\n"
+            "try:\n    BidJournal(sys.argv[1], lambda rows: None)\n"
+            "except BidJournalError:\n    sys.exit(3)\n")
+    proc = subprocess.run([sys.executable, "-c", code, str(tmp_path)], cwd=os.getcwd())
+    journal.close()
+    assert proc.returncode == 3
+
+
+def test_group_commit_shares_fsyncs(tmp_path):
+    journal = BidJournal(str(tmp_path), _Sink(), flush_interval=0.01, fsync=True)
+    threads = [threading.Thread(target=lambda: [journal.append(_row()) for _ in range(20)]) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(10)
+    assert journal.flush(10)
+    stats = journal.stats()
+    journal.close()
+    assert stats["appended"] == 160 and stats["replicated"] == 160
+    assert 1 <= stats["fsyncs"] <= 160
+
+
+def test_rejected_rows_are_bisected_out_and_dead_lettered(tmp_path):
+    sink = _Sink()
+    journal = _journal(tmp_path, sink, batch_size=16)
+    rows = [_row(bad=i in (3, 11)) for i in range(16)]
+    journal.append_many(rows)
+    assert journal.flush(5)
+    journal.close()
+    assert [r["id"] for r in sink.rows] == [r["id"] for i, r in enumerate(rows) if i not in (3, 11)]
+    with open(tmp_path / REJECTED_NAME) as f:
+        dead = [json.loads(line) for line in f]
+    assert [d["row"]["id"] for d in dead] == [rows[3]["id"], rows[11]["id"]]
+    assert all(d["error"].startswith("ValueError") for d in dead)
+    assert journal.stats()["rejected"] == 2
+
+
+def test_transient_failures_back_off_and_retry(tmp_path):
+    sink = _Sink(transient_failures=2)
+    journal = _journal(tmp_path, sink, max_backoff=0.05)
+    row = journal.append(_row())
+    assert journal.flush(5)
+    journal.close()
+    assert journal.stats()["failures"] == 2 and journal.stats()["rejected"] == 0
+    assert [r["id"] for r in sink.rows] == [row["id"]]
+
+
+def test_wait_for_only_waits_for_given_bids(tmp_path):
+    released = []
+
+    def replicate(rows):
+        if any(r.get("slow") for r in rows):
+            raise ConnectionError("stuck")
+        released.extend(rows)
+
+    journal = _journal(tmp_path, replicate, batch_size=1)
+    mine = journal.append(_row())
+    assert journal.wait_for([mine["id"]], 5)
+    journal.append(_row(slow=True))  # never replicates
+    assert not journal.flush(0.2)
+    assert journal.wait_for([mine["id"]], 0.2)
+    journal._closed = True  # skip the final attempt on the stuck row
+    journal._stop.set()
+
+
+def test_closed_journal_refuses_appends(tmp_path):
+    journal = _journal(tmp_path, _Sink())
+    journal.close()
+    with pytest.raises(BidJournalError):
+        journal.append(_row())
+
+
+def test_journal_mode_rejects_unknown_bidders_before_acknowledging(backend, tmp_path, monkeypatch):
+    from src.services import bid_service
+
+    monkeypatch.setattr(bid_service, "_journal", None)
+    monkeypatch.setattr(bid_service, "BID_JOURNAL_DIR", str(tmp_path))
+    now = datetime.now(timezone.utc)
+    user = backend.table("users").insert({"id": str(uuid.uuid4()), "name": "A", "email": "a@x"}).execute().data[0]
+    auction = {"id": str(uuid.uuid4()), "title": "Lot", "description": "", "reserve_price": "1",
+               "start_time": (now - timedelta(hours=1)).isoformat(), "end_time": (now + timedelta(hours=1)).isoformat(),
+               "created_by": user["id"], "is_closed": False, "created_at": now.isoformat()}
+    backend.table("auctions").insert(auction).execute()
+    service = bid_service.BidService(accept_mode="journal")
+    commitment = "0" * 64
+    try:
+        with pytest.raises(bid_service.BidError, match="Bidder not found"):
+            service.place_sealed(auction["id"], str(uuid.uuid4()), commitment)
+        results = service.place_sealed_many([(auction["id"], user["id"], commitment),
+                                             (auction["id"], str(uuid.uuid4()), commitment)])
+        assert [r["accepted"] for r in results] == [True, False]
+        assert results[1]["error"] == "Bidder not found"
+        assert bid_service.get_journal().stats()["appended"] == 1
+    finally:
+        if bid_service._journal is not None:
+            bid_service._journal.close()
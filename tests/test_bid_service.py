@@ -0,0 +1,65 @@
+# tests/test_bid_service.py
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.services.bid_service import BidService
+
+COMMITMENT = "0" * 64
+
+
+@pytest.fixture
+def auction_id(backend):
+    now = datetime.now(timezone.utc)
+    row = {"id": str(uuid.uuid4()), "title": "Lot", "description": "", "reserve_price": "1",
+           "start_time": (now - timedelta(hours=1)).isoformat(), "end_time": (now + timedelta(hours=1)).isoformat(),
+           "created_by": str(uuid.uuid4()), "is_closed": False, "created_at": now.isoformat()}
+    backend.table("auctions").insert(row).execute()
+    return row["id"]
+
+
+def _strict(service, fail_with=ValueError):
+    """Make bulk inserts all-or-nothing and reject any chunk holding a "bad" bidder."""
+    insert = service.dao.create_sealed_many
+    calls = []
+
+    def create_sealed_many(items, chunk_size=500):
+        calls.append(len(items))
+        if any(bidder == "bad" for _, bidder, _ in items):
+            raise fail_with("invalid input syntax for type uuid")
+        return insert(items, chunk_size)
+
+    service.dao.create_sealed_many = create_sealed_many
+    return calls
+
+
+def test_rejected_rows_fail_alone(backend, auction_id):
+    service = BidService(accept_mode="sync")
+    calls = _strict(service)
+    bidders = [str(uuid.uuid4()) for _ in range(10)]
+    bidders[2] = bidders[7] = "bad"
+    results = service.place_sealed_many([(auction_id, b, COMMITMENT) for b in bidders], chunk_size=8)
+    assert [r["accepted"] for r in results] == [b != "bad" for b in bidders]
+    assert "uuid" in results[2]["error"]
+    assert len(backend.table("bids").select("id").execute().data) == 8
+    assert len(backend.table("audit_log").select("id").eq("action", "create_sealed").execute().data) == 8
+    assert calls[0] == 8 and len(calls) > 2
+
+
+def test_network_errors_fail_the_chunk_without_resending(backend, auction_id):
+    service = BidService(accept_mode="sync")
+    calls = _strict(service, fail_with=ConnectionError)
+    bidders = [str(uuid.uuid4()), "bad", str(uuid.uuid4())]
+    results = service.place_sealed_many([(auction_id, b, COMMITMENT) for b in bidders])
+    assert [r["accepted"] for r in results] == [False, False, False]
+    assert calls == [3]
+
+
+def test_validation_errors_are_per_item(backend, auction_id):
+    service = BidService(accept_mode="sync")
+    results = service.place_sealed_many([(auction_id, str(uuid.uuid4()), COMMITMENT),
+                                         (auction_id, str(uuid.uuid4()), "not-a-digest"),
+                                         (str(uuid.uuid4()), str(uuid.uuid4()), COMMITMENT)])
+    assert [r["accepted"] for r in results] == [True, False, False]
+    assert results[2]["error"] == "Auction not found"
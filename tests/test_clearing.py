@@ -0,0 +1,56 @@
+# tests/test_clearing.py
+"""src.services.clearing against a sort-everything reference on random small
+auctions: heavy amount and created_at ties, reserves, NaN for unrevealed bids."""
+import math
+import random
+from typing import List, Optional, Tuple
+
+import pytest
+
+from src.services.clearing import (AUCTION_TYPES, MULTI_UNIT_TYPES, PRICE_FROM_LOSER_TYPES, RESERVE,
+                                   clear)
+
+
+def naive_clear(auction_type: str, amounts: List[float], created: List[float],
+                reserve: float, units: int) -> Tuple[List[int], Optional[int]]:
+    """Reference: sort every eligible bid, take the first `units`."""
+    if auction_type not in MULTI_UNIT_TYPES:
+        units = 1
+    ranked = sorted((i for i, a in enumerate(amounts) if not math.isnan(a) and a >= reserve),
+                    key=lambda i: (-amounts[i], created[i], i))
+    winners = ranked[:units]
+    if auction_type not in PRICE_FROM_LOSER_TYPES or not winners:
+        return winners, None
+    return winners, ranked[units] if len(ranked) > units else RESERVE
+
+
+def random_auction(rng: random.Random):
+    n = rng.randint(0, 40)
+    # few distinct values so amount and created_at ties are common
+    amounts = [float(rng.randint(1, 8)) if rng.random() > 0.1 else math.nan for _ in range(n)]
+    created = [float(rng.randint(0, 5)) for _ in range(n)]
+    return amounts, created, float(rng.randint(0, 6)), rng.randint(1, 6)
+
+
+@pytest.mark.parametrize("auction_type", AUCTION_TYPES)
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_reference(auction_type, seed):
+    rng = random.Random(seed)
+    for _ in range(100):
+        amounts, created, reserve, units = random_auction(rng)
+        got = clear(auction_type, amounts, created, reserve, units)
+        assert (got.winners.tolist(), got.price_bid) == naive_clear(auction_type, amounts, created, reserve, units), \
+            f"units={units} reserve={reserve} amounts={amounts} created={created}"
+
+
+@pytest.mark.parametrize("auction_type", AUCTION_TYPES)
+def test_no_eligible_bids(auction_type):
+    for amounts in ([], [math.nan, math.nan], [1.0, 2.0]):
+        got = clear(auction_type, amounts, list(range(len(amounts))), 5.0, 2)
+        assert len(got) == 0
+        assert got.price_bid is None
+
+
+def test_second_price_paid_by_runner_up_or_reserve():
+    assert clear("second_price", [10.0, 7.0, 7.0], [0, 2, 1], 1.0, 1).price_bid == 2
+    assert clear("second_price", [10.0, 3.0], [0, 1], 5.0, 1).price_bid == RESERVE
@@ -0,0 +1,50 @@
+# tests/test_leaderboard.py
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from src.models import Bid
+from src.services.leaderboard import Leaderboard
+
+
+def _bid(amount, minutes=0, auction_id="a1"):
+    return Bid.from_row({"id": str(uuid.uuid4()), "auction_id": auction_id, "bidder_id": "u1", "commitment": "c",
+                         "amount": str(amount), "revealed": True,
+                         "created_at": (datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=minutes)).isoformat()})
+
+
+def test_top_is_ranked_by_amount_then_earliest():
+    a, b, c = _bid(5, 2), _bid(9, 1), _bid(5, 1)
+    board = Leaderboard(3, [a, b])
+    board.add(c)
+    assert [x.id for x in board.top()] == [b.id, c.id, a.id]
+    assert board.best().amount == Decimal("9")
+
+
+def test_seeded_and_evicted_bids_are_not_added_twice():
+    low, mid, high = _bid(1), _bid(2), _bid(3)
+    board = Leaderboard(2, [mid, high])
+    board.add(high)  # the seed query already returned it
+    board.add(low)
+    assert [x.id for x in board.top()] == [high.id, mid.id]
+    top = _bid(4)
+    board.add(top)  # evicts mid
+    board.add(mid)
+    assert [x.id for x in board.top()] == [top.id, high.id]
+    assert len(board._heap) == 2
+
+
+def test_summary_count_is_exact(backend):
+    from src.services.reporting_service import ReportingService
+
+    auction_id = str(uuid.uuid4())
+    for i in range(5):
+        row = _bid(i + 1, i, auction_id).to_dict()
+        backend.table("bids").insert(row).execute()
+    service = ReportingService()
+    first = service.summary(auction_id)
+    assert first["total_revealed"] == 5
+    backend.table("bids").insert(_bid(2, 9, auction_id).to_dict()).execute()
+    second = service.summary(auction_id)
+    assert second["total_revealed"] == 6
+    assert second["highest"]["amount"] == first["highest"]["amount"]
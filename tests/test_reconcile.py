@@ -0,0 +1,133 @@
+# tests/test_reconcile.py
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.services import reconcile
+
+
+def _id():
+    return str(uuid.uuid4())
+
+
+def _ts(minutes=0):
+    return (datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=minutes)).isoformat()
+
+
+@pytest.fixture
+def data(backend):
+    def auction(closed=True):
+        row = {"id": _id(), "title": "Lot", "description": "", "reserve_price": "1", "start_time": _ts(),
+               "end_time": _ts(60), "created_by": _id(), "is_closed": closed, "created_at": _ts()}
+        backend.table("auctions").insert(row).execute()
+        return row["id"]
+
+    def declare(auction_id, details, minutes=61):
+        backend.table("audit_log").insert({"id": _id(), "entity": "auction", "entity_id": auction_id,
+                                           "action": "declare_winner", "details": details,
+                                           "created_at": _ts(minutes)}).execute()
+
+    def pay(auction_id, bid_id, payer_id, amount, minutes=62):
+        backend.table("payments").insert({"id": _id(), "auction_id": auction_id, "bid_id": bid_id,
+                                          "payer_id": payer_id, "amount_paid": str(amount),
+                                          "created_at": _ts(minutes)}).execute()
+
+    return auction, declare, pay
+
+
+def _findings(watermark=None, **kwargs):
+    r = reconcile.Reconciler(page_size=3, **kwargs)
+    found = [f for f in (r.incremental(watermark) if watermark else r.full()) if f["kind"] != "auction"]
+    return sorted(f["kind"] for f in found), r
+
+
+def test_clean_auction_has_no_findings(data):
+    auction, declare, pay = data
+    a, bid, bidder = auction(), _id(), _id()
+    declare(a, {"bid_id": bid, "bidder_id": bidder, "amount": "12.50", "price": "10"})
+    pay(a, bid, bidder, "10.00")
+    assert _findings()[0] == []
+
+
+def test_each_discrepancy_kind(data):
+    auction, declare, pay = data
+    lots = [(auction(), _id(), _id()) for _ in range(5)]
+    for a, bid, bidder in lots:
+        declare(a, {"bid_id": bid, "bidder_id": bidder, "price": "10"})
+    (a0, b0, u0), (a1, b1, u1), (a2, b2, u2), (a3, b3, u3), (a4, b4, u4) = lots
+    pay(a1, b1, u1, 9)                            # underpaid
+    pay(a2, b2, u2, 10); pay(a2, b2, u2, 10)      # duplicate
+    pay(a3, b3, _id(), 10)                        # wrong payer
+    pay(a4, b4, u4, 11); pay(a4, _id(), u4, 3)    # overpaid + a payment for a losing bid
+    assert _findings()[0] == ["duplicate", "missing", "overpaid", "underpaid", "unexpected", "wrong_payer"]
+
+
+def test_multi_unit_declaration_lists_every_winner(data):
+    auction, declare, pay = data
+    a, wins = auction(), [(_id(), _id()) for _ in range(3)]
+    declare(a, {"bid_id": wins[0][0], "bidder_id": wins[0][1], "price": "5",
+                "winners": [{"bid_id": b, "bidder_id": u, "price": "5"} for b, u in wins]})
+    for b, u in wins[:2]:
+        pay(a, b, u, 5)
+    assert _findings()[0] == ["missing"]
+
+
+def test_latest_declaration_wins(data):
+    auction, declare, pay = data
+    a, first, second = auction(), (_id(), _id()), (_id(), _id())
+    declare(a, {"bid_id": first[0], "bidder_id": first[1], "price": "7"}, minutes=61)
+    declare(a, {"bid_id": second[0], "bidder_id": second[1], "price": "8"}, minutes=65)
+    pay(a, second[0], second[1], 8)
+    assert _findings()[0] == []
+
+
+def test_legacy_declaration_without_price_uses_amount(data):
+    # declare_winner entries written before clearing prices existed: bid_id, bidder_id, amount
+    auction, declare, pay = data
+    a, bid, bidder = auction(), _id(), _id()
+    declare(a, {"bid_id": bid, "bidder_id": bidder, "amount": 42.5})
+    pay(a, bid, bidder, "42.50")
+    kinds, _ = _findings()
+    assert kinds == []
+
+    b, bid2, bidder2 = auction(), _id(), _id()
+    declare(b, {"bid_id": bid2, "bidder_id": bidder2, "amount": "30"})
+    pay(b, bid2, bidder2, 20)
+    assert _findings()[0] == ["underpaid"]
+
+
+def test_unreadable_declaration_is_skipped_and_counted(data):
+    auction, declare, pay = data
+    a, bid, bidder = auction(), _id(), _id()
+    declare(a, {"bid_id": bid, "bidder_id": bidder, "price": "10"})
+    pay(a, bid, bidder, 10)
+    declare(auction(), {"note": "no winner fields"})
+    declare(auction(), {"bid_id": _id(), "bidder_id": _id(), "price": "not a number"})
+    kinds, r = _findings()
+    assert kinds == [] and r.skipped == 2
+
+
+def test_spilling_partitions_give_the_same_result(data):
+    auction, declare, pay = data
+    for i in range(20):
+        a, bid, bidder = auction(), _id(), _id()
+        declare(a, {"bid_id": bid, "bidder_id": bidder, "price": "10"})
+        if i % 3:
+            pay(a, bid, bidder, 10 if i % 2 else 9)
+    in_memory, _ = _findings()
+    spilled, r = _findings(memory_rows=4, partitions=4)
+    assert spilled == in_memory and r.spills > 0
+
+
+def test_incremental_rechecks_only_touched_auctions(data, monkeypatch):
+    auction, declare, pay = data
+    monkeypatch.setattr(reconcile, "RECONCILE_OVERLAP_SECONDS", 0)
+    old, new = (auction(), _id(), _id()), (auction(), _id(), _id())
+    declare(old[0], {"bid_id": old[1], "bidder_id": old[2], "price": "10"}, minutes=30)  # missing, not touched
+    declare(new[0], {"bid_id": new[1], "bidder_id": new[2], "price": "10"})
+    _, first = _findings()
+    pay(new[0], new[1], new[2], 9, minutes=120)
+    kinds, r = _findings(first.watermark.isoformat())
+    assert kinds == ["underpaid"]
+    assert r.watermark == datetime.fromisoformat(_ts(120))
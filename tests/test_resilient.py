@@ -0,0 +1,149 @@
+# tests/test_resilient.py
+import asyncio
+
+import pytest
+
+from src.dao.backends.async_backend import AsyncBackend, AsyncResilientBackend
+from src.dao.backends.base import Response, StorageBackend
+from src.dao.backends.resilient import CircuitBreaker, CircuitOpenError, ResilientBackend, is_transient
+
+
+class APIError(Exception):
+    """Shaped like postgrest's APIError: the error body's fields as attributes."""
+
+    def __init__(self, code, message="error"):
+        super().__init__(message)
+        self.code = code
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Failing(StorageBackend):
+    """Raises the queued errors in turn, then answers."""
+    name = "fake"
+
+    def __init__(self, errors=()):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def table(self, name):
+        return _Query(self)
+
+
+class _Query:
+    def __init__(self, backend):
+        self.backend = backend
+
+    def __getattr__(self, name):
+        return lambda *a, **k: self
+
+    def execute(self):
+        self.backend.calls += 1
+        if self.backend.errors:
+            raise self.backend.errors.pop(0)
+        return Response([{"ok": True}])
+
+
+def _resilient(errors, attempts=3, breaker=None):
+    inner = Failing(errors)
+    return ResilientBackend(inner, attempts=attempts, breaker=breaker or CircuitBreaker(3, 10.0),
+                            sleep=lambda s: None), inner
+
+
+@pytest.mark.parametrize("exc", [ConnectionError("reset"), TimeoutError(), APIError(502), APIError("503"),
+                                 APIError(504), APIError(429)])
+def test_transient(exc):
+    assert is_transient(exc)
+
+
+@pytest.mark.parametrize("exc", [APIError("23505"), APIError("PGRST116"), APIError(400), APIError("404"),
+                                 ValueError("bad")])
+def test_not_transient(exc):
+    assert not is_transient(exc)
+
+
+def test_reads_retry_through_5xx_and_429():
+    backend, inner = _resilient([APIError(503), APIError(429)])
+    assert backend.table("bids").select("*").execute().data == [{"ok": True}]
+    assert inner.calls == 3 and backend.stats()["retries"] == 2
+
+
+def test_writes_are_not_retried():
+    backend, inner = _resilient([APIError(503)])
+    with pytest.raises(APIError):
+        backend.table("bids").insert({}).execute()
+    assert inner.calls == 1
+
+
+def test_query_errors_are_not_retried_and_do_not_trip_the_breaker():
+    backend, inner = _resilient([APIError("23505")] * 5, attempts=3)
+    for _ in range(5):
+        with pytest.raises(APIError):
+            backend.table("bids").select("*").execute()
+    assert inner.calls == 5 and backend.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_opens_on_5xx_then_half_opens():
+    clock = Clock()
+    breaker = CircuitBreaker(3, 10.0, clock=clock)
+    backend, inner = _resilient([APIError(502)] * 3, attempts=1, breaker=breaker)
+    for _ in range(3):
+        with pytest.raises(APIError):
+            backend.table("bids").select("*").execute()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        backend.table("bids").select("*").execute()
+    assert inner.calls == 3
+    clock.now = 10.0
+    backend.table("bids").select("*").execute()  # the probe succeeds
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_failed_probe_reopens():
+    clock = Clock()
+    breaker = CircuitBreaker(1, 5.0, clock=clock)
+    backend, _ = _resilient([APIError(500), APIError(500)], attempts=1, breaker=breaker)
+    with pytest.raises(APIError):
+        backend.table("bids").select("*").execute()
+    clock.now = 5.0
+    with pytest.raises(APIError):
+        backend.table("bids").select("*").execute()
+    assert breaker.state == CircuitBreaker.OPEN and breaker.stats()["opens"] == 2
+
+
+class AsyncFailing(AsyncBackend):
+    name = "supabase"
+
+    def __init__(self, errors=()):
+        self.errors = list(errors)
+        self.calls = 0
+
+    async def run(self, table, calls):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return Response([])
+
+
+def test_async_retries_5xx_and_shares_the_breaker():
+    breaker = CircuitBreaker(2, 60.0)
+    inner = AsyncFailing([APIError(503)])
+    backend = AsyncResilientBackend(inner, attempts=3, base_ms=0, breaker=breaker)
+    asyncio.run(backend.table("bids").select("*").execute())
+    assert inner.calls == 2 and backend.stats()["retries"] == 1
+
+    down = AsyncResilientBackend(AsyncFailing([APIError(429)] * 5), attempts=1, breaker=breaker)
+    for _ in range(2):
+        with pytest.raises(APIError):
+            asyncio.run(down.table("bids").select("*").execute())
+    # the sync wrapper sharing this breaker now fails fast too
+    sync, sync_inner = _resilient([], breaker=breaker)
+    with pytest.raises(CircuitOpenError):
+        sync.table("bids").select("*").execute()
+    assert sync_inner.calls == 0
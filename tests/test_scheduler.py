@@ -0,0 +1,72 @@
+# tests/test_scheduler.py
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.services.scheduler import AuctionScheduler
+
+NOW = datetime(2024, 1, 1, 12, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def auction(backend):
+    def auction(end_minutes, created_minutes=-60, closed=False, naive=False):
+        end = NOW + timedelta(minutes=end_minutes)
+        row = {"id": str(uuid.uuid4()), "title": "Lot", "description": "", "reserve_price": "10",
+               "start_time": (NOW - timedelta(hours=2)).isoformat(),
+               "end_time": (end.replace(tzinfo=None) if naive else end).isoformat(),
+               "created_by": str(uuid.uuid4()), "is_closed": closed,
+               "created_at": (NOW + timedelta(minutes=created_minutes)).isoformat()}
+        backend.table("auctions").insert(row).execute()
+        return row["id"]
+    return auction
+
+
+def _scheduler(**kwargs):
+    return AuctionScheduler(grace_seconds=60, lock_path=None, **kwargs)
+
+
+def _actions(backend, auction_id):
+    rows = backend.table("audit_log").select("action").eq("entity_id", auction_id).execute().data
+    return sorted(r["action"] for r in rows)
+
+
+def test_closes_then_settles_without_a_winner(backend, auction):
+    a = auction(-0.5, naive=True)  # stored without an offset: taken as UTC
+    scheduler = _scheduler()
+    scheduler.load(NOW)
+    assert scheduler.run_due(NOW)["closed"] == [a]
+    assert scheduler.run_due(NOW)["settled"] == {}  # not yet past the grace period
+    assert scheduler.run_due(NOW + timedelta(minutes=10))["settled"] == {a: None}
+    assert _actions(backend, a) == ["close", "no_winner"]
+    scheduler.stop()
+
+
+def test_no_winner_settlements_are_not_repeated_after_restart(backend, auction):
+    a = auction(-30, closed=True)
+    first = _scheduler()
+    first.load(NOW)
+    assert first.run_due(NOW)["settled"] == {a: None}
+    first.stop()
+    again = _scheduler()
+    assert again.load(NOW) == 0
+    again.stop()
+    assert _actions(backend, a) == ["no_winner"]
+
+
+def test_poll_picks_up_late_committed_auctions(backend, auction):
+    scheduler = _scheduler(poll_overlap=300)
+    auction(60, created_minutes=-1)
+    scheduler.load(NOW)
+    late = auction(60, created_minutes=-3)  # stamped before the newest one seen, committed after
+    assert scheduler.sync_new() == 1
+    assert scheduler.sync_new() == 0
+    assert scheduler.pending() == 4
+    scheduler.stop()
+    strict = _scheduler(poll_overlap=0)
+    strict.load(NOW)
+    auction(60, created_minutes=-5)
+    assert strict.sync_new() == 0
+    strict.stop()
+    assert late
@@ -0,0 +1,99 @@
+# tests/test_search.py
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.services.search import AuctionIndex, SearchError
+
+
+def _auction(title, description="", reserve="10", hours=1, closed=False):
+    now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return {"id": str(uuid.uuid4()), "title": title, "description": description, "reserve_price": reserve,
+            "start_time": now.isoformat(), "end_time": (now + timedelta(hours=hours)).isoformat(),
+            "created_by": "u1", "is_closed": closed, "created_at": now.isoformat()}
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _titles(result):
+    return [a["title"] for a in result["items"]]
+
+
+def test_words_prefix_filters_and_sort():
+    rows = [_auction("Red bicycle", reserve="50", hours=3), _auction("Blue bicycle", reserve="5", hours=2),
+            _auction("Red kettle", hours=1), _auction("Closed red lamp", closed=True)]
+    index = AuctionIndex(lambda: rows)
+    assert _titles(index.search("red")) == ["Red kettle", "Red bicycle"]
+    assert _titles(index.search("red bi")) == ["Red bicycle"]
+    assert _titles(index.search("bicycle", max_reserve=10)) == ["Blue bicycle"]
+    assert _titles(index.search("", sort="-reserve_price"))[0] == "Red bicycle"
+    page = index.search("", page=2, page_size=2)
+    assert page["total"] == 3 and page["pages"] == 2 and len(page["items"]) == 1
+    with pytest.raises(SearchError):
+        index.search(sort="bogus")
+
+
+def test_events_update_index_and_empty_postings_are_dropped():
+    index = AuctionIndex(lambda: [])
+    index.search()
+    lamp = _auction("Brass lamp")
+    index.added(lamp)
+    assert _titles(index.search("bra")) == ["Brass lamp"]
+    index.closed([lamp["id"]])
+    assert index.search("brass")["total"] == 0
+    assert index.stats()["tokens"] == 0 and index._postings == {}
+
+
+def test_events_during_rebuild_are_replayed():
+    old = _auction("Old clock")
+    new = _auction("New clock")
+    loading, release = threading.Event(), threading.Event()
+    state = {"rows": [old], "block": False}
+
+    def load():
+        rows = list(state["rows"])  # snapshot taken before the events below
+        if state["block"]:
+            loading.set()
+            release.wait(5)
+        return rows
+
+    clock = _Clock()
+    index = AuctionIndex(load, refresh_seconds=10, clock=clock)
+    index.search()
+    state["block"] = True
+    clock.now = 20
+    t = threading.Thread(target=index.search)
+    t.start()
+    assert loading.wait(5)
+    index.added(new)
+    index.closed([old["id"]])
+    release.set()
+    t.join(5)
+    assert _titles(index.search("clock")) == ["New clock"]
+
+
+def test_concurrent_stale_searches_share_one_rebuild():
+    calls = []
+
+    def load():
+        calls.append(1)
+        time.sleep(0.05)
+        return [_auction("Teapot")]
+
+    index = AuctionIndex(load)
+    threads = [threading.Thread(target=index.search, args=("teapot",)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+    assert len(calls) == 1
+    assert index.search("teapot")["total"] == 1
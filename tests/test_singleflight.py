@@ -0,0 +1,106 @@
+# tests/test_singleflight.py
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.dao.singleflight import AsyncSingleFlight, SingleFlight
+
+
+def _burst(n, target):
+    results, threads = [None] * n, []
+    for i in range(n):
+        def run(i=i):
+            try:
+                results[i] = target()
+            except Exception as e:
+                results[i] = e
+        threads.append(threading.Thread(target=run))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+    return results
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    runs = []
+
+    def fetch():
+        runs.append(1)
+        time.sleep(0.1)
+        return {"id": "a1"}
+
+    results = _burst(8, lambda: flight.do("auctions:a1", fetch))
+    assert len(runs) == 1
+    assert all(r is results[0] for r in results)
+    stats = flight.stats()
+    assert stats["calls"] == 8 and stats["executions"] == 1 and stats["coalesced"] == 7
+    assert stats["in_flight"] == 0 and stats["keys"]["auctions:a1"]["coalesced"] == 7
+
+
+def test_errors_reach_every_waiter_and_are_not_kept():
+    flight = SingleFlight()
+    runs = []
+
+    def fail():
+        runs.append(1)
+        time.sleep(0.1)
+        raise ValueError("boom")
+
+    results = _burst(4, lambda: flight.do("k", fail))
+    assert all(isinstance(r, ValueError) for r in results)
+    assert len(runs) == 1
+    assert flight.do("k", lambda: "fresh") == "fresh"
+
+
+def test_sequential_calls_are_not_cached_and_keys_are_separate():
+    flight = SingleFlight()
+    assert [flight.do("a", lambda: 1), flight.do("a", lambda: 2), flight.do("b", lambda: 3)] == [1, 2, 3]
+    assert flight.stats()["executions"] == 3
+
+
+def test_disabled_runs_every_call():
+    flight = SingleFlight(enabled=False)
+    runs = []
+    _burst(4, lambda: flight.do("k", lambda: runs.append(1)))
+    assert len(runs) == 4
+
+
+def test_async_calls_share_one_execution_and_survive_a_cancelled_caller():
+    flight = AsyncSingleFlight()
+    runs = []
+
+    async def fetch():
+        runs.append(1)
+        await asyncio.sleep(0.05)
+        return "row"
+
+    async def main():
+        first = asyncio.ensure_future(flight.do("bids:b1", fetch))
+        others = [asyncio.ensure_future(flight.do("bids:b1", fetch)) for _ in range(5)]
+        await asyncio.sleep(0)
+        first.cancel()
+        results = await asyncio.gather(*others)
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return results
+
+    assert asyncio.run(main()) == ["row"] * 5
+    assert len(runs) == 1
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_bid_reads_are_coalesced(backend):
+    import uuid
+    from src.dao.bid_dao import BidDAO
+    from src.dao.singleflight import reads
+
+    row = backend.table("bids").insert({"id": str(uuid.uuid4()), "auction_id": "a1", "bidder_id": "u1",
+                                        "commitment": "c", "revealed": False}).execute().data[0]
+    before = reads.stats()["executions"]
+    bids = _burst(6, lambda: BidDAO().get(row["id"]))
+    assert all(b.id == row["id"] for b in bids)
+    assert 1 <= reads.stats()["executions"] - before <= 6
@@ -0,0 +1,76 @@
+# tests/test_sqlite_backend.py
+import sqlite3
+import uuid
+from decimal import Decimal
+
+import pytest
+
+from src.dao.backends.base import BackendError
+from src.dao.backends.sqlite_backend import MemoryBackend, SQLiteBackend
+
+
+def _bid(backend, amount, auction_id="a1", revealed=True):
+    row = {"id": str(uuid.uuid4()), "auction_id": auction_id, "bidder_id": "u1", "commitment": "c",
+           "amount": amount, "revealed": revealed}
+    return backend.table("bids").insert(row).execute().data[0]
+
+
+def test_money_keeps_every_digit():
+    db = MemoryBackend()
+    exact = "12345678901234567.123456789"
+    row = _bid(db, exact)
+    assert row["amount"] == Decimal(exact)
+    assert db.table("bids").select("amount").eq("id", row["id"]).execute().data[0]["amount"] == Decimal(exact)
+    assert _bid(db, Decimal("10.10"))["amount"] == Decimal("10.10")
+    assert _bid(db, 7)["amount"] == Decimal(7)
+
+
+def test_money_orders_and_compares_numerically():
+    db = MemoryBackend()
+    for amount in ("9", "10", "100.5", "0.01", "99.99"):
+        _bid(db, amount)
+    _bid(db, None, revealed=False)
+    top = db.table("bids").select("amount").eq("revealed", True).order("amount", desc=True).limit(3).execute().data
+    assert [r["amount"] for r in top] == [Decimal("100.5"), Decimal("99.99"), Decimal("10")]
+    over = db.table("bids").select("amount").gte("amount", 10).execute().data
+    assert sorted(r["amount"] for r in over) == [Decimal("10"), Decimal("99.99"), Decimal("100.5")]
+    assert len(db.table("bids").select("id").eq("amount", "10.00").execute().data) == 1
+    assert len(db.table("bids").select("id").in_("amount", [Decimal("9.0"), "0.01"]).execute().data) == 2
+
+
+def test_old_numeric_columns_are_migrated(tmp_path):
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE "payments" ("id" TEXT PRIMARY KEY, "auction_id" TEXT, "bid_id" TEXT, '
+                 '"payer_id" TEXT, "amount_paid" NUMERIC, "created_at" TEXT)')
+    conn.execute("INSERT INTO payments VALUES ('p1', 'a1', 'b1', 'u1', '24.50', '2024-01-01T00:00:00+00:00')")
+    conn.commit()
+    conn.close()
+
+    db = SQLiteBackend(path)
+    row = db.table("payments").select("*").eq("id", "p1").execute().data[0]
+    assert row["amount_paid"] == Decimal("24.5")  # stored as REAL before the migration
+    db.table("payments").insert({"id": "p2", "auction_id": "a1", "bid_id": "b2", "payer_id": "u1",
+                                 "amount_paid": "0.10"}).execute()
+    db.close()
+    db = SQLiteBackend(path)
+    assert db.table("payments").select("amount_paid").eq("id", "p2").execute().data[0]["amount_paid"] == Decimal("0.10")
+    indexes = {r[1] for r in db.conn.execute('PRAGMA index_list("payments")')}
+    assert {"payments_auction_idx", "payments_keyset_idx"} <= indexes
+    db.close()
+
+
+def test_unknown_table_and_column_are_rejected():
+    db = MemoryBackend()
+    with pytest.raises(BackendError):
+        db.table("nope")
+    with pytest.raises(BackendError):
+        db.table("bids").select("*").eq("nope", 1)
+
+
+def test_upsert_ignore_duplicates_returns_only_new_rows():
+    db = MemoryBackend()
+    row = {"id": str(uuid.uuid4()), "name": "A", "email": "a@x"}
+    assert len(db.table("users").upsert(row, on_conflict="email", ignore_duplicates=True).execute().data) == 1
+    again = dict(row, id=str(uuid.uuid4()))
+    assert db.table("users").upsert(again, on_conflict="email", ignore_duplicates=True).execute().data == []